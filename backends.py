@@ -0,0 +1,225 @@
+"""Inference backends for the Real-ESRGAN networks loaded by ``engine``.
+
+Every backend turns the eager ``nn.Module`` into a callable mapping an
+``NCHW`` float tensor to the upscaled tensor, so the tiling code in
+``engine`` does not care which runtime executes the graph:
+
+- ``eager``: the PyTorch module itself;
+- ``torchscript``: a traced and frozen TorchScript graph;
+- ``compile``: ``torch.compile`` (needs a working compiler toolchain);
+- ``onnx``: an ONNX export executed by ONNX Runtime on the CPU.
+
+bf16 runs the chosen backend under ``torch.autocast``; int8 (dynamically
+quantised convolutions) cannot be traced or exported, so both are limited to
+the eager and ``torch.compile`` backends.
+
+TorchScript and ONNX artefacts are cached next to the checkpoint
+(``models_realesrgan/<name>.torchscript-<device>-<dtype>.pt`` /
+``<name>.onnx``) and rebuilt whenever the ``.pth`` is newer. ``auto`` picks
+the fastest backend available for the device.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import copy
+import warnings
+from pathlib import Path
+from typing import Callable, Iterator, List
+
+import numpy as np
+import torch
+
+from engine import BACKEND_CHOICES
+from fileutil import write_atomically
+
+# ``auto`` preference, fastest first. Graph runtimes win clearly on CPU; on
+# CUDA the eager fp16 module is already the best option available here.
+_AUTO_ORDER = {
+    "cpu": ("onnx", "torchscript", "eager"),
+    "cuda": ("eager",),
+}
+
+# Precisions that only work with the PyTorch module itself.
+_MODULE_ONLY_PRECISIONS = ("bf16", "int8")
+
+# Backends whose runtime keeps its own copy of the weights (the frozen graph
+# constants, the ONNX Runtime session); ``torch.compile`` reuses the module's.
+_WEIGHT_COPYING_BACKENDS = ("torchscript", "onnx")
+
+# Spatial size of the dummy input used for tracing/exporting. Batch, height
+# and width stay dynamic in the resulting graphs.
+_EXAMPLE_SIZE = 64
+
+Forward = Callable[[torch.Tensor], torch.Tensor]
+
+
+def available_backends(device: str, precision: str = "fp32") -> List[str]:
+    names = ["eager"]
+    if precision not in _MODULE_ONLY_PRECISIONS:
+        names.append("torchscript")
+    if hasattr(torch, "compile"):
+        names.append("compile")
+    if device == "cpu" and precision == "fp32" and _import_onnxruntime() is not None:
+        names.append("onnx")
+    return names
+
+
+def resolve_backend(name: str, device: str, precision: str = "fp32") -> str:
+    """Map ``name`` (possibly ``auto``) to a backend usable on ``device`` at ``precision``."""
+    available = available_backends(device, precision)
+    if name == "auto":
+        order = _AUTO_ORDER["cpu" if device == "cpu" else "cuda"]
+        return next(candidate for candidate in order if candidate in available)
+    if name not in BACKEND_CHOICES:
+        raise ValueError(f"Backend desconhecido: {name}")
+    if name not in available:
+        if name == "onnx" and _import_onnxruntime() is None:
+            raise ModuleNotFoundError("Backend ONNX requer onnxruntime (pip install onnxruntime).")
+        raise ValueError(f"Backend {name} indisponível para {device} em {precision}.")
+    return name
+
+
+def build_backend(
+    name: str, network: torch.nn.Module, checkpoint: Path, device: str, precision: str = "fp32"
+) -> Forward:
+    """Return the forward callable for backend ``name`` (already resolved)."""
+    if name == "eager":
+        forward: Forward = network
+    elif name == "compile":
+        forward = torch.compile(network, dynamic=True)
+    elif name == "torchscript":
+        forward = _build_torchscript(network, checkpoint, device, precision == "fp16")
+    elif name == "onnx":
+        forward = _OnnxRunner(_ensure_onnx(network, checkpoint))
+    else:
+        raise ValueError(f"Backend desconhecido: {name}")
+    return _Autocast(forward, device) if precision == "bf16" else forward
+
+
+def holds_weight_copy(name: str) -> bool:
+    """Whether backend ``name`` keeps a copy of the weights besides the eager module."""
+    return name in _WEIGHT_COPYING_BACKENDS
+
+
+class _Autocast:
+    """Runs ``forward`` under bf16 autocast (weights stay fp32)."""
+
+    def __init__(self, forward: Forward, device: str) -> None:
+        self._forward = forward
+        self._device_type = "cuda" if device.startswith("cuda") else "cpu"
+
+    def __call__(self, tensor: torch.Tensor) -> torch.Tensor:
+        with torch.autocast(device_type=self._device_type, dtype=torch.bfloat16):
+            return self._forward(tensor)
+
+
+# ----------------------------------------------------------------------
+# TorchScript
+
+
+def _build_torchscript(network: torch.nn.Module, checkpoint: Path, device: str, half: bool) -> Forward:
+    # Freezing turns the weights into graph constants, so the graph is traced
+    # on the target device and dtype and can't be moved or cast afterwards.
+    device_type = "cuda" if device.startswith("cuda") else "cpu"
+    dtype = torch.float16 if half else torch.float32
+    artefact = _artefact_path(checkpoint, f".torchscript-{device_type}-{'fp16' if half else 'fp32'}.pt")
+    if _is_fresh(artefact, checkpoint):
+        return torch.jit.load(str(artefact), map_location=device)
+    example = torch.rand(1, 3, _EXAMPLE_SIZE, _EXAMPLE_SIZE, device=device, dtype=dtype)
+    with torch.no_grad(), _quiet_exporters():
+        source = copy.deepcopy(network).to(device=device, dtype=dtype).eval()
+        module = torch.jit.freeze(torch.jit.trace(source, example))
+        write_atomically(artefact, lambda tmp: torch.jit.save(module, str(tmp)))
+    return module
+
+
+# ----------------------------------------------------------------------
+# ONNX Runtime
+
+
+class _OnnxRunner:
+    """Runs an ONNX Runtime session with the same tensor-in/tensor-out contract."""
+
+    def __init__(self, onnx_path: Path) -> None:
+        ort = _import_onnxruntime()
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # Honour the thread share set by the engine (e.g. process pool workers).
+        options.intra_op_num_threads = torch.get_num_threads()
+        self._session = ort.InferenceSession(str(onnx_path), options, providers=["CPUExecutionProvider"])
+        model_input = self._session.get_inputs()[0]
+        self._input_name = model_input.name
+        # Graphs exported before the batch axis was made dynamic take one image.
+        self._fixed_batch = isinstance(model_input.shape[0], int)
+
+    def __call__(self, tensor: torch.Tensor) -> torch.Tensor:
+        array = np.ascontiguousarray(tensor.detach().float().cpu().numpy())
+        if self._fixed_batch and len(array) > 1:
+            outputs = [self._session.run(None, {self._input_name: array[i : i + 1]})[0] for i in range(len(array))]
+            return torch.from_numpy(np.concatenate(outputs))
+        (output,) = self._session.run(None, {self._input_name: array})
+        return torch.from_numpy(output)
+
+
+def _ensure_onnx(network: torch.nn.Module, checkpoint: Path) -> Path:
+    artefact = _artefact_path(checkpoint, ".onnx")
+    if _is_fresh(artefact, checkpoint):
+        return artefact
+    model = _cpu_fp32_copy(network)
+    example = torch.rand(1, 3, _EXAMPLE_SIZE, _EXAMPLE_SIZE)
+
+    def export(tmp: Path) -> None:
+        kwargs = dict(
+            input_names=["input"],
+            output_names=["output"],
+            dynamic_axes={
+                "input": {0: "batch", 2: "height", 3: "width"},
+                "output": {0: "batch", 2: "out_height", 3: "out_width"},
+            },
+            opset_version=17,
+        )
+        with torch.no_grad(), _quiet_exporters():
+            try:
+                torch.onnx.export(model, (example,), str(tmp), dynamo=False, **kwargs)
+            except TypeError:  # torch < 2.5 has no ``dynamo`` switch
+                torch.onnx.export(model, (example,), str(tmp), **kwargs)
+
+    write_atomically(artefact, export)
+    return artefact
+
+
+# ----------------------------------------------------------------------
+# Helpers
+
+
+def _artefact_path(checkpoint: Path, suffix: str) -> Path:
+    return checkpoint.with_name(checkpoint.stem + suffix)
+
+
+def _is_fresh(artefact: Path, checkpoint: Path) -> bool:
+    try:
+        return artefact.stat().st_mtime >= checkpoint.stat().st_mtime
+    except FileNotFoundError:
+        return False
+
+
+@contextlib.contextmanager
+def _quiet_exporters() -> Iterator[None]:
+    """Silence the deprecation notices torch prints for jit/legacy ONNX export."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        warnings.simplefilter("ignore", DeprecationWarning)
+        yield
+
+
+def _cpu_fp32_copy(network: torch.nn.Module) -> torch.nn.Module:
+    return copy.deepcopy(network).float().cpu().eval()
+
+
+def _import_onnxruntime():
+    try:
+        import onnxruntime
+    except ImportError:
+        return None
+    return onnxruntime
@@ -0,0 +1,281 @@
+"""UpVision em modo headless: upscale em lote sem interface gráfica.
+
+Pensado para servidores, containers e cron jobs: não importa ``tkinter`` e
+emite um evento JSON por linha no stdout, espelhando as tuplas enviadas pelo
+``UpscaleEngine`` para a ``event_queue`` (``log``, ``progress``, ``done``...).
+
+Uso básico:
+    python cli.py fotos/ outras/*.jpg -o saida/ --model RealESRGAN_x4plus --tile 512
+
+Vídeos (.mp4, .avi, .mov, .mkv...) entre as entradas são processados quadro a
+quadro com ``UpscaleEngine.process_video``, um evento ``done`` por vídeo.
+
+Utilize --help para ver todas as opções. Ctrl+C cancela o lote de forma
+cooperativa: as imagens já concluídas são mantidas e o evento ``done`` final
+lista quais foram processadas.
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import glob
+import json
+import signal
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from engine import (
+    BACKEND_CHOICES,
+    BATCHING_PRESETS,
+    DEFAULT_BATCHING,
+    DEFAULT_ENCODE_WORKERS,
+    DEFAULT_OUTPUT_PROFILE,
+    DEFAULT_PREFETCH,
+    DEFAULT_SIMILARITY_THRESHOLD,
+    DEFAULT_TILE_OVERLAP,
+    OUTPUT_PROFILES,
+    PRECISION_CHOICES,
+    VIDEO_EXTENSIONS,
+    BatchResult,
+    CancellationToken,
+    UpscaleEngine,
+)
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".tiff", ".webp"}
+
+EXIT_OK = 0
+EXIT_FAILURES = 1
+EXIT_USAGE = 2
+EXIT_CANCELLED = 130
+
+
+class JsonLinesEmitter:
+    """Drop-in for the engine's ``event_queue`` that prints each event as JSON."""
+
+    def __init__(self, stream=None) -> None:
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def put(self, item: tuple[str, object], block: bool = True, timeout: Optional[float] = None) -> None:
+        kind, payload = item
+        line = json.dumps(
+            {"event": kind, "time": round(time.time(), 3), "payload": _to_json(payload)},
+            ensure_ascii=False,
+        )
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    put_nowait = put
+
+
+def collect_images(inputs: Iterable[str], extensions: Iterable[str] = IMAGE_EXTENSIONS) -> List[Path]:
+    """Expand files, glob patterns and directories (recursively) into paths with ``extensions``."""
+    extensions = set(extensions)
+    images: List[Path] = []
+    seen: set[Path] = set()
+    for raw in inputs:
+        if glob.has_magic(raw):
+            candidates = [Path(match) for match in sorted(glob.glob(raw, recursive=True))]
+        else:
+            candidates = [Path(raw)]
+        for candidate in candidates:
+            if candidate.is_dir():
+                found = sorted(p for p in candidate.rglob("*") if p.is_file())
+            elif candidate.is_file():
+                found = [candidate]
+            else:
+                raise FileNotFoundError(f"Entrada não encontrada: {raw}")
+            for path in found:
+                if path.suffix.lower() not in extensions:
+                    continue
+                resolved = path.resolve()
+                if resolved not in seen:
+                    seen.add(resolved)
+                    images.append(path)
+    return images
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Upscale em lote com Real-ESRGAN, sem interface gráfica (eventos em JSON lines).",
+    )
+    parser.add_argument(
+        "inputs", nargs="*", help="Imagens, vídeos, padrões glob ou pastas (percorridas recursivamente)."
+    )
+    parser.add_argument("-o", "--output", type=Path, help="Pasta de saída.")
+    parser.add_argument("-m", "--model", help="Nome do checkpoint (default: primeiro encontrado).")
+    parser.add_argument("--models-dir", type=Path, help="Pasta com os checkpoints .pth (default: models_realesrgan/).")
+    parser.add_argument("--device", default="auto", help="cpu, cuda, cuda:N ou auto (default: auto).")
+    parser.add_argument("--tile", type=int, default=0, help="Tamanho do tile; 0 desativa (default: 0).")
+    parser.add_argument(
+        "--tile-overlap",
+        type=int,
+        default=DEFAULT_TILE_OVERLAP,
+        help=f"Sobreposição entre tiles em pixels (default: {DEFAULT_TILE_OVERLAP}).",
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Processos de inferência em CPU (default: 1).")
+    parser.add_argument(
+        "--prefetch", type=int, default=DEFAULT_PREFETCH, help=f"Imagens decodificadas à frente (default: {DEFAULT_PREFETCH})."
+    )
+    parser.add_argument(
+        "--encode-workers",
+        type=int,
+        default=DEFAULT_ENCODE_WORKERS,
+        help=f"Threads de gravação das saídas (default: {DEFAULT_ENCODE_WORKERS}).",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKEND_CHOICES,
+        default="eager",
+        help="Runtime de inferência; auto escolhe o mais rápido disponível (default: eager).",
+    )
+    parser.add_argument(
+        "--precision",
+        choices=PRECISION_CHOICES,
+        default="auto",
+        help="auto (fp16 em CUDA, fp32 em CPU), fp32, fp16, bf16 ou int8 (default: auto).",
+    )
+    parser.add_argument(
+        "--output-profile",
+        choices=tuple(OUTPUT_PROFILES),
+        default=DEFAULT_OUTPUT_PROFILE,
+        help="Formato e compressão das saídas, ex.: png-fast, jpeg-q90-fast (default: original, mantém o formato).",
+    )
+    parser.add_argument(
+        "--skip-similar",
+        type=float,
+        metavar="LIMIAR",
+        help="Reaproveita a saída anterior para imagens quase idênticas (ex.: rajadas); diferença máxima 0-255.",
+    )
+    parser.add_argument(
+        "--keep-all-frames",
+        action="store_true",
+        help=f"Não reaproveita quadros repetidos em vídeos (default: limiar {DEFAULT_SIMILARITY_THRESHOLD}).",
+    )
+    parser.add_argument(
+        "--batching",
+        choices=tuple(BATCHING_PRESETS),
+        default=DEFAULT_BATCHING,
+        help="Agrupa imagens pequenas do mesmo tamanho numa inferência: latency (desligado), balanced ou throughput (default: latency).",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Ignora o cache de resultados.")
+    parser.add_argument("--list-models", action="store_true", help="Lista os checkpoints disponíveis e sai.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    emitter = JsonLinesEmitter()
+    engine = UpscaleEngine(args.models_dir)
+    models = engine.list_models()
+
+    if args.list_models:
+        for model in models:
+            emitter.put(("model", {"name": model.name, "path": str(model.path), "scale": model.scale}))
+        return EXIT_OK
+
+    if not args.inputs or args.output is None:
+        emitter.put(("error", "Informe ao menos uma entrada e a pasta de saída (-o)."))
+        return EXIT_USAGE
+    if not models:
+        emitter.put(("error", f"Nenhum modelo encontrado em {engine.models_dir}"))
+        return EXIT_USAGE
+    try:
+        media = collect_images(args.inputs, IMAGE_EXTENSIONS | VIDEO_EXTENSIONS)
+    except FileNotFoundError as exc:
+        emitter.put(("error", str(exc)))
+        return EXIT_USAGE
+    images = [path for path in media if path.suffix.lower() in IMAGE_EXTENSIONS]
+    videos = [path for path in media if path.suffix.lower() in VIDEO_EXTENSIONS]
+
+    model_name = args.model or models[0].name
+    token = CancellationToken()
+    signal.signal(signal.SIGINT, lambda signum, frame: token.cancel())
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, lambda signum, frame: token.cancel())
+
+    common = dict(
+        tile_size=args.tile,
+        tile_overlap=args.tile_overlap,
+        token=token,
+        backend=args.backend,
+        precision=args.precision,
+    )
+    results: List[BatchResult] = []
+    try:
+        if images or not videos:
+            results.append(
+                engine.process_batch(
+                    images,
+                    args.output,
+                    model_name,
+                    args.device,
+                    emitter,  # type: ignore[arg-type]
+                    prefetch=args.prefetch,
+                    encode_workers=args.encode_workers,
+                    workers=args.workers,
+                    use_cache=not args.no_cache,
+                    output_profile=args.output_profile,
+                    similarity_threshold=args.skip_similar,
+                    batching=args.batching,
+                    **common,
+                )
+            )
+        frame_threshold = _frame_threshold(args)
+        for video in videos:
+            if token.cancelled:
+                break
+            results.append(
+                engine.process_video(
+                    video,
+                    args.output,
+                    model_name,
+                    args.device,
+                    emitter,  # type: ignore[arg-type]
+                    similarity_threshold=frame_threshold,
+                    **common,
+                )
+            )
+    except Exception as exc:
+        emitter.put(("error", str(exc)))
+        emitter.put(("done", None))
+        return EXIT_FAILURES
+    finally:
+        engine.close()
+    return max(_exit_code(result) for result in results)
+
+
+def _frame_threshold(args: argparse.Namespace) -> Optional[float]:
+    """Limiar de quadros repetidos em vídeos; ``--skip-similar 0`` (só idênticos) vale como informado."""
+    if args.keep_all_frames:
+        return None
+    return DEFAULT_SIMILARITY_THRESHOLD if args.skip_similar is None else args.skip_similar
+
+
+def _exit_code(result: BatchResult) -> int:
+    if result.cancelled:
+        return EXIT_CANCELLED
+    return EXIT_FAILURES if result.failed else EXIT_OK
+
+
+def _to_json(payload: object) -> object:
+    if dataclasses.is_dataclass(payload) and not isinstance(payload, type):
+        payload = dataclasses.asdict(payload)
+    if isinstance(payload, dict):
+        return {str(key): _to_json(value) for key, value in payload.items()}
+    if isinstance(payload, (list, tuple)):
+        return [_to_json(value) for value in payload]
+    if isinstance(payload, Path):
+        return str(payload)
+    if payload is None or isinstance(payload, (str, int, float, bool)):
+        return payload
+    return str(payload)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
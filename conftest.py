@@ -0,0 +1,81 @@
+"""Fixtures compartilhadas pelos testes: um ``UpscaleEngine`` com modelo falso e um checkpoint minúsculo."""
+
+import threading
+from typing import Optional
+
+import numpy as np
+import pytest
+
+import engine
+from engine import ModelInfo, UpscaleEngine, _LazyModel
+
+
+class NearestModel(_LazyModel):
+    """_LazyModel sem rede: upscale por repetição de pixels.
+
+    ``gate`` segura cada inferência até ser liberado; ``calls`` recebe o
+    formato de cada imagem ampliada e ``batches`` o tamanho de cada lote.
+    """
+
+    def __init__(
+        self,
+        model_info: ModelInfo,
+        device: str,
+        gate: Optional[threading.Event] = None,
+        calls: Optional[list] = None,
+        batches: Optional[list] = None,
+    ) -> None:
+        self.model_info = model_info
+        self.device = device
+        self._lock = threading.Lock()
+        self.gate = gate
+        self.calls = calls
+        self.batches = batches
+
+    def upscale(self, array, tile_size=0, tile_overlap=0, token=None, **options):
+        if self.gate is not None:
+            self.gate.wait(5)
+        if token is not None:
+            token.checkpoint()
+        if self.calls is not None:
+            self.calls.append(array.shape)
+        scale = self.model_info.scale
+        return np.repeat(np.repeat(array, scale, axis=0), scale, axis=1)
+
+    def upscale_batch(self, arrays, backend="eager", metrics=None):
+        if self.batches is not None:
+            self.batches.append(len(arrays))
+        return [self.upscale(array) for array in arrays]
+
+
+@pytest.fixture()
+def fake_engine(tmp_path):
+    """Fábrica de ``UpscaleEngine`` cujo checkpoint ``fake_x2`` é um ``NearestModel``.
+
+    Os argumentos nomeados de ``fake_engine(...)`` são repassados ao modelo.
+    """
+    models_dir = tmp_path / "models"
+    models_dir.mkdir()
+    (models_dir / "fake_x2.pth").write_bytes(b"")
+
+    def make(**model_options) -> UpscaleEngine:
+        engine = UpscaleEngine(models_dir, cache_dir=tmp_path / "cache")
+        engine._ensure_lazy_model = (  # type: ignore[method-assign]
+            lambda model, device, precision=None: NearestModel(model, device, **model_options)
+        )
+        return engine
+
+    return make
+
+
+@pytest.fixture()
+def srvgg(tmp_path):
+    """SRVGGNetCompact x2 minúsculo salvo em ``tmp_path/tiny_x2.pth``; devolve ``(rede, checkpoint)``."""
+    torch = pytest.importorskip("torch")
+    pytest.importorskip("realesrgan")
+    engine.RRDBNet, engine.SRVGGNetCompact = engine._import_realesrgan()
+    torch.manual_seed(0)
+    network = engine.SRVGGNetCompact(num_in_ch=3, num_out_ch=3, num_feat=8, num_conv=2, upscale=2).eval()
+    checkpoint = tmp_path / "tiny_x2.pth"
+    torch.save({"params": network.state_dict()}, checkpoint)
+    return network, checkpoint
@@ -6,25 +6,43 @@ The goal of this module is to concentrate all heavy lifting around:
 - running batch inference while emitting friendly log messages;
 - summarising the current runtime environment (torch / CUDA / GPU).
 
-It is designed to be imported by ``main.py`` without triggering any GPU
-allocations up-front; models are only loaded when ``process_batch`` is
-invoked.
+It is designed to be imported by ``main.py`` without importing torch or
+triggering any GPU allocations up-front; torch is imported on first use and
+models are only loaded when ``process_batch`` (or ``warm_up``) is invoked.
 """
 
 from __future__ import annotations
 
+import collections
+import contextlib
 import dataclasses
+import multiprocessing
+import os
 import queue
 import re
+import shutil
 import threading
 import time
 import warnings
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from typing import Iterable, List, Optional
 
+import cv2
 import numpy as np
 from PIL import Image
 
+from fileutil import write_atomically
+from manifest import OutputManifest
+from result_cache import DEFAULT_CACHE_MAX_BYTES, ResultCache
+
 warnings.filterwarnings(
     "ignore",
     message="You are using `torch.load` with `weights_only=False`",
@@ -36,18 +54,121 @@ warnings.filterwarnings(
     category=UserWarning,
 )
 
-try:  # torch is optional until runtime, but GUI feedback needs it.
-    import torch
-except ImportError as exc:  # pragma: no cover - handled downstream
-    torch = None  # type: ignore[assignment]
-    _torch_import_error = exc
-else:
-    _torch_import_error = None
+# torch is imported on first use (see ``load_torch``): importing it takes
+# seconds and would otherwise delay the GUI window.
+torch = None
+_torch_import_error: Optional[ImportError] = None
+_torch_lock = threading.Lock()
 
 # These imports are delayed because the packages are relatively heavy. They are
 # resolved inside ``_LazyModel`` the first time we really need them.
-RealESRGANer = None
 RRDBNet = None
+SRVGGNetCompact = None
+
+# Default overlap (in input pixels) between neighbouring tiles when tiled
+# inference is enabled. The overlap is cross-faded to hide tile seams.
+DEFAULT_TILE_OVERLAP = 32
+
+# Pipeline depth used by ``UpscaleEngine.process_batch``: images decoded ahead
+# of the model and outputs being encoded/written concurrently.
+DEFAULT_PREFETCH = 2
+DEFAULT_ENCODE_WORKERS = 2
+
+# Inference backends accepted by ``process_batch`` (implemented in
+# ``backends``, which imports torch and is therefore loaded on first use).
+BACKEND_CHOICES = ("eager", "auto", "torchscript", "compile", "onnx")
+
+# Numeric precisions accepted by ``process_batch``. ``auto`` means fp16 on CUDA
+# and fp32 on CPU; on CPU, bf16 (autocast) and int8 (dynamically quantised
+# convolutions) trade a little accuracy for memory bandwidth.
+PRECISION_CHOICES = ("auto", "fp32", "fp16", "bf16", "int8")
+
+# Reduced-precision models whose output on a probe image drops below this
+# PSNR (dB) against fp32 are reported with a warning.
+MIN_PRECISION_PSNR = 35.0
+
+# Weights kept resident by the loaded-model LRU (see ``_LoadedModels``). An
+# RRDBNet x4 checkpoint takes ~67 MB in fp32.
+DEFAULT_MODEL_MEMORY_BUDGET = 1024**3
+
+# Idle buffers kept by the per-batch ``_BufferArena``. A 1080p frame upscaled
+# x4 takes ~95 MB as uint8.
+DEFAULT_BUFFER_ARENA_BYTES = 512 * 1024**2
+
+# Containers accepted by ``UpscaleEngine.process_video``. Outputs are always
+# written as MPEG-4 (``.mp4``).
+VIDEO_EXTENSIONS = {".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v"}
+
+# Decoded/upscaled frames buffered on each side of the video inference loop.
+DEFAULT_VIDEO_PREFETCH = 4
+
+# Largest difference (0-255, on a 64x64 grayscale thumbnail) for a frame to
+# count as a repeat of the last upscaled one; see ``_frame_signature``.
+DEFAULT_SIMILARITY_THRESHOLD = 2.0
+
+# Stages timed for every image (see ``ImageMetrics``), in pipeline order.
+# ``preprocess``/``postprocess`` are the tensor conversions around the network
+# (plus tile blending); ``encode``/``write`` split compression from file I/O.
+STAGES = ("decode", "preprocess", "inference", "postprocess", "encode", "write")
+
+# How often (seconds) the process pool re-checks pause/cancel requests.
+_POLL_INTERVAL = 0.2
+
+
+@dataclasses.dataclass(frozen=True)
+class OutputProfile:
+    """Container format and encoder settings used to write upscaled images."""
+
+    suffix: Optional[str]  # ``None`` keeps the input's format
+    params: tuple[int, ...] = ()  # OpenCV ``imencode`` flags
+
+
+# Output profiles selectable in ``process_batch``. The fast ones trade file
+# size for encode time, which on x4 PNGs can rival the inference itself.
+OUTPUT_PROFILES = {
+    "original": OutputProfile(None),
+    "png-fast": OutputProfile(".png", (cv2.IMWRITE_PNG_COMPRESSION, 1)),
+    "png": OutputProfile(".png", (cv2.IMWRITE_PNG_COMPRESSION, 6)),
+    "png-small": OutputProfile(".png", (cv2.IMWRITE_PNG_COMPRESSION, 9)),
+    "jpeg-q95": OutputProfile(".jpg", (cv2.IMWRITE_JPEG_QUALITY, 95, cv2.IMWRITE_JPEG_OPTIMIZE, 1)),
+    "jpeg-q90-fast": OutputProfile(".jpg", (cv2.IMWRITE_JPEG_QUALITY, 90, cv2.IMWRITE_JPEG_OPTIMIZE, 0)),
+    "webp-q90": OutputProfile(".webp", (cv2.IMWRITE_WEBP_QUALITY, 90)),
+    "webp-lossless": OutputProfile(".webp", (cv2.IMWRITE_WEBP_QUALITY, 101)),
+    "tiff-fast": OutputProfile(".tiff", (cv2.IMWRITE_TIFF_COMPRESSION, 1)),
+    "tiff-lzw": OutputProfile(".tiff", (cv2.IMWRITE_TIFF_COMPRESSION, 5)),
+}
+DEFAULT_OUTPUT_PROFILE = "original"
+
+
+@dataclasses.dataclass(frozen=True)
+class BatchingPolicy:
+    """Dynamic batching: how small images are coalesced into one forward pass.
+
+    The first image waits up to ``max_wait`` seconds for others of the same
+    size before a batch of at most ``max_batch_size`` runs. Images above
+    ``max_pixels`` always run alone. With ``bucket`` > 0, sizes rounding up
+    to the same multiple of ``bucket`` pixels also share a batch: the smaller
+    ones are edge-padded, which can alter their bottom/right border pixels.
+    """
+
+    max_batch_size: int = 1
+    max_wait: float = 0.0
+    max_pixels: int = 512 * 512
+    bucket: int = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_batch_size > 1
+
+
+# Throughput/latency trade-off presets accepted wherever a ``BatchingPolicy``
+# is. ``latency`` runs every image on its own as soon as it arrives.
+BATCHING_PRESETS = {
+    "latency": BatchingPolicy(),
+    "balanced": BatchingPolicy(max_batch_size=4, max_wait=0.005),
+    "throughput": BatchingPolicy(max_batch_size=16, max_wait=0.02, bucket=32),
+}
+DEFAULT_BATCHING = "latency"
 
 
 @dataclasses.dataclass(slots=True)
@@ -73,23 +194,226 @@ class DeviceSummary:
         return "cpu"
 
 
+@dataclasses.dataclass(slots=True)
+class ImageMetrics:
+    """Wall-clock seconds per stage (see ``STAGES``), sizes and pixel counts of one image.
+
+    Emitted as ``("metrics", ImageMetrics)`` right after the image's progress
+    event; a video gets a single one covering all its frames. Stages an image
+    skipped (e.g. a cache hit is never decoded) are absent from ``seconds``.
+    Sizes are ``(width, height)`` and stay ``None`` for videos and cache hits.
+    """
+
+    name: str
+    input_pixels: int = 0
+    output_pixels: int = 0
+    input_size: Optional[tuple[int, int]] = None
+    output_size: Optional[tuple[int, int]] = None
+    seconds: dict[str, float] = dataclasses.field(default_factory=dict)
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+
+
 @dataclasses.dataclass(slots=True)
 class BatchResult:
     total: int
     succeeded: int
     failed: int
     duration: float
+    cancelled: bool = False
+    completed: List[Path] = dataclasses.field(default_factory=list)
+    cache_hits: int = 0
+    # Images/frames whose output was reused from a near-identical predecessor.
+    similar_skipped: int = 0
+    # Sums of the ``ImageMetrics`` of the successful images.
+    stage_seconds: dict[str, float] = dataclasses.field(default_factory=dict)
+    input_pixels: int = 0
+    output_pixels: int = 0
+
+    def add_metrics(self, metrics: ImageMetrics) -> None:
+        for stage, seconds in metrics.seconds.items():
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+        self.input_pixels += metrics.input_pixels
+        self.output_pixels += metrics.output_pixels
+
+
+class BatchCancelled(Exception):
+    """Raised inside a batch when its ``CancellationToken`` is cancelled."""
+
+
+class CancellationToken:
+    """Cooperative pause/resume/cancel switch shared with a running batch.
+
+    The engine calls :meth:`checkpoint` between images and between tiles: it
+    blocks while the token is paused (the loaded model stays in memory) and
+    raises :class:`BatchCancelled` once :meth:`cancel` was called.
+    """
+
+    def __init__(self, _events: Optional[tuple] = None) -> None:
+        # ``_events`` allows process-shared events for the worker pool.
+        self._cancelled, self._running = _events or (threading.Event(), threading.Event())
+        self._running.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+        self._running.set()  # wake up a paused batch so it can stop
+
+    def pause(self) -> None:
+        if not self.cancelled:
+            self._running.clear()
+
+    def resume(self) -> None:
+        self._running.set()
+
+    def wait_resumed(self, timeout: Optional[float] = None) -> bool:
+        return self._running.wait(timeout)
+
+    def checkpoint(self) -> None:
+        self._running.wait()
+        if self._cancelled.is_set():
+            raise BatchCancelled()
+
+    def _mirror(self, other: "CancellationToken") -> None:
+        if other.cancelled:
+            self.cancel()
+            return
+        self._cancelled.clear()  # a worker pool's token outlives the batch that cancelled it
+        if other.paused:
+            self.pause()
+        else:
+            self.resume()
+
+
+@dataclasses.dataclass
+class _BatchJob:
+    """State shared by the batch strategies while a batch runs."""
+
+    paths: List[Path]
+    output_dir: Path
+    model: ModelInfo
+    event_queue: "queue.Queue[tuple[str, object]]"
+    token: CancellationToken
+    result: BatchResult
+    tile_size: int
+    tile_overlap: int
+    cache: Optional[ResultCache]
+    backend: str = "eager"
+    precision: str = "fp32"
+    output_profile: str = DEFAULT_OUTPUT_PROFILE
+    similarity_threshold: Optional[float] = None
+    batching: BatchingPolicy = BATCHING_PRESETS[DEFAULT_BATCHING]
+    manifest: Optional[OutputManifest] = None
+
+    @property
+    def profile(self) -> OutputProfile:
+        return OUTPUT_PROFILES[self.output_profile]
+
+    def settings(self) -> dict[str, object]:
+        """Inference settings that change the output (part of the cache key).
+
+        The backend is left out: every backend runs the same graph at the
+        same precision, so outputs are interchangeable. So is batching, unless
+        its ``bucket`` edge-pads images, which can change their border pixels.
+        """
+        settings: dict[str, object] = {
+            "tile_size": self.tile_size,
+            "tile_overlap": self.tile_overlap if self.tile_size else 0,
+            "precision": self.precision,
+            "output_profile": self.output_profile,
+        }
+        if self.batching.enabled and self.batching.bucket > 1:
+            settings["batch_bucket"] = self.batching.bucket
+        return settings
+
+    def cache_key(self, source: Path) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return self.cache.key_for(source, self.model.name, self.model.scale, self.settings())
+
+    def report(
+        self,
+        index: int,
+        source: Path,
+        dest: Optional[Path] = None,
+        error: Optional[BaseException] = None,
+        cached: bool = False,
+        similar: bool = False,
+        metrics: Optional[ImageMetrics] = None,
+    ) -> None:
+        if error is not None:
+            self.result.failed += 1
+            self.event_queue.put(("log", f"[ERRO] {source.name}: {error}"))
+        else:
+            self.result.succeeded += 1
+            self.result.completed.append(source)
+            if cached:
+                self.result.cache_hits += 1
+            if similar:
+                self.result.similar_skipped += 1
+            tag = "[CACHE]" if cached else "[SIMILAR]" if similar else "[OK]"
+            self.event_queue.put(("log", f"{tag} {source.name} → {dest.name}"))
+            if self.manifest is not None:
+                self._record(source, dest, cached, similar, metrics)
+        self.event_queue.put(("progress", (index, len(self.paths), source.name)))
+        if error is None and metrics is not None:
+            self.result.add_metrics(metrics)
+            self.event_queue.put(("metrics", metrics))
+
+    def _record(
+        self, source: Path, dest: Path, cached: bool, similar: bool, metrics: Optional[ImageMetrics]
+    ) -> None:
+        try:
+            self.manifest.record(
+                source,
+                dest,
+                self.model.name,
+                self.model.scale,
+                input_size=metrics.input_size if metrics is not None else None,
+                output_size=metrics.output_size if metrics is not None else None,
+                seconds=metrics.seconds if metrics is not None else None,
+                reuse="cache" if cached else "similar" if similar else "",
+            )
+        except OSError as exc:  # pragma: no cover - e.g. read-only output folder
+            self.event_queue.put(("log", f"[AVISO] Não foi possível atualizar o manifesto: {exc}"))
+            self.manifest = None
 
 
 class UpscaleEngine:
     """High-level front-end for Real-ESRGAN inference."""
 
-    def __init__(self, models_dir: Optional[Path] = None) -> None:
+    def __init__(
+        self,
+        models_dir: Optional[Path] = None,
+        cache_dir: Optional[Path] = None,
+        cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+        model_memory_budget: int = DEFAULT_MODEL_MEMORY_BUDGET,
+    ) -> None:
         self.app_dir = Path(__file__).resolve().parent
         self.models_dir = models_dir or self._default_models_dir()
         self._check_models_dir()
+        self.result_cache = ResultCache(cache_dir or self.app_dir / ".cache" / "results", cache_max_bytes)
         self._model_cache: dict[str, ModelInfo] = {}
-        self._lazy_model: Optional[_LazyModel] = None
+        # checkpoint -> (mtime_ns, scale detected from its weights or None)
+        self._checkpoint_scales: dict[Path, tuple[int, Optional[int]]] = {}
+        self._loaded_models = _LoadedModels(model_memory_budget)
+        # Shared by concurrent ``process_batch`` calls so their images batch together.
+        self._schedulers: dict[tuple[int, str, BatchingPolicy], _BatchScheduler] = {}
+        self._scheduler_users: "collections.Counter[tuple[int, str, BatchingPolicy]]" = collections.Counter()
+        self._schedulers_lock = threading.Lock()
+        # Worker processes of the last multi-process batch, kept for the next
+        # one. The lock is held for a whole batch: its workers already use
+        # every core and share one cancellation token.
+        self._worker_pool: Optional[_WorkerPool] = None
+        self._worker_pool_lock = threading.Lock()
 
     # ------------------------------------------------------------------
     # Public helpers
@@ -105,7 +429,8 @@ class UpscaleEngine:
         return models
 
     def get_device_summary(self) -> DeviceSummary:
-        if torch is None:
+        """Describe torch/CUDA availability (imports torch on first call)."""
+        if load_torch() is None:
             return DeviceSummary(
                 torch_available=False,
                 torch_version=None,
@@ -130,6 +455,29 @@ class UpscaleEngine:
             cuda_device_name=cuda_name,
         )
 
+    def preload(self, model_name: str, device: str, precision: Optional[str] = None) -> None:
+        """Load ``model_name`` into the warm-model LRU ahead of a batch."""
+        self._ensure_lazy_model(self._resolve_model(model_name), device, precision)
+
+    def warm_up(
+        self, model_name: str, device: str, backend: str = "eager", precision: Optional[str] = None
+    ) -> None:
+        """Preload ``model_name`` and run a tiny dummy inference.
+
+        The first forward pass pays for kernel selection and allocator setup;
+        doing it in the background makes the first real image start fast. It
+        also builds (and caches on disk) the requested ``backend``.
+        """
+        lazy_model = self._ensure_lazy_model(self._resolve_model(model_name), device, precision)
+        lazy_model.upscale(np.zeros((16, 16, 3), dtype=np.uint8), backend=backend)
+
+    def close(self) -> None:
+        """Stop the worker processes kept alive between multi-process batches."""
+        with self._worker_pool_lock:
+            if self._worker_pool is not None:
+                self._worker_pool.close()
+                self._worker_pool = None
+
     # ------------------------------------------------------------------
     # Main entry point used by the GUI
 
@@ -140,34 +488,592 @@ class UpscaleEngine:
         model_name: str,
         device: str,
         event_queue: "queue.Queue[tuple[str, object]]",
+        tile_size: int = 0,
+        tile_overlap: int = DEFAULT_TILE_OVERLAP,
+        prefetch: int = DEFAULT_PREFETCH,
+        encode_workers: int = DEFAULT_ENCODE_WORKERS,
+        workers: int = 1,
+        worker_threads: int = 0,
+        token: Optional["CancellationToken"] = None,
+        use_cache: bool = True,
+        backend: str = "eager",
+        precision: str = "auto",
+        output_profile: str = DEFAULT_OUTPUT_PROFILE,
+        similarity_threshold: Optional[float] = None,
+        batching: "str | BatchingPolicy" = DEFAULT_BATCHING,
     ) -> BatchResult:
+        """Upscale ``image_paths`` into ``output_dir``.
+
+        ``tile_size`` > 0 enables tiled inference: the network only ever sees
+        ``tile_size``×``tile_size`` crops (plus ``tile_overlap`` pixels shared
+        with the neighbours), so the activation memory stays constant no matter
+        the input resolution. ``0`` runs each image in one piece.
+
+        Decoding and encoding run in background pools: ``prefetch`` images are
+        decoded ahead of the model and up to ``encode_workers`` outputs are
+        written while the next image is being upscaled.
+
+        ``workers`` > 1 (CPU only) runs the batch on a pool of processes, each
+        holding its own model and an equal share of the CPU threads
+        (``worker_threads`` > 0 sets the per-worker thread count instead).
+        Progress is then reported in completion order. The processes stay
+        alive for the next batch with the same settings until :meth:`close`.
+
+        ``token`` lets the caller pause, resume or cancel the batch. It is
+        checked between images and between tiles; a cancelled batch returns a
+        partial result whose ``completed`` lists the files that were written.
+
+        With ``use_cache`` the engine's :class:`ResultCache` is consulted
+        first: images already upscaled with the same model and settings are
+        linked from the cache, and identical files inside the batch are only
+        computed once.
+
+        ``backend`` selects the inference runtime (``eager``, ``torchscript``,
+        ``compile``, ``onnx`` or ``auto`` for the fastest one available on the
+        device; see ``backends``). Exported graphs are cached next to the
+        checkpoint.
+
+        ``precision`` is ``auto`` (fp16 on CUDA, fp32 on CPU), ``fp32``,
+        ``fp16``, ``bf16`` or ``int8``. Reduced precisions are compared with
+        fp32 on a probe image when the model is loaded and the PSNR is logged.
+
+        ``output_profile`` picks the output format and encoder settings from
+        ``OUTPUT_PROFILES`` (``original`` keeps each input's format).
+
+        ``similarity_threshold`` (e.g. ``DEFAULT_SIMILARITY_THRESHOLD``) turns
+        on near-duplicate skipping for bursts: an image that differs from the
+        last upscaled one by at most that much (see ``_frame_signature``)
+        gets a copy of its output instead of a new inference. Such images are
+        counted in ``BatchResult.similar_skipped``. Single-process mode only:
+        with ``workers`` > 1 it is turned off with a warning.
+
+        ``batching`` is a ``BATCHING_PRESETS`` name (``latency``, ``balanced``,
+        ``throughput``) or a ``BatchingPolicy``. When enabled, small images
+        (thumbnails, avatars) share batched forward passes, including with
+        other ``process_batch`` calls running concurrently on this engine
+        with the same model, backend and policy. Single-process mode only:
+        with ``workers`` > 1 images run unbatched, with a warning.
+
+        Every successful image is followed by a ``("metrics", ImageMetrics)``
+        event with its per-stage timings; the batch totals end up in
+        ``BatchResult.stage_seconds``.
+
+        Each written output is also appended to ``output_dir``'s manifest
+        (see ``manifest``) with its source, model, sizes and timings, so
+        viewers can find the original of an output without searching.
+        """
+        check_tile_settings(tile_size, tile_overlap)
+        if output_profile not in OUTPUT_PROFILES:
+            raise ValueError(f"Perfil de saída desconhecido: {output_profile}")
+        policy = _resolve_batching(batching)
         start = time.time()
         paths = [Path(p) for p in image_paths]
         output_dir.mkdir(parents=True, exist_ok=True)
 
         model = self._resolve_model(model_name)
-        lazy_model = self._ensure_lazy_model(model, device)
+        precision = _resolve_precision(precision, _normalise_device(device))
+        job = _BatchJob(
+            paths=paths,
+            output_dir=output_dir,
+            model=model,
+            event_queue=event_queue,
+            token=token or CancellationToken(),
+            result=BatchResult(total=len(paths), succeeded=0, failed=0, duration=0.0),
+            tile_size=tile_size,
+            tile_overlap=tile_overlap,
+            cache=self.result_cache if use_cache else None,
+            backend=backend,
+            precision=precision,
+            output_profile=output_profile,
+            similarity_threshold=similarity_threshold,
+            batching=policy,
+            manifest=OutputManifest(output_dir),
+        )
+        if workers > 1 and _normalise_device(device) != "cpu":
+            event_queue.put(("log", "[AVISO] Vários processos só são suportados em CPU; usando um único processo."))
+            workers = 1
+        if workers > 1 and job.similarity_threshold is not None:
+            event_queue.put(
+                ("log", "[AVISO] O reaproveitamento de imagens quase idênticas exige um único processo; desativado.")
+            )
+            job.similarity_threshold = None
+        if workers > 1 and job.batching.enabled:
+            event_queue.put(("log", "[AVISO] O agrupamento em lotes exige um único processo; desativado."))
+            job.batching = BATCHING_PRESETS["latency"]  # also keeps ``batch_bucket`` out of the cache key
+
+        if workers > 1:
+            with self._worker_pool_lock:
+                pool = self._ensure_worker_pool(model, precision, workers, worker_threads, backend)
+                if precision in _REDUCED_PRECISIONS:
+                    self._report_quality(event_queue, precision, pool.quality_psnr())
+                self._run_worker_pool(job, pool)
+        else:
+            lazy_model = self._ensure_lazy_model(model, device, precision)
+            self._report_precision(event_queue, lazy_model)
+            self._run_pipeline(job, lazy_model, prefetch, encode_workers)
+
+        result = job.result
+        if job.cache is not None:
+            job.cache.evict()
+        if result.cancelled:
+            event_queue.put(
+                ("log", f"Processamento cancelado após {len(result.completed)} de {result.total} imagem(ns).")
+            )
+        result.duration = time.time() - start
+        event_queue.put(("done", result))
+        return result
+
+    def process_video(
+        self,
+        video_path: Path,
+        output_dir: Path,
+        model_name: str,
+        device: str,
+        event_queue: "queue.Queue[tuple[str, object]]",
+        tile_size: int = 0,
+        tile_overlap: int = DEFAULT_TILE_OVERLAP,
+        prefetch: int = DEFAULT_VIDEO_PREFETCH,
+        token: Optional["CancellationToken"] = None,
+        backend: str = "eager",
+        precision: str = "auto",
+        similarity_threshold: Optional[float] = DEFAULT_SIMILARITY_THRESHOLD,
+    ) -> BatchResult:
+        """Upscale every frame of ``video_path`` into ``output_dir/<stem>_x<scale>.mp4``.
+
+        A reader thread decodes frames with ``cv2.VideoCapture`` and a writer
+        thread encodes them with ``cv2.VideoWriter`` at the source frame rate;
+        both are connected to the inference loop by queues of ``prefetch``
+        frames, so throughput is bound by the model alone. The audio track is
+        not copied.
+
+        Progress is reported per frame with the same ``("progress", ...)``
+        events as ``process_batch``; the result counts frames, and a cancelled
+        run keeps the frames written so far as a shorter video.
+
+        Frames within ``similarity_threshold`` of the last upscaled frame
+        (static scenes, frames repeated by frame-rate conversion) reuse its
+        output and are counted in ``similar_skipped``; ``None`` disables it.
+        """
+        check_tile_settings(tile_size, tile_overlap)
+        start = time.time()
+        video_path = Path(video_path)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        model = self._resolve_model(model_name)
+        precision = _resolve_precision(precision, _normalise_device(device))
+        token = token or CancellationToken()
+
+        capture = cv2.VideoCapture(str(video_path))
+        if not capture.isOpened():
+            raise ValueError(f"Não foi possível abrir o vídeo: {video_path}")
+        try:
+            lazy_model = self._ensure_lazy_model(model, device, precision)
+            self._report_precision(event_queue, lazy_model)
+            result = self._run_video(
+                video_path,
+                output_dir,
+                capture,
+                lazy_model,
+                event_queue,
+                tile_size,
+                tile_overlap,
+                prefetch,
+                token,
+                backend,
+                similarity_threshold,
+            )
+        finally:
+            capture.release()
 
-        succeeded = 0
-        failed = 0
+        if result.cancelled:
+            event_queue.put(("log", f"Vídeo cancelado após {result.succeeded} quadro(s)."))
+        result.duration = time.time() - start
+        event_queue.put(("done", result))
+        return result
 
+    # ------------------------------------------------------------------
+    # Batch execution strategies
+
+    def _run_pipeline(self, job: "_BatchJob", lazy_model: "_LazyModel", prefetch: int, encode_workers: int) -> None:
+        paths = job.paths
         total = len(paths)
-        for index, source in enumerate(paths, start=1):
-            event_queue.put(("log", f"Processando: {source.name}"))
+        token = job.token
+        cache = job.cache
+
+        # Three stages connected by bounded windows: a decode pool keeps up to
+        # ``prefetch`` images ready, this thread runs inference, and an encode
+        # pool writes the outputs. Events are emitted from this thread only, in
+        # input order, so the queue protocol is unchanged.
+        decode_pool = ThreadPoolExecutor(max_workers=max(1, prefetch), thread_name_prefix="upvision-decode")
+        encode_pool = ThreadPoolExecutor(max_workers=max(1, encode_workers), thread_name_prefix="upvision-encode")
+        decoding: "collections.deque[Future]" = collections.deque()
+        encoding: "collections.deque[tuple[int, Path, Future, str, ImageMetrics]]" = collections.deque()
+        produced: dict[str, Future] = {}  # cache key -> write of its first occurrence
+        anchor: Optional[tuple[np.ndarray, tuple, Future]] = None  # last upscaled: signature, (shape, suffix), write
+        arena = _BufferArena()  # same-sized images reuse tensors and output arrays
+        scheduler = self._batch_scheduler(lazy_model, job.backend, job.batching) if job.batching.enabled else None
+        # With batching, enough images must be decoded and in flight to fill a batch.
+        window = max(1, prefetch, job.batching.max_batch_size if scheduler is not None else 1)
+        in_flight = max(1, encode_workers, job.batching.max_batch_size if scheduler is not None else 1)
+        next_to_decode = 0
+
+        def prepare(source: Path) -> tuple[Optional[str], Optional[Path], Optional[np.ndarray], ImageMetrics]:
+            """Decode stage: hash the input and only decode it on a cache miss."""
+            metrics = ImageMetrics(source.name)
+            key = job.cache_key(source)
+            if key is not None:
+                hit = cache.lookup(key, job.profile.suffix or source.suffix)
+                if hit is not None:
+                    return key, hit, None, metrics
+            with _timed(metrics, "decode"):
+                array = lazy_model.load_image(source)
+            metrics.input_pixels = array.shape[0] * array.shape[1]
+            metrics.input_size = (array.shape[1], array.shape[0])
+            return key, None, array, metrics
+
+        def save(sr_array: np.ndarray, dest: Path, key: Optional[str], metrics: ImageMetrics) -> Path:
+            metrics.output_pixels = sr_array.shape[0] * sr_array.shape[1]
+            metrics.output_size = (sr_array.shape[1], sr_array.shape[0])
             try:
-                dest = lazy_model.enhance_image(source, output_dir)
-            except Exception as err:  # pragma: no cover - runtime errors only
-                failed += 1
-                event_queue.put(("log", f"[ERRO] {source.name}: {err}"))
-            else:
-                succeeded += 1
-                event_queue.put(("log", f"[OK] {source.name} → {dest.name}"))
+                lazy_model.save_image(sr_array, dest, job.profile, metrics)
             finally:
-                event_queue.put(("progress", (index, total, source.name)))
+                arena.release(sr_array)
+            if key is not None:
+                cache.store(key, dest)
+            return dest
+
+        def save_when_ready(inferred: Future, dest: Path, key: Optional[str], metrics: ImageMetrics) -> Path:
+            return save(inferred.result(), dest, key, metrics)
+
+        def materialise(hit: Path, dest: Path, metrics: ImageMetrics) -> Path:
+            with _timed(metrics, "write"):
+                return cache.materialise(hit, dest)
+
+        def copy_after(original: Future, dest: Path, metrics: ImageMetrics) -> Path:
+            return materialise(original.result(), dest, metrics)
+
+        def copy_similar(original: Future, dest: Path, metrics: ImageMetrics) -> Path:
+            source = original.result()
+            with _timed(metrics, "write"):
+                write_atomically(dest, lambda tmp: shutil.copyfile(source, tmp))
+            return dest
 
-        duration = time.time() - start
-        event_queue.put(("done", BatchResult(total, succeeded, failed, duration)))
-        return BatchResult(total, succeeded, failed, duration)
+        def fill_decode_window() -> None:
+            nonlocal next_to_decode
+            while next_to_decode < total and len(decoding) < window:
+                decoding.append(decode_pool.submit(prepare, paths[next_to_decode]))
+                next_to_decode += 1
+
+        def report_encoded(keep: int) -> None:
+            """Report finished writes in order, waiting until at most ``keep`` are pending."""
+            while encoding and (len(encoding) > keep or encoding[0][2].done()):
+                index, source, future, reuse, metrics = encoding.popleft()
+                try:
+                    dest = future.result()
+                except Exception as err:  # pragma: no cover - runtime errors only
+                    job.report(index, source, error=err)
+                else:
+                    job.report(
+                        index,
+                        source,
+                        dest=dest,
+                        cached=reuse == "cache",
+                        similar=reuse == "similar",
+                        metrics=metrics,
+                    )
+
+        try:
+            fill_decode_window()
+            for index, source in enumerate(paths, start=1):
+                try:
+                    token.checkpoint()
+                except BatchCancelled:
+                    job.result.cancelled = True
+                    break
+                job.event_queue.put(("log", f"Processando: {source.name}"))
+                decoded = decoding.popleft()
+                fill_decode_window()
+                dest = lazy_model.output_path_for(source, job.output_dir, job.profile)
+                try:
+                    key, hit, array, metrics = decoded.result()
+                    signature = None
+                    if array is not None and job.similarity_threshold is not None:
+                        signature = _frame_signature(array)
+                        layout = (array.shape, dest.suffix)
+                    if hit is not None:
+                        future, reuse = encode_pool.submit(materialise, hit, dest, metrics), "cache"
+                    elif key is not None and key in produced:
+                        future, reuse = encode_pool.submit(copy_after, produced[key], dest, metrics), "cache"
+                    elif (
+                        signature is not None
+                        and anchor is not None
+                        and anchor[1] == layout
+                        and _is_similar(signature, anchor[0], job.similarity_threshold)
+                    ):
+                        future, reuse = encode_pool.submit(copy_similar, anchor[2], dest, metrics), "similar"
+                    elif scheduler is not None and _batchable(array, job.tile_size, job.batching):
+                        inferred = scheduler.submit(array, metrics)
+                        del array
+                        future, reuse = encode_pool.submit(save_when_ready, inferred, dest, key, metrics), ""
+                        if key is not None:
+                            produced[key] = future
+                        if signature is not None:
+                            anchor = (signature, layout, future)
+                    else:
+                        sr_array = lazy_model.upscale(
+                            array,
+                            tile_size=job.tile_size,
+                            tile_overlap=job.tile_overlap,
+                            token=token,
+                            backend=job.backend,
+                            arena=arena,
+                            metrics=metrics,
+                        )
+                        del array
+                        future, reuse = encode_pool.submit(save, sr_array, dest, key, metrics), ""
+                        del sr_array
+                        if key is not None:
+                            produced[key] = future
+                        if signature is not None:
+                            anchor = (signature, layout, future)
+                except BatchCancelled:
+                    job.result.cancelled = True
+                    break
+                except Exception as err:  # pragma: no cover - runtime errors only
+                    # Keep ordering: earlier images still being written go first.
+                    report_encoded(keep=0)
+                    job.report(index, source, error=err)
+                    continue
+                encoding.append((index, source, future, reuse, metrics))
+                # Bounds the number of upscaled images held in memory.
+                report_encoded(keep=in_flight)
+            # Outputs already handed to the encoders are still written on cancel.
+            report_encoded(keep=0)
+        finally:
+            decode_pool.shutdown(wait=True, cancel_futures=True)
+            encode_pool.shutdown(wait=True)
+            arena.clear()
+            if scheduler is not None:
+                self._release_scheduler(scheduler)
+
+    def _run_video(
+        self,
+        video_path: Path,
+        output_dir: Path,
+        capture,
+        lazy_model: "_LazyModel",
+        event_queue: "queue.Queue[tuple[str, object]]",
+        tile_size: int,
+        tile_overlap: int,
+        prefetch: int,
+        token: CancellationToken,
+        backend: str,
+        similarity_threshold: Optional[float],
+    ) -> BatchResult:
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+        total = max(0, int(capture.get(cv2.CAP_PROP_FRAME_COUNT)))
+        scale = lazy_model.model_info.scale
+        size = (int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)) * scale, int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)) * scale)
+        dest = output_dir / f"{video_path.stem}_x{scale}.mp4"
+        writer = cv2.VideoWriter(str(dest), cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+        if not writer.isOpened():
+            raise OSError(f"Não foi possível criar o vídeo de saída: {dest}")
+
+        result = BatchResult(total=total, succeeded=0, failed=0, duration=0.0)
+        event_queue.put(("log", f"Processando vídeo: {video_path.name} ({total} quadros, {fps:.2f} fps)"))
+        decoded: "queue.Queue[Optional[np.ndarray]]" = queue.Queue(maxsize=max(1, prefetch))
+        upscaled: "queue.Queue[Optional[np.ndarray]]" = queue.Queue(maxsize=max(1, prefetch))
+        stop = threading.Event()
+        arena = _BufferArena()
+        errors: List[BaseException] = []
+        # One entry per video; each stage is only ever updated by one thread.
+        metrics = ImageMetrics(video_path.name)
+
+        def read_frames() -> None:
+            try:
+                while not stop.is_set():
+                    with _timed(metrics, "decode"):
+                        ok, frame = capture.read()
+                    if not ok:
+                        break
+                    _put_until(decoded, frame, stop)
+            except Exception as err:  # pragma: no cover - codec errors only
+                errors.append(err)
+            finally:
+                _put_until(decoded, None, stop)
+
+        def write_frames() -> None:
+            # A skipped frame repeats the previous array, so an array goes back
+            # to the arena only once a different one follows it.
+            previous = None
+            try:
+                while (frame := upscaled.get()) is not None:
+                    # VideoWriter compresses and writes in one call.
+                    with _timed(metrics, "encode"):
+                        writer.write(frame)
+                    metrics.output_pixels += frame.shape[0] * frame.shape[1]
+                    if previous is not None and frame is not previous:
+                        arena.release(previous)
+                    previous = frame
+                    result.succeeded += 1
+                    frames = max(total, result.succeeded)
+                    event_queue.put(("progress", (result.succeeded, frames, f"{video_path.name} #{result.succeeded}")))
+            except Exception as err:  # pragma: no cover - codec errors only
+                errors.append(err)
+                stop.set()
+
+        reader = threading.Thread(target=read_frames, name="upvision-video-decode", daemon=True)
+        encoder = threading.Thread(target=write_frames, name="upvision-video-encode", daemon=True)
+        reader.start()
+        encoder.start()
+        anchor: Optional[np.ndarray] = None  # signature of the last upscaled frame
+        sr_frame: Optional[np.ndarray] = None
+        try:
+            while not errors:
+                token.checkpoint()
+                frame = decoded.get()
+                if frame is None:
+                    break
+                signature = _frame_signature(frame) if similarity_threshold is not None else None
+                if anchor is not None and _is_similar(signature, anchor, similarity_threshold):
+                    result.similar_skipped += 1
+                else:
+                    sr_frame = lazy_model.upscale(
+                        frame,
+                        tile_size=tile_size,
+                        tile_overlap=tile_overlap,
+                        token=token,
+                        backend=backend,
+                        arena=arena,
+                        metrics=metrics,
+                    )
+                    anchor = signature
+                metrics.input_pixels += frame.shape[0] * frame.shape[1]
+                _put_until(upscaled, sr_frame, stop)
+        except BatchCancelled:
+            result.cancelled = True
+        except Exception as err:  # pragma: no cover - runtime errors only
+            errors.append(err)
+        finally:
+            # Frames already upscaled are still written before closing the file.
+            _put_until(upscaled, None, stop)
+            encoder.join()
+            stop.set()
+            reader.join()
+            writer.release()
+            arena.clear()
+            if result.succeeded == 0:
+                dest.unlink(missing_ok=True)  # an empty container is not a playable video
+
+        if errors:
+            result.failed += 1
+            event_queue.put(("log", f"[ERRO] {video_path.name}: {errors[0]}"))
+        elif not result.cancelled:
+            result.total = result.succeeded
+            result.completed.append(video_path)
+            skipped = f" ({result.similar_skipped} quadro(s) repetido(s) reaproveitado(s))" if result.similar_skipped else ""
+            event_queue.put(("log", f"[OK] {video_path.name} → {dest.name}{skipped}"))
+        if result.succeeded:
+            result.add_metrics(metrics)
+            event_queue.put(("metrics", metrics))
+        return result
+
+    def _run_worker_pool(self, job: "_BatchJob", pool: "_WorkerPool") -> None:
+        """Spread the batch over the processes of ``pool``, each with its own model.
+
+        A single PyTorch call stops scaling after a handful of threads, so on
+        large CPU servers several smaller interpreters (each limited to its
+        share of the cores) go faster than one big one. Images are handed out
+        one at a time, so slow files do not leave other workers idle.
+        """
+        paths = job.paths
+        total = len(paths)
+        token = job.token
+        cache = job.cache
+        workers = pool.workers
+        # Workers cannot see ``token`` directly; its state is mirrored into the
+        # pool's process-shared token while we wait for results.
+        pool.token._mirror(token)
+        pending: dict[Future, tuple[Path, Optional[str]]] = {}
+        duplicates: dict[str, list[Path]] = {}  # cache key -> copies waiting for it
+        next_index = 0
+
+        def dest_for(source: Path) -> Path:
+            return _output_path_for(source, job.output_dir, job.model.scale, job.profile.suffix)
+
+        def completed() -> int:
+            return job.result.succeeded + job.result.failed
+
+        def fill() -> None:
+            nonlocal next_index
+            while (
+                next_index < total
+                and len(pending) < workers
+                and not (token.cancelled or token.paused or pool.broken)
+            ):
+                source = paths[next_index]
+                next_index += 1
+                job.event_queue.put(("log", f"Processando: {source.name}"))
+                try:
+                    key = job.cache_key(source)
+                    hit = cache.lookup(key, dest_for(source).suffix) if key is not None else None
+                    if hit is not None:
+                        job.report(completed() + 1, source, dest=cache.materialise(hit, dest_for(source)), cached=True)
+                        continue
+                except Exception as err:  # pragma: no cover - runtime errors only
+                    job.report(completed() + 1, source, error=err)
+                    continue
+                if key is not None and key in duplicates:
+                    duplicates[key].append(source)
+                    continue
+                if key is not None:
+                    duplicates[key] = []
+                future = pool.submit(
+                    _pool_enhance_image,
+                    source,
+                    job.output_dir,
+                    job.tile_size,
+                    job.tile_overlap,
+                    job.backend,
+                    job.output_profile,
+                )
+                pending[future] = (source, key)
+
+        try:
+            fill()
+            while pending or (next_index < total and not token.cancelled and not pool.broken):
+                if pending:
+                    done, _ = wait(pending, timeout=_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                else:
+                    done = set()
+                    token.wait_resumed(_POLL_INTERVAL)
+                pool.token._mirror(token)
+                for future in done:
+                    source, key = pending.pop(future)
+                    copies = duplicates.pop(key, []) if key is not None else []
+                    try:
+                        dest, metrics = future.result()
+                    except BatchCancelled:
+                        continue
+                    except Exception as err:  # pragma: no cover - runtime errors only
+                        if isinstance(err, BrokenProcessPool):
+                            pool.broken = True
+                        for item in [source, *copies]:
+                            job.report(completed() + 1, item, error=err)
+                        continue
+                    if key is not None:
+                        cache.store(key, dest)
+                    job.report(completed() + 1, source, dest=dest, metrics=metrics)
+                    for copy in copies:
+                        job.report(completed() + 1, copy, dest=cache.materialise(dest, dest_for(copy)), cached=True)
+                fill()
+        finally:
+            for future in pending:
+                future.cancel()
+        if pool.broken:
+            error = RuntimeError("Um processo de trabalho terminou inesperadamente.")
+            for source in paths[next_index:]:
+                job.report(completed() + 1, source, error=error)
+        job.result.cancelled = token.cancelled and completed() < total
 
     # ------------------------------------------------------------------
     # Internal helpers
@@ -180,12 +1086,87 @@ class UpscaleEngine:
             raise FileNotFoundError(f"Modelo '{model_name}' não encontrado em {self.models_dir}")
         if not info.path.exists():
             raise FileNotFoundError(f"Arquivo de modelo ausente: {info.path}")
-        return info
+        # The ``_xN`` in a file name can be wrong; the weights decide. Output
+        # names, cache keys and the manifest all use the corrected scale.
+        mtime = info.path.stat().st_mtime_ns
+        cached = self._checkpoint_scales.get(info.path)
+        if cached is None or cached[0] != mtime:
+            cached = self._checkpoint_scales[info.path] = (mtime, _checkpoint_scale(info.path))
+        scale = cached[1]
+        return info if scale in (None, info.scale) else dataclasses.replace(info, scale=scale)
+
+    def _ensure_lazy_model(self, model: ModelInfo, device: str, precision: Optional[str] = None) -> "_LazyModel":
+        return self._loaded_models.get(model, device, precision)
 
-    def _ensure_lazy_model(self, model: ModelInfo, device: str) -> "_LazyModel":
-        if self._lazy_model is None or not self._lazy_model.matches(model, device):
-            self._lazy_model = _LazyModel(model, device)
-        return self._lazy_model
+    def _ensure_worker_pool(
+        self, model: ModelInfo, precision: str, workers: int, threads: int, backend: str
+    ) -> "_WorkerPool":
+        """Return the kept worker pool, replacing it when the configuration changed.
+
+        Spawning the workers and loading a model in each takes several
+        seconds, so the pool survives between batches. Only one is kept:
+        every worker holds its own copy of the model. A new pool is returned
+        once all its workers are ready with ``backend``. Call with
+        ``_worker_pool_lock`` held.
+        """
+        threads = threads if threads > 0 else max(1, (os.cpu_count() or 1) // workers)
+        key = (model.path, precision, workers, threads)
+        pool = self._worker_pool
+        if pool is not None and (pool.key != key or pool.broken):
+            pool.close()
+            pool = None
+        if pool is None:
+            pool = self._worker_pool = _WorkerPool(key, model)
+            pool.start(backend)
+        return pool
+
+    def _batch_scheduler(self, lazy_model: "_LazyModel", backend: str, policy: BatchingPolicy) -> "_BatchScheduler":
+        """Return the shared scheduler for these settings; pair with ``_release_scheduler``."""
+        key = (id(lazy_model), backend, policy)
+        with self._schedulers_lock:
+            scheduler = self._schedulers.get(key)
+            if scheduler is None:
+                scheduler = self._schedulers[key] = _BatchScheduler(lazy_model, backend, policy)
+            self._scheduler_users[key] += 1
+            self._close_stale_schedulers()
+            return scheduler
+
+    def _release_scheduler(self, scheduler: "_BatchScheduler") -> None:
+        with self._schedulers_lock:
+            self._scheduler_users[(id(scheduler.lazy_model), scheduler.backend, scheduler.policy)] -= 1
+            self._close_stale_schedulers()
+
+    def _close_stale_schedulers(self) -> None:
+        """Close schedulers of models the LRU dropped once no batch uses them (lock held).
+
+        They would keep the weights alive, but a batch still running on the
+        evicted model must keep its scheduler until it ends.
+        """
+        live = {id(loaded) for loaded in self._loaded_models.loaded()}
+        for stale in [key for key in self._schedulers if key[0] not in live and not self._scheduler_users[key]]:
+            self._schedulers.pop(stale).close()
+            del self._scheduler_users[stale]
+
+    @classmethod
+    def _report_precision(cls, event_queue: "queue.Queue[tuple[str, object]]", lazy_model: "_LazyModel") -> None:
+        psnr = getattr(lazy_model, "quality_psnr", None)
+        if psnr is not None:
+            cls._report_quality(event_queue, lazy_model.precision, psnr)
+
+    @staticmethod
+    def _report_quality(event_queue: "queue.Queue[tuple[str, object]]", precision: str, psnr: Optional[float]) -> None:
+        if psnr is None:
+            return
+        if psnr < MIN_PRECISION_PSNR:
+            event_queue.put(
+                (
+                    "log",
+                    f"[AVISO] Precisão {precision} diverge do fp32 (PSNR {psnr:.1f} dB < "
+                    f"{MIN_PRECISION_PSNR:.0f} dB); considere usar fp32.",
+                )
+            )
+        else:
+            event_queue.put(("log", f"Precisão {precision}: PSNR {psnr:.1f} dB em relação ao fp32."))
 
     def _check_models_dir(self) -> None:
         if not self.models_dir.exists():
@@ -208,78 +1189,949 @@ class UpscaleEngine:
 
 
 class _LazyModel:
-    """Caches the loaded Real-ESRGAN network for reuse across images."""
+    """Caches the loaded Real-ESRGAN network for reuse across images.
 
-    def __init__(self, model_info: ModelInfo, device: str) -> None:
-        if torch is None:
+    Inference backends (see ``backends``) are built on first use and kept
+    alongside the eager network, so switching backends does not reload the
+    checkpoint.
+    """
+
+    def __init__(self, model_info: ModelInfo, device: str, precision: Optional[str] = None) -> None:
+        if load_torch() is None:
             raise ModuleNotFoundError(
                 "PyTorch não está instalado. Instale torch/torchvision/torchaudio antes de rodar o upscale."
             ) from _torch_import_error
         self.model_info = model_info
         self.device = _normalise_device(device)
-        self._upsampler = self._build_upsampler()
+        self.precision = _resolve_precision(precision, self.device)
+        reference = self._build_network()
+        self._network = _quantize_int8(reference) if self.precision == "int8" else reference
+        self._backends: dict[str, object] = {}
         self._lock = threading.Lock()
+        # PSNR (dB) of bf16/int8 outputs against fp32; ``None`` otherwise.
+        self.quality_psnr: Optional[float] = None
+        if self.precision in _REDUCED_PRECISIONS:
+            self.quality_psnr = self._check_quality(reference)
+
+    def matches(self, model: ModelInfo, device: str, precision: Optional[str] = None) -> bool:
+        device = _normalise_device(device)
+        return (
+            self.model_info.name == model.name
+            and self.device == device
+            and self.precision == _resolve_precision(precision, device)
+        )
+
+    def memory_bytes(self) -> int:
+        """Approximate memory held by the weights, including the cached backends' copies."""
+        import backends
+
+        # ``state_dict`` also covers the packed int8 weights of quantised convs.
+        tensors = [t for t in self._network.state_dict().values() if isinstance(t, torch.Tensor)]
+        weights = sum(t.numel() * t.element_size() for t in tensors)
+        return weights * (1 + sum(backends.holds_weight_copy(name) for name in list(self._backends)))
+
+    def enhance_image(
+        self,
+        image_path: Path,
+        output_dir: Path,
+        tile_size: int = 0,
+        tile_overlap: int = DEFAULT_TILE_OVERLAP,
+        token: Optional[CancellationToken] = None,
+        backend: str = "eager",
+        arena: Optional["_BufferArena"] = None,
+        profile: Optional[OutputProfile] = None,
+        metrics: Optional[ImageMetrics] = None,
+    ) -> Path:
+        with _timed(metrics, "decode"):
+            array = self.load_image(image_path)
+        sr_array = self.upscale(
+            array,
+            tile_size=tile_size,
+            tile_overlap=tile_overlap,
+            token=token,
+            backend=backend,
+            arena=arena,
+            metrics=metrics,
+        )
+        if metrics is not None:
+            metrics.input_pixels = array.shape[0] * array.shape[1]
+            metrics.output_pixels = sr_array.shape[0] * sr_array.shape[1]
+            metrics.input_size = (array.shape[1], array.shape[0])
+            metrics.output_size = (sr_array.shape[1], sr_array.shape[0])
+        try:
+            dest = self.output_path_for(image_path, output_dir, profile)
+            return self.save_image(sr_array, dest, profile, metrics)
+        finally:
+            if arena is not None:
+                arena.release(sr_array)
+
+    # The three stages below are also driven separately by
+    # ``UpscaleEngine.process_batch`` so decode/encode overlap inference.
 
-    def matches(self, model: ModelInfo, device: str) -> bool:
-        return self.model_info.name == model.name and self.device == _normalise_device(device)
+    # Images travel through the engine as ``HxWx3`` uint8 BGR arrays, the
+    # layout OpenCV decodes into and encodes from, so the only conversion
+    # copies are into the model input tensor and out of the model output.
 
-    def enhance_image(self, image_path: Path, output_dir: Path) -> Path:
+    def load_image(self, image_path: Path) -> np.ndarray:
         image_path = image_path.resolve()
         if not image_path.exists():
             raise FileNotFoundError(f"Imagem não encontrada: {image_path}")
+        return _decode_image(image_path)
 
-        with Image.open(image_path) as img:
-            rgb = img.convert("RGB")
-            bgr = np.array(rgb)[:, :, ::-1]
+    def upscale(
+        self,
+        array: np.ndarray,
+        tile_size: int = 0,
+        tile_overlap: int = DEFAULT_TILE_OVERLAP,
+        token: Optional[CancellationToken] = None,
+        backend: str = "eager",
+        arena: Optional["_BufferArena"] = None,
+        metrics: Optional[ImageMetrics] = None,
+    ) -> np.ndarray:
+        if tile_size <= 0:
+            # Untiled inference is a single tile covering the whole image.
+            tile_size, tile_overlap = max(array.shape[:2]), 0
+        with self._lock:
+            return _enhance_tiled(
+                self._backend(backend),
+                array,
+                scale=self.model_info.scale,
+                tile_size=tile_size,
+                tile_overlap=tile_overlap,
+                device=self.device,
+                half=self.precision == "fp16",
+                token=token,
+                arena=arena,
+                metrics=metrics,
+            )
 
+    def upscale_batch(
+        self,
+        arrays: List[np.ndarray],
+        backend: str = "eager",
+        metrics: Optional[List[Optional[ImageMetrics]]] = None,
+    ) -> List[np.ndarray]:
+        """Upscale several small images in one forward pass (see ``_enhance_batch``)."""
+        if len(arrays) == 1:
+            return [self.upscale(arrays[0], backend=backend, metrics=metrics[0] if metrics else None)]
         with self._lock:
-            sr, _ = self._upsampler.enhance(bgr, outscale=self.model_info.scale)
+            return _enhance_batch(
+                self._backend(backend),
+                arrays,
+                scale=self.model_info.scale,
+                device=self.device,
+                half=self.precision == "fp16",
+                metrics=metrics,
+            )
 
-        sr_rgb = Image.fromarray(sr[:, :, ::-1])
-        suffix = f"_x{self.model_info.scale}"
-        output_path = output_dir / f"{image_path.stem}{suffix}{image_path.suffix}"
-        sr_rgb.save(output_path, quality=95 if output_path.suffix.lower() in {".jpg", ".jpeg"} else None)
-        return output_path
+    def output_path_for(self, image_path: Path, output_dir: Path, profile: Optional[OutputProfile] = None) -> Path:
+        suffix = profile.suffix if profile is not None else None
+        return _output_path_for(image_path, output_dir, self.model_info.scale, suffix)
+
+    def save_image(
+        self,
+        sr_array: np.ndarray,
+        output_path: Path,
+        profile: Optional[OutputProfile] = None,
+        metrics: Optional[ImageMetrics] = None,
+    ) -> Path:
+        return _encode_image(sr_array, output_path, profile.params if profile is not None else (), metrics)
 
     # ------------------------------------------------------------------
     # Building blocks
 
-    def _build_upsampler(self):
-        global RealESRGANer, RRDBNet
-        if RealESRGANer is None or RRDBNet is None:
-            RealESRGANer, RRDBNet = _import_realesrgan()
-        half_precision = self.device.startswith("cuda")
-        rrdb = RRDBNet(
-            num_in_ch=3,
-            num_out_ch=3,
-            num_feat=64,
-            num_block=23,
-            num_grow_ch=32,
-            scale=self.model_info.scale,
+    def _build_network(self):
+        global RRDBNet, SRVGGNetCompact
+        if RRDBNet is None or SRVGGNetCompact is None:
+            RRDBNet, SRVGGNetCompact = _import_realesrgan()
+        state_dict = _load_state_dict(self.model_info.path)
+        spec = _detect_network(state_dict)
+        if spec.scale != self.model_info.scale:
+            # ``UpscaleEngine._resolve_model`` already trusts the weights; this
+            # covers a ``ModelInfo`` built by hand with another factor.
+            self.model_info = dataclasses.replace(self.model_info, scale=spec.scale)
+        network = spec.build()
+        network.load_state_dict(state_dict, strict=True)
+        network.eval()
+        network = network.to(self.device)
+        return network.half() if self.precision == "fp16" else network
+
+    def _backend(self, name: str):
+        """Return the forward callable for backend ``name``, building it once."""
+        import backends
+
+        resolved = backends.resolve_backend(name, self.device, self.precision)
+        forward = self._backends.get(resolved)
+        if forward is None:
+            forward = backends.build_backend(
+                resolved, self._network, self.model_info.path, self.device, self.precision
+            )
+            self._backends[resolved] = forward
+        return forward
+
+    def _check_quality(self, reference) -> float:
+        """PSNR (dB) of this model's precision against ``reference`` in fp32."""
+        probe = _quality_probe()
+        options = dict(
+            scale=self.model_info.scale, tile_size=probe.shape[0], tile_overlap=0, device=self.device, half=False
         )
-        return RealESRGANer(
-            scale=self.model_info.scale,
-            model_path=str(self.model_info.path),
-            model=rrdb,
-            pre_pad=0,
-            half=half_precision,
-            device=self.device,
+        expected = _enhance_tiled(reference, probe, **options)
+        actual = _enhance_tiled(self._backend("eager"), probe, **options)
+        return _psnr(expected, actual)
+
+
+class _LoadedModels:
+    """LRU of loaded networks keyed by (model, device, precision).
+
+    Keeps several checkpoints warm so alternating jobs do not reload weights.
+    Least recently used entries are dropped once the weights exceed
+    ``budget_bytes``; the most recent model is always kept.
+    """
+
+    def __init__(self, budget_bytes: int) -> None:
+        self.budget_bytes = budget_bytes
+        self._models: "collections.OrderedDict[tuple[str, str, str], _LazyModel]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, model: ModelInfo, device: str, precision: Optional[str] = None) -> "_LazyModel":
+        device = _normalise_device(device)
+        precision = _resolve_precision(precision, device)
+        key = (model.name, device, precision)
+        with self._lock:
+            lazy_model = self._models.get(key)
+            if lazy_model is None or lazy_model.model_info.path != model.path:
+                lazy_model = _LazyModel(model, device, precision)
+                self._models[key] = lazy_model
+            self._models.move_to_end(key)
+            self._evict()
+            return lazy_model
+
+    def _evict(self) -> None:
+        evicted = False
+        while len(self._models) > 1 and self.total_bytes() > self.budget_bytes:
+            self._models.popitem(last=False)
+            evicted = True
+        if evicted:
+            _release_device_memory()
+
+    def total_bytes(self) -> int:
+        return sum(lazy_model.memory_bytes() for lazy_model in self._models.values())
+
+    def loaded(self) -> List["_LazyModel"]:
+        with self._lock:
+            return list(self._models.values())
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._models
+
+
+# ----------------------------------------------------------------------
+# Process pool workers
+
+# Model loaded by ``_init_pool_worker`` inside each worker process.
+_pool_model: Optional[_LazyModel] = None
+_pool_token: Optional[CancellationToken] = None
+_pool_arena: Optional["_BufferArena"] = None
+
+
+def _init_pool_worker(model_info: ModelInfo, num_threads: int, token: CancellationToken, precision: str) -> None:
+    global _pool_model, _pool_token, _pool_arena
+    load_torch().set_num_threads(num_threads)
+    _pool_model = _LazyModel(model_info, "cpu", precision)
+    _pool_token = token
+    _pool_arena = _BufferArena()
+
+
+def _pool_quality_psnr() -> Optional[float]:
+    assert _pool_model is not None, "worker não inicializado"
+    return _pool_model.quality_psnr
+
+
+def _pool_ready(backend: str) -> int:
+    """Run a tiny inference with ``backend`` (building it once) and return the worker's pid."""
+    assert _pool_model is not None, "worker não inicializado"
+    _pool_model.upscale(np.zeros((16, 16, 3), dtype=np.uint8), backend=backend)
+    return os.getpid()
+
+
+def _pool_enhance_image(
+    image_path: Path, output_dir: Path, tile_size: int, tile_overlap: int, backend: str, output_profile: str
+) -> tuple[Path, ImageMetrics]:
+    assert _pool_model is not None, "worker não inicializado"
+    metrics = ImageMetrics(image_path.name)
+    dest = _pool_model.enhance_image(
+        image_path,
+        output_dir,
+        tile_size=tile_size,
+        tile_overlap=tile_overlap,
+        token=_pool_token,
+        backend=backend,
+        arena=_pool_arena,
+        profile=OUTPUT_PROFILES[output_profile],
+        metrics=metrics,
+    )
+    return dest, metrics
+
+
+class _WorkerPool:
+    """Spawned worker processes that keep a model loaded between batches.
+
+    ``key`` is ``(checkpoint, precision, workers, threads)``. Processes start
+    on demand (up to ``workers``) and load the model once, in
+    ``_init_pool_worker``. ``token`` is process-shared; batches mirror their
+    own token into it, so only one batch may use the pool at a time.
+    """
+
+    def __init__(self, key: tuple[Path, str, int, int], model: ModelInfo) -> None:
+        _, precision, workers, threads = key
+        self.key = key
+        self.workers = workers
+        self.broken = False
+        context = multiprocessing.get_context("spawn")
+        self.token = CancellationToken(_events=(context.Event(), context.Event()))
+        self._quality_psnr: Optional[Future] = None
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_pool_worker,
+            initargs=(model, threads, self.token, precision),
         )
 
+    def submit(self, fn, *args) -> Future:
+        try:
+            return self._executor.submit(fn, *args)
+        except BrokenProcessPool as err:
+            self.broken = True
+            future: Future = Future()
+            future.set_exception(err)
+            return future
+
+    def start(self, backend: str) -> None:
+        """Block until every worker has loaded the model and built ``backend``.
+
+        Processes spawn on demand, so without this the first batch would
+        start while some workers are still loading.
+        """
+        ready: set[int] = set()
+        while len(ready) < self.workers and not self.broken:
+            before = len(ready)
+            for future in [self.submit(_pool_ready, backend) for _ in range(self.workers)]:
+                try:
+                    ready.add(future.result())
+                except BrokenProcessPool:
+                    self.broken = True
+                except Exception:  # pragma: no cover - the batch reports it per image
+                    return
+            if len(ready) == before:
+                time.sleep(_POLL_INTERVAL)  # the ready workers took every probe
+
+    def quality_psnr(self) -> Optional[float]:
+        """PSNR of the workers' bf16/int8 model against fp32 (asked once)."""
+        if self._quality_psnr is None:
+            self._quality_psnr = self.submit(_pool_quality_psnr)
+        try:
+            return self._quality_psnr.result()
+        except BrokenProcessPool:
+            self.broken = True  # the batch reports the failure per image
+            return None
+
+    def close(self) -> None:
+        self.token.cancel()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
 
 # ----------------------------------------------------------------------
 # Utility helpers
 
 
+def load_torch():
+    """Import torch once, returning ``None`` when it is not installed."""
+    global torch, _torch_import_error
+    with _torch_lock:
+        if torch is None and _torch_import_error is None:
+            try:
+                import torch as _torch
+            except ImportError as exc:  # pragma: no cover - handled downstream
+                _torch_import_error = exc
+            else:
+                torch = _torch
+    return torch
+
+
 def _import_realesrgan() -> tuple[object, object]:
     try:
-        from realesrgan import RealESRGANer as _RealESRGANer
+        from realesrgan.archs.srvgg_arch import SRVGGNetCompact as _SRVGGNetCompact
         from basicsr.archs.rrdbnet_arch import RRDBNet as _RRDBNet
     except Exception as exc:  # pragma: no cover - import errors tested manually
         raise ModuleNotFoundError(
             "Falha ao importar realesrgan/basicsr. Garanta que as dependências foram instaladas e aplique o patch em basicsr, se necessário."
         ) from exc
-    return _RealESRGANer, _RRDBNet
+    return _RRDBNet, _SRVGGNetCompact
+
+
+@dataclasses.dataclass(slots=True)
+class _NetworkSpec:
+    """Architecture hyper-parameters recovered from a checkpoint."""
+
+    arch: str  # "rrdb" or "srvgg"
+    scale: int
+    num_feat: int
+    depth: int  # RRDB blocks or SRVGG body convolutions
+    num_grow_ch: int = 32
+    act_type: str = "prelu"
+
+    def build(self):
+        if self.arch == "srvgg":
+            return SRVGGNetCompact(
+                num_in_ch=3,
+                num_out_ch=3,
+                num_feat=self.num_feat,
+                num_conv=self.depth,
+                upscale=self.scale,
+                act_type=self.act_type,
+            )
+        return RRDBNet(
+            num_in_ch=3,
+            num_out_ch=3,
+            num_feat=self.num_feat,
+            num_block=self.depth,
+            num_grow_ch=self.num_grow_ch,
+            scale=self.scale,
+        )
+
+
+def _load_state_dict(path: Path) -> dict:
+    checkpoint = torch.load(str(path), map_location="cpu")
+    for key in ("params_ema", "params"):
+        if isinstance(checkpoint, dict) and key in checkpoint:
+            return checkpoint[key]
+    return checkpoint
+
+
+def _checkpoint_scale(path: Path) -> Optional[int]:
+    """Upscale factor of the network saved in ``path``; ``None`` if it cannot be read.
+
+    Unreadable checkpoints keep the scale from their name: loading the model
+    reports the actual error.
+    """
+    if load_torch() is None:
+        return None
+    try:
+        return _detect_network(_load_state_dict(path)).scale
+    except Exception:
+        return None
+
+
+def _detect_network(state_dict: dict) -> _NetworkSpec:
+    """Work out which Real-ESRGAN architecture ``state_dict`` belongs to.
+
+    RRDBNet checkpoints have ``conv_first``/``body.N.rdbM`` keys; the block
+    count comes from the highest ``body`` index, and the x2/x1 variants are
+    recognised by the pixel-unshuffled input channels (12/48 instead of 3).
+    SRVGGNetCompact (e.g. ``realesr-general-x4v3``) is a flat ``body`` list
+    alternating conv and activation layers, ending in a conv that produces
+    ``3 * scale²`` channels for the pixel shuffle.
+    """
+    if "conv_first.weight" in state_dict:
+        conv_first = state_dict["conv_first.weight"]
+        blocks = {int(key.split(".")[1]) for key in state_dict if key.startswith("body.")}
+        in_channels = conv_first.shape[1]
+        scale = {3: 4, 12: 2, 48: 1}.get(in_channels)
+        if scale is None:
+            raise ValueError(f"Checkpoint RRDBNet com {in_channels} canais de entrada não suportado.")
+        return _NetworkSpec(
+            arch="rrdb",
+            scale=scale,
+            num_feat=conv_first.shape[0],
+            depth=max(blocks) + 1,
+            num_grow_ch=state_dict["body.0.rdb1.conv1.weight"].shape[0],
+        )
+    if "body.0.weight" in state_dict:
+        convs = sorted(
+            int(key.split(".")[1])
+            for key, value in state_dict.items()
+            if key.startswith("body.") and key.endswith(".weight") and value.ndim == 4
+        )
+        out_channels = state_dict[f"body.{convs[-1]}.weight"].shape[0]
+        scale = int(round((out_channels / 3) ** 0.5))
+        if scale * scale * 3 != out_channels:
+            raise ValueError(f"Checkpoint SRVGG com {out_channels} canais de saída não suportado.")
+        return _NetworkSpec(
+            arch="srvgg",
+            scale=scale,
+            num_feat=state_dict["body.0.weight"].shape[0],
+            depth=len(convs) - 2,
+            act_type="prelu" if "body.1.weight" in state_dict else "leakyrelu",
+        )
+    raise ValueError("Arquitetura do checkpoint não reconhecida (esperado RRDBNet ou SRVGGNetCompact).")
+
+
+def check_tile_settings(tile_size: int, tile_overlap: int) -> None:
+    """Raise ``ValueError`` unless the tile size and overlap describe a valid tiling."""
+    if tile_size < 0:
+        raise ValueError(f"Tamanho de tile inválido: {tile_size}")
+    if tile_size > 0 and not 0 <= tile_overlap < tile_size:
+        raise ValueError(
+            f"Sobreposição de tile inválida: {tile_overlap} (deve ficar entre 0 e {tile_size - 1})"
+        )
+
+
+def _tile_starts(length: int, tile_size: int, tile_overlap: int) -> List[int]:
+    """Return tile offsets covering ``length`` with at least ``tile_overlap`` shared pixels.
+
+    The last tile is pulled back so it ends exactly at ``length``; every tile
+    therefore has the full ``tile_size`` whenever the image is large enough.
+    """
+    if length <= tile_size:
+        return [0]
+    step = tile_size - tile_overlap
+    starts = list(range(0, length - tile_size + 1, step))
+    if starts[-1] + tile_size < length:
+        starts.append(length - tile_size)
+    return starts
+
+
+def _blend_ramp(size: int, fade: int) -> np.ndarray:
+    """Weights for a tile edge: ``fade`` values rising from ~0 to ~1, then 1."""
+    ramp = np.ones(size, dtype=np.float32)
+    fade = min(fade, size)
+    if fade > 0:
+        ramp[:fade] = (np.arange(fade, dtype=np.float32) + 0.5) / fade
+    return ramp
+
+
+def _enhance_tiled(
+    model,
+    bgr: np.ndarray,
+    scale: int,
+    tile_size: int,
+    tile_overlap: int,
+    device,
+    half: bool,
+    token: Optional[CancellationToken] = None,
+    arena: Optional["_BufferArena"] = None,
+    metrics: Optional[ImageMetrics] = None,
+) -> np.ndarray:
+    """Upscale an ``HxWx3`` uint8 BGR array tile by tile.
+
+    Tiles are processed in raster order and written straight into the uint8
+    output. Where a tile overlaps the ones above/left of it, its result is
+    cross-faded with what is already there using a linear ramp, so the weight
+    of every tile border is zero and no seam is visible. Besides the input and
+    output arrays, memory usage only depends on ``tile_size``.
+
+    ``token`` is checked before every tile so long images can be paused or
+    cancelled mid-way. With an ``arena`` the input tensors and the output
+    array are reused across same-sized tiles and images. ``metrics`` collects
+    the preprocess/inference/postprocess time of every tile.
+    """
+    load_torch()
+    height, width = bgr.shape[:2]
+    shape = (height * scale, width * scale, 3)
+    if arena is not None:
+        output = arena.acquire((height, width, scale, "uint8"), lambda: np.empty(shape, dtype=np.uint8))
+    else:
+        output = np.empty(shape, dtype=np.uint8)
+    ys = _tile_starts(height, tile_size, tile_overlap)
+    xs = _tile_starts(width, tile_size, tile_overlap)
+
+    prev_y_end = 0
+    for y0 in ys:
+        y1 = min(y0 + tile_size, height)
+        ramp_y = _blend_ramp((y1 - y0) * scale, max(prev_y_end - y0, 0) * scale)
+        prev_x_end = 0
+        for x0 in xs:
+            x1 = min(x0 + tile_size, width)
+            ramp_x = _blend_ramp((x1 - x0) * scale, max(prev_x_end - x0, 0) * scale)
+            if token is not None:
+                token.checkpoint()
+            tile_sr = _forward_tile(model, bgr[y0:y1, x0:x1], scale, device, half, arena, metrics)
+
+            with _timed(metrics, "postprocess"):
+                region = output[y0 * scale : y1 * scale, x0 * scale : x1 * scale]
+                if y0 > 0 or x0 > 0:
+                    mask = (ramp_y[:, None] * ramp_x[None, :])[:, :, None]
+                    tile_bgr = tile_sr.permute(1, 2, 0).numpy()[:, :, ::-1]
+                    region[...] = np.rint(region * (1.0 - mask) + tile_bgr * mask)
+                else:
+                    _store_bgr(tile_sr.round_(), region)
+            prev_x_end = x1
+        prev_y_end = y1
+    return output
+
+
+def _forward_tile(
+    model,
+    tile: np.ndarray,
+    scale: int,
+    device,
+    half: bool,
+    arena: Optional["_BufferArena"] = None,
+    metrics: Optional[ImageMetrics] = None,
+):
+    """Run ``model`` on one uint8 BGR tile, returning a float32 ``3xHxW`` RGB CPU tensor in [0, 255]."""
+    start = time.perf_counter()
+    height, width = tile.shape[:2]
+    padded_h, padded_w = _padded_size(height, width, scale)
+    shape = (1, 3, padded_h, padded_w)
+    dtype = torch.float16 if half else torch.float32
+    if arena is not None:
+        tensor = arena.acquire(
+            (padded_h, padded_w, scale, str(dtype), str(device)),
+            lambda: torch.empty(shape, dtype=dtype, device=device),
+        )
+    else:
+        tensor = torch.empty(shape, dtype=dtype, device=device)
+
+    _fill_input(tensor[0], tile)
+    preprocessed = time.perf_counter()
+
+    with torch.no_grad():
+        result = model(tensor)
+    if metrics is not None and result.is_cuda:
+        torch.cuda.synchronize(result.device)  # charge the kernels to inference
+    inferred = time.perf_counter()
+    if arena is not None:
+        arena.release(tensor)
+    result = result[0, :, : height * scale, : width * scale]
+    if result.device.type != "cpu" or result.dtype != torch.float32:
+        result = result.float().cpu()
+    result = result.clamp_(0, 1).mul_(255.0)
+    if metrics is not None:
+        metrics.add("preprocess", preprocessed - start)
+        metrics.add("inference", inferred - preprocessed)
+        metrics.add("postprocess", time.perf_counter() - inferred)
+    return result
+
+
+def _enhance_batch(
+    model,
+    arrays: List[np.ndarray],
+    scale: int,
+    device,
+    half: bool,
+    metrics: Optional[List[Optional[ImageMetrics]]] = None,
+) -> List[np.ndarray]:
+    """Upscale several small uint8 BGR arrays in a single forward pass.
+
+    Every input is padded up to the largest one by replicating its last row
+    and column, so same-sized inputs come out as ``_enhance_tiled`` would
+    produce them one at a time; smaller ones may differ along their
+    bottom/right edge. Each entry of ``metrics`` gets an equal share of the
+    batch time.
+    """
+    load_torch()
+    start = time.perf_counter()
+    sizes = [_padded_size(*array.shape[:2], scale) for array in arrays]
+    shape = (len(arrays), 3, max(h for h, _ in sizes), max(w for _, w in sizes))
+    tensor = torch.empty(shape, dtype=torch.float16 if half else torch.float32, device=device)
+    for index, array in enumerate(arrays):
+        _fill_input(tensor[index], array)
+    preprocessed = time.perf_counter()
+
+    with torch.no_grad():
+        result = model(tensor)
+    if result.is_cuda:
+        torch.cuda.synchronize(result.device)
+    inferred = time.perf_counter()
+    outputs = []
+    for index, array in enumerate(arrays):
+        height, width = array.shape[:2]
+        sr = result[index, :, : height * scale, : width * scale]
+        if sr.device.type != "cpu" or sr.dtype != torch.float32:
+            sr = sr.float().cpu()
+        output = np.empty((height * scale, width * scale, 3), dtype=np.uint8)
+        _store_bgr(sr.clamp_(0, 1).mul_(255.0).round_(), output)
+        outputs.append(output)
+
+    share = 1.0 / len(arrays)
+    for entry in metrics or ():
+        if entry is not None:
+            entry.add("preprocess", (preprocessed - start) * share)
+            entry.add("inference", (inferred - preprocessed) * share)
+            entry.add("postprocess", (time.perf_counter() - inferred) * share)
+    return outputs
+
+
+def _padded_size(height: int, width: int, scale: int) -> tuple[int, int]:
+    # RRDBNet unshuffles x2/x1 inputs, so their sides must be multiples of 2/4
+    # (harmless padding for SRVGG).
+    mod = {2: 2, 1: 4}.get(scale, 1)
+    return height + (mod - height % mod) % mod, width + (mod - width % mod) % mod
+
+
+def _fill_input(target, tile: np.ndarray) -> None:
+    """Write a uint8 BGR tile into a float ``3xHxW`` RGB view in [0, 1], replicating its edges into the padding."""
+    height, width = tile.shape[:2]
+    # Single conversion copy: uint8 -> float with BGR -> RGB folded in.
+    for channel in range(3):
+        target[channel, :height, :width].copy_(torch.from_numpy(tile[:, :, 2 - channel]))
+    target[:, :height, :width].div_(255.0)
+    if target.shape[2] > width:  # replicate padding, in place
+        target[:, :height, width:] = target[:, :height, width - 1 : width]
+    if target.shape[1] > height:
+        target[:, height:, :] = target[:, height - 1 : height, :]
+
+
+def _batchable(array: np.ndarray, tile_size: int, policy: BatchingPolicy) -> bool:
+    """True when ``array`` is small enough to share a forward pass (one tile at most)."""
+    height, width = array.shape[:2]
+    return height * width <= policy.max_pixels and (tile_size <= 0 or max(height, width) <= tile_size)
+
+
+class _BatchScheduler:
+    """Coalesces single-image upscale requests from any thread into batches.
+
+    Requests are grouped by padded size (see ``BatchingPolicy.bucket``). A background
+    thread runs the oldest bucket as soon as it holds ``max_batch_size``
+    images or its first request has waited ``max_wait`` seconds, so the
+    policy bounds the latency added to any image.
+    """
+
+    def __init__(self, lazy_model: "_LazyModel", backend: str, policy: BatchingPolicy) -> None:
+        self.lazy_model = lazy_model
+        self.backend = backend
+        self.policy = policy
+        # bucket -> [(array, metrics, future, submitted at)], oldest bucket first
+        self._pending: "collections.OrderedDict[tuple[int, int], list]" = collections.OrderedDict()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="upvision-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, array: np.ndarray, metrics: Optional[ImageMetrics] = None) -> Future:
+        """Queue ``array``; the future resolves to its upscaled uint8 BGR array."""
+        future: Future = Future()
+        bucket = self._bucket(*array.shape[:2])
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Agendador de lotes encerrado.")
+            self._pending.setdefault(bucket, []).append((array, metrics, future, time.monotonic()))
+            self._condition.notify()
+        return future
+
+    def _bucket(self, height: int, width: int) -> tuple[int, int]:
+        # Sizes the model pads to the same shape anyway batch at no cost.
+        height, width = _padded_size(height, width, self.lazy_model.model_info.scale)
+        step = self.policy.bucket
+        if step > 1:
+            height, width = -(-height // step) * step, -(-width // step) * step
+        return height, width
+
+    def close(self) -> None:
+        """Stop accepting requests; the ones already queued still run."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+
+    def _next_batch(self) -> Optional[list]:
+        with self._condition:
+            while True:
+                if not self._pending:
+                    if self._closed:
+                        return None
+                    self._condition.wait()
+                    continue
+                bucket, requests = next(iter(self._pending.items()))
+                remaining = requests[0][3] + self.policy.max_wait - time.monotonic()
+                if len(requests) >= self.policy.max_batch_size or remaining <= 0 or self._closed:
+                    batch = requests[: self.policy.max_batch_size]
+                    del requests[: len(batch)]
+                    if not requests:
+                        del self._pending[bucket]
+                    return batch
+                self._condition.wait(remaining)
+
+    def _run(self) -> None:
+        while (batch := self._next_batch()) is not None:
+            batch = [request for request in batch if request[2].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                outputs = self.lazy_model.upscale_batch(
+                    [request[0] for request in batch],
+                    backend=self.backend,
+                    metrics=[request[1] for request in batch],
+                )
+            except Exception as err:  # pragma: no cover - runtime errors only
+                for request in batch:
+                    request[2].set_exception(err)
+            else:
+                for request, output in zip(batch, outputs):
+                    request[2].set_result(output)
+
+
+def _store_bgr(chw, region: np.ndarray) -> None:
+    """Copy a rounded float ``3xHxW`` RGB tensor into a uint8 ``HxWx3`` BGR view."""
+    target = torch.from_numpy(region)
+    for channel in range(3):
+        target[:, :, channel].copy_(chw[2 - channel])
+
+
+class _BufferArena:
+    """Pool of reusable buffers keyed by ``(H, W, scale, dtype)``.
+
+    Batches are usually made of same-sized images, so the model input tensors
+    and the uint8 output arrays of one image fit the next one. Buffers are
+    handed out with ``acquire`` and come back with ``release`` (output arrays
+    only once they have been encoded). Idle buffers beyond ``max_bytes`` are
+    dropped oldest first, and all of them are dropped while the system is low
+    on memory; ``clear`` releases everything at the end of a batch.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_BUFFER_ARENA_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._free: "collections.OrderedDict[tuple, list]" = collections.OrderedDict()
+        self._lent: dict[int, tuple] = {}  # id(buffer) -> key
+        self._idle_bytes = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, key: tuple, allocate):
+        with self._lock:
+            free = self._free.get(key)
+            buffer = free.pop() if free else None
+            if buffer is not None:
+                self._idle_bytes -= _nbytes(buffer)
+                if not free:
+                    del self._free[key]
+        if buffer is None:
+            buffer = allocate()
+        with self._lock:
+            self._lent[id(buffer)] = key
+        return buffer
+
+    def release(self, buffer) -> None:
+        """Return ``buffer`` to the pool; buffers the arena did not hand out are ignored."""
+        with self._lock:
+            key = self._lent.pop(id(buffer), None)
+            if key is None:
+                return
+            self._free.setdefault(key, []).append(buffer)
+            self._free.move_to_end(key)
+            self._idle_bytes += _nbytes(buffer)
+            self._trim(_memory_pressure())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._free.clear()
+            self._lent.clear()
+            self._idle_bytes = 0
+
+    @property
+    def idle_bytes(self) -> int:
+        return self._idle_bytes
+
+    def _trim(self, under_pressure: bool) -> None:
+        limit = 0 if under_pressure else self.max_bytes
+        while self._free and self._idle_bytes > limit:
+            key, free = next(iter(self._free.items()))
+            self._idle_bytes -= _nbytes(free.pop(0))
+            if not free:
+                del self._free[key]
+
+
+def _nbytes(buffer) -> int:
+    if isinstance(buffer, np.ndarray):
+        return buffer.nbytes
+    return buffer.numel() * buffer.element_size()
+
+
+def _memory_pressure() -> bool:
+    """True when less than 10% of RAM is available (Linux only; elsewhere never)."""
+    try:
+        with open("/proc/meminfo", encoding="ascii") as handle:
+            info = dict(line.split(":", 1) for line in handle)
+        total = int(info["MemTotal"].split()[0])
+        available = int(info["MemAvailable"].split()[0])
+    except (OSError, KeyError, ValueError):
+        return False
+    return available * 10 < total
+
+
+# Default OpenCV writer settings (profile ``original``), matching what PIL used
+# to produce.
+_ENCODE_PARAMS = {
+    ".jpg": [cv2.IMWRITE_JPEG_QUALITY, 95],
+    ".jpeg": [cv2.IMWRITE_JPEG_QUALITY, 95],
+    ".png": [cv2.IMWRITE_PNG_COMPRESSION, 6],
+    ".webp": [cv2.IMWRITE_WEBP_QUALITY, 80],
+}
+
+
+def _decode_image(path: Path) -> np.ndarray:
+    """Decode ``path`` into a uint8 BGR array (EXIF orientation is not applied)."""
+    # imdecode over np.fromfile instead of imread: imread cannot open
+    # non-ASCII paths on Windows.
+    data = np.fromfile(path, dtype=np.uint8)
+    bgr = cv2.imdecode(data, cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION) if data.size else None
+    if bgr is not None:
+        return bgr
+    # Formats OpenCV cannot read (GIF, exotic TIFFs...) go through PIL.
+    with Image.open(path) as img:
+        return np.array(img.convert("RGB"))[:, :, ::-1]
+
+
+def _encode_image(
+    bgr: np.ndarray, path: Path, params: tuple[int, ...] = (), metrics: Optional[ImageMetrics] = None
+) -> Path:
+    suffix = path.suffix.lower()
+    with _timed(metrics, "encode"):
+        try:
+            ok, encoded = cv2.imencode(suffix, bgr, list(params) or _ENCODE_PARAMS.get(suffix, []))
+        except cv2.error:
+            ok = False
+        if not ok:
+            # PIL compresses and writes in one go; all of it counts as encode.
+            image = Image.fromarray(np.ascontiguousarray(bgr[:, :, ::-1]))
+            return write_atomically(path, lambda tmp: image.save(tmp, Image.registered_extensions().get(suffix)))
+    # Replaced, never rewritten in place: the old file may be linked from the result cache.
+    with _timed(metrics, "write"):
+        return write_atomically(path, encoded.tofile)
+
+
+@contextlib.contextmanager
+def _timed(metrics: Optional[ImageMetrics], stage: str):
+    """Add the wall-clock time of the ``with`` body to ``metrics`` (if any) under ``stage``."""
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add(stage, time.perf_counter() - start)
+
+
+def _frame_signature(bgr: np.ndarray) -> np.ndarray:
+    """64x64 grayscale thumbnail used to spot repeated frames.
+
+    Area averaging washes out codec noise while a moving object still shifts
+    at least one cell, so comparing the largest cell difference catches
+    static scenes without swallowing small motion.
+    """
+    thumb = cv2.resize(bgr, (64, 64), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(thumb, cv2.COLOR_BGR2GRAY).astype(np.float32)
+
+
+def _is_similar(signature: Optional[np.ndarray], anchor: np.ndarray, threshold: Optional[float]) -> bool:
+    if signature is None or threshold is None:
+        return False
+    return float(np.max(np.abs(signature - anchor))) <= threshold
+
+
+def _put_until(target: "queue.Queue", item: object, stop: threading.Event) -> None:
+    """``put`` into a bounded queue, giving up once ``stop`` is set."""
+    while True:
+        try:
+            target.put(item, timeout=_POLL_INTERVAL)
+            return
+        except queue.Full:
+            if stop.is_set():
+                return
+
+
+def _output_path_for(image_path: Path, output_dir: Path, scale: int, suffix: Optional[str] = None) -> Path:
+    return output_dir / f"{image_path.stem}_x{scale}{suffix or image_path.suffix}"
 
 
 def _infer_scale(filename: str) -> int:
@@ -292,6 +2144,86 @@ def _infer_scale(filename: str) -> int:
     return 4  # default known scale for common checkpoints
 
 
+def _resolve_batching(batching: "str | BatchingPolicy") -> BatchingPolicy:
+    if isinstance(batching, BatchingPolicy):
+        return batching
+    if batching not in BATCHING_PRESETS:
+        raise ValueError(f"Modo de agrupamento desconhecido: {batching}")
+    return BATCHING_PRESETS[batching]
+
+
+def _default_precision(device: str) -> str:
+    return "fp16" if device.startswith("cuda") else "fp32"
+
+
+# Precisions checked against fp32 when a model is loaded.
+_REDUCED_PRECISIONS = ("bf16", "int8")
+
+
+def _resolve_precision(precision: Optional[str], device: str) -> str:
+    """Validate ``precision`` for ``device``, mapping ``auto``/``None`` to the default."""
+    if precision in (None, "auto"):
+        return _default_precision(device)
+    if precision not in PRECISION_CHOICES:
+        raise ValueError(f"Precisão desconhecida: {precision}")
+    if precision == "fp16" and device == "cpu":
+        raise ValueError("fp16 só é suportado em CUDA; em CPU use bf16 ou int8.")
+    if precision == "int8" and device != "cpu":
+        raise ValueError("int8 só é suportado em CPU.")
+    if precision == "bf16" and device == "cpu" and not _cpu_supports_bf16():
+        raise ValueError("Este processador não tem suporte a bf16.")
+    return precision
+
+
+def _cpu_supports_bf16() -> bool:
+    if load_torch() is None:
+        return False
+    check = getattr(torch.ops.mkldnn, "_is_mkldnn_bf16_supported", None)
+    return bool(check()) if check is not None else False
+
+
+def _quantize_int8(network):
+    """Return a copy of ``network`` with int8 weights in every conv layer.
+
+    Activations are quantised on the fly (dynamic quantisation), so no
+    calibration data is needed.
+    """
+    from torch.ao.nn.quantized import dynamic as quantized_dynamic
+    from torch.ao.quantization import default_dynamic_qconfig, quantize_dynamic
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return quantize_dynamic(
+            network,
+            {torch.nn.Conv2d: default_dynamic_qconfig},
+            dtype=torch.qint8,
+            mapping={torch.nn.Conv2d: quantized_dynamic.Conv2d},
+            inplace=False,
+        )
+
+
+def _quality_probe(size: int = 48) -> np.ndarray:
+    """Deterministic RGB test card: gradients, hard edges and fine noise."""
+    ramp = np.linspace(0, 255, size, dtype=np.float32)
+    probe = np.empty((size, size, 3), dtype=np.float32)
+    probe[..., 0] = ramp[None, :]
+    probe[..., 1] = ramp[:, None]
+    probe[..., 2] = 128
+    probe[size // 4 : size // 2, size // 4 : 3 * size // 4] = (255, 32, 0)
+    probe += np.random.default_rng(0).normal(0, 12, probe.shape).astype(np.float32)
+    return np.clip(probe, 0, 255).astype(np.uint8)
+
+
+def _psnr(expected: np.ndarray, actual: np.ndarray) -> float:
+    mse = float(np.mean((expected.astype(np.float32) - actual.astype(np.float32)) ** 2))
+    return float("inf") if mse == 0 else 10.0 * float(np.log10(255.0**2 / mse))
+
+
+def _release_device_memory() -> None:
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
 def _normalise_device(device: str) -> str:
     device = device.strip().lower()
     if device in {"cuda", "gpu"}:
@@ -299,6 +2231,6 @@ def _normalise_device(device: str) -> str:
     if device in {"cpu"}:
         return "cpu"
     if device in {"auto", "auto"}:
-        return "cuda" if torch and torch.cuda.is_available() else "cpu"
+        return "cuda" if load_torch() and torch.cuda.is_available() else "cpu"
     # Accept raw torch device strings (e.g., cuda:1)
     return device
@@ -0,0 +1,74 @@
+"""Small file-system helpers shared by the engine, caches and backends."""
+
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+
+def write_atomically(path: Path, write: Callable[[Path], object]) -> Path:
+    """Have ``write`` fill a temporary sibling of ``path``, then move it into place.
+
+    Besides never leaving half-written files behind, this replaces ``path``
+    instead of rewriting it in place: an output that is a hard link to a
+    ``ResultCache`` entry gets a new inode and the cached copy stays intact.
+    """
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return path
+
+
+def evict_lru(
+    root: Path,
+    pattern: str,
+    max_bytes: int,
+    target_bytes: Optional[int] = None,
+    last_used: Optional[Callable[[Path, os.stat_result], float]] = None,
+    on_evict: Optional[Callable[[Path], object]] = None,
+) -> tuple[int, int]:
+    """Delete the least recently used files matching ``pattern`` under ``root``.
+
+    Nothing is deleted while the files fit ``max_bytes``; otherwise the oldest
+    go until the rest fit ``target_bytes`` (default ``max_bytes``). Age comes
+    from ``last_used(path, stat)``, by default the modification time, and
+    ``on_evict`` is called for every deleted file. Temporary files of
+    ``write_atomically`` are neither counted nor removed.
+
+    Returns ``(bytes freed, bytes left)``.
+    """
+    if not root.exists():
+        return 0, 0
+    entries = []
+    total = 0
+    for path in root.glob(pattern):
+        if path.suffix == ".tmp":
+            continue
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((last_used(path, stat) if last_used else stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+    if total <= max_bytes:
+        return 0, total
+    target = max_bytes if target_bytes is None else target_bytes
+    freed = 0
+    entries.sort()
+    for _, size, path in entries:
+        if total - freed <= target:
+            break
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            continue
+        freed += size
+        if on_evict is not None:
+            on_evict(path)
+    return freed, total - freed
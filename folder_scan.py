@@ -0,0 +1,109 @@
+"""Incremental, cancellable discovery of images in large folder trees.
+
+``Path.rglob`` on the Tk thread froze the GUI for minutes on trees with
+hundreds of thousands of files. ``iter_files`` walks with ``os.scandir``
+(whose entries usually answer ``is_dir``/``is_file`` without an extra
+``stat``) and yields the matches in chunks, and ``FolderScan`` runs it on a
+background thread, forwarding each chunk to the GUI's event queue.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+DEFAULT_SCAN_CHUNK = 512
+
+
+def iter_files(
+    root: Path,
+    extensions: Iterable[str],
+    stop: Optional[threading.Event] = None,
+    chunk_size: int = DEFAULT_SCAN_CHUNK,
+) -> Iterator[List[Path]]:
+    """Yield lists of up to ``chunk_size`` files under ``root`` whose suffix is in ``extensions``.
+
+    Directories are visited depth first with their entries sorted by name, so
+    the order is stable between runs. Symlinked directories are not followed
+    (no cycles) and unreadable directories are skipped. Setting ``stop`` ends
+    the walk before the next directory entry.
+    """
+    extensions = {ext.lower() for ext in extensions}
+    pending = [os.fspath(root)]
+    chunk: List[Path] = []
+    while pending:
+        if stop is not None and stop.is_set():
+            return
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as iterator:
+                entries = sorted(iterator, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        subdirectories = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry.path)
+                elif os.path.splitext(entry.name)[1].lower() in extensions and entry.is_file():
+                    chunk.append(Path(entry.path))
+            except OSError:
+                continue
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+                if stop is not None and stop.is_set():
+                    return
+        # Reversed so the stack pops subdirectories in name order.
+        pending.extend(reversed(subdirectories))
+    if chunk:
+        yield chunk
+
+
+class FolderScan:
+    """Runs ``iter_files`` on a daemon thread and reports through ``event_queue``.
+
+    Each chunk is posted as ``("scan", (scan, paths))`` and the end as
+    ``("scan_done", (scan, found, cancelled))``; the scan object itself is
+    part of the payload so a GUI can ignore events of a scan it replaced.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        extensions: Iterable[str],
+        event_queue: "queue.Queue[tuple[str, object]]",
+        chunk_size: int = DEFAULT_SCAN_CHUNK,
+    ) -> None:
+        self.root = root
+        self.extensions = set(extensions)
+        self.event_queue = event_queue
+        self.chunk_size = chunk_size
+        self.found = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="upvision-folder-scan", daemon=True)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._stop.is_set()
+
+    def start(self) -> "FolderScan":
+        self._thread.start()
+        return self
+
+    def cancel(self) -> None:
+        self._stop.set()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        try:
+            for chunk in iter_files(self.root, self.extensions, self._stop, self.chunk_size):
+                self.found += len(chunk)
+                self.event_queue.put(("scan", (self, chunk)))
+        finally:
+            self.event_queue.put(("scan_done", (self, self.found, self.cancelled)))
@@ -0,0 +1,221 @@
+"""Galeria de comparação Original × Processada com rolagem virtualizada.
+
+Só existem widgets para as linhas perto da área visível: ao rolar, as linhas
+que saem da tela são reaproveitadas para as que entram. As miniaturas vêm do
+``ThumbnailLoader`` em segundo plano e apenas as das últimas
+``PHOTO_CACHE_ROWS`` linhas ficam decodificadas em memória, então abrir uma
+pasta com 10 mil saídas é imediato e o consumo de memória não cresce com ela.
+"""
+
+from __future__ import annotations
+
+import collections
+import tkinter as tk
+from pathlib import Path
+from tkinter import ttk
+from typing import Callable, Optional
+
+from PIL import ImageTk
+
+from thumbnails import Thumbnail, ThumbnailCache, ThumbnailLoader
+
+# Altura fixa de cada linha (nome + miniatura de até 400 px + resolução).
+ROW_HEIGHT = 480
+# Linhas montadas além da área visível, acima e abaixo.
+OVERSCAN_ROWS = 1
+# Linhas cujas miniaturas continuam em memória depois de sair da tela.
+PHOTO_CACHE_ROWS = 24
+SIDES = (("original", "Original"), ("processed", "Processada"))
+
+
+class _Row:
+    """Widgets de uma linha, reaproveitados para qualquer índice."""
+
+    def __init__(self, canvas: tk.Canvas) -> None:
+        self.frame = ttk.Frame(canvas)
+        self.item = canvas.create_window(0, 0, window=self.frame, anchor="nw", state="hidden")
+        self.index: Optional[int] = None
+        self.name_label = ttk.Label(self.frame, font=("Segoe UI", 10, "bold"))
+        self.name_label.pack(pady=(10, 10))
+        images_frame = ttk.Frame(self.frame)
+        images_frame.pack(fill=tk.X)
+        self.images: dict[str, ttk.Label] = {}
+        self.infos: dict[str, ttk.Label] = {}
+        for (side, title), pack_side, padx in zip(SIDES, (tk.LEFT, tk.RIGHT), ((0, 5), (5, 0))):
+            frame = ttk.LabelFrame(images_frame, text=title, padding=10)
+            frame.pack(side=pack_side, fill=tk.BOTH, expand=True, padx=padx)
+            self.images[side] = ttk.Label(frame, font=("Segoe UI", 8))
+            self.images[side].pack()
+            self.infos[side] = ttk.Label(frame, font=("Segoe UI", 8))
+            self.infos[side].pack(pady=(5, 0))
+
+
+class ComparisonGallery:
+    """Janela de comparação que monta apenas as linhas visíveis."""
+
+    def __init__(
+        self,
+        master: tk.Misc,
+        processed_images: list[Path],
+        find_original: Callable[[Path], Optional[Path]],
+        thumbnail_cache: ThumbnailCache,
+    ) -> None:
+        self.paths = sorted(processed_images)
+        self.find_original = find_original
+        self.loader = ThumbnailLoader(thumbnail_cache)
+        self._originals: dict[int, Optional[Path]] = {}
+        self._assigned: dict[int, _Row] = {}
+        self._free: list[_Row] = []
+        # (índice, lado) -> (PhotoImage, resolução original); LRU limitado.
+        self._photos: "collections.OrderedDict[tuple[int, str], tuple[ImageTk.PhotoImage, tuple[int, int]]]" = (
+            collections.OrderedDict()
+        )
+        self._errors: dict[tuple[int, str], str] = {}
+
+        self.window = tk.Toplevel(master)
+        self.window.title("Comparação de Imagens - UpVision")
+        self.window.geometry("1200x800")
+        self.window.minsize(800, 600)
+        self._build()
+        self.window.bind("<Destroy>", self._on_destroy)
+        self._pump()
+
+    # ------------------------------------------------------------------
+    # Construção
+
+    def _build(self) -> None:
+        header = ttk.Frame(self.window, padding=(10, 10, 10, 0))
+        header.pack(fill=tk.X)
+        ttk.Label(header, text="Comparação: Original × Processada", font=("Segoe UI", 14, "bold")).pack(side=tk.LEFT)
+        ttk.Button(header, text="Fechar", command=self.window.destroy).pack(side=tk.RIGHT)
+        ttk.Button(header, text="Próxima ▶", command=lambda: self._scroll_pages(1)).pack(side=tk.RIGHT, padx=(0, 10))
+        ttk.Button(header, text="◀ Anterior", command=lambda: self._scroll_pages(-1)).pack(side=tk.RIGHT, padx=(0, 5))
+        self.position_var = tk.StringVar()
+        ttk.Label(header, textvariable=self.position_var).pack(side=tk.RIGHT, padx=(0, 15))
+
+        body = ttk.Frame(self.window)
+        body.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.canvas = tk.Canvas(body, highlightthickness=0, yscrollincrement=40)
+        self.scrollbar = ttk.Scrollbar(body, orient="vertical", command=self._on_scrollbar)
+        self.canvas.configure(
+            yscrollcommand=self.scrollbar.set, scrollregion=(0, 0, 0, len(self.paths) * ROW_HEIGHT)
+        )
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.canvas.bind("<Configure>", lambda event: self._refresh())
+        self.window.bind("<MouseWheel>", lambda event: self._scroll_units(int(-1 * (event.delta / 120))))
+        self.window.bind("<Button-4>", lambda event: self._scroll_units(-3))  # X11
+        self.window.bind("<Button-5>", lambda event: self._scroll_units(3))
+        self.window.bind("<Prior>", lambda event: self._scroll_pages(-1))
+        self.window.bind("<Next>", lambda event: self._scroll_pages(1))
+        self.window.bind("<Home>", lambda event: self._jump(0.0))
+        self.window.bind("<End>", lambda event: self._jump(1.0))
+
+    # ------------------------------------------------------------------
+    # Rolagem
+
+    def _on_scrollbar(self, *args) -> None:
+        self.canvas.yview(*args)
+        self._refresh()
+
+    def _scroll_units(self, amount: int) -> None:
+        self.canvas.yview_scroll(amount, "units")
+        self._refresh()
+
+    def _scroll_pages(self, amount: int) -> None:
+        self.canvas.yview_scroll(amount, "pages")
+        self._refresh()
+
+    def _jump(self, fraction: float) -> None:
+        self.canvas.yview_moveto(fraction)
+        self._refresh()
+
+    def _refresh(self) -> None:
+        """Monta as linhas visíveis (mais ``OVERSCAN_ROWS``) e libera as demais."""
+        top = self.canvas.canvasy(0)
+        height = max(1, self.canvas.winfo_height())
+        width = self.canvas.winfo_width()
+        first_visible = int(top // ROW_HEIGHT)
+        last_visible = min(len(self.paths), int((top + height) // ROW_HEIGHT) + 1)
+        wanted = range(max(0, first_visible - OVERSCAN_ROWS), min(len(self.paths), last_visible + OVERSCAN_ROWS))
+
+        for index in [index for index in self._assigned if index not in wanted]:
+            row = self._assigned.pop(index)
+            for side, _ in SIDES:
+                self.loader.cancel((index, side))
+            self.canvas.itemconfigure(row.item, state="hidden")
+            row.index = None
+            self._free.append(row)
+        for index in wanted:
+            row = self._assigned.get(index)
+            if row is None:
+                row = self._free.pop() if self._free else _Row(self.canvas)
+                self._assigned[index] = row
+                self._bind_row(row, index)
+            self.canvas.coords(row.item, 0, index * ROW_HEIGHT)
+            self.canvas.itemconfigure(row.item, width=width, height=ROW_HEIGHT, state="normal")
+
+        if self.paths:
+            self.position_var.set(f"Imagens {first_visible + 1}–{max(first_visible + 1, last_visible)} de {len(self.paths)}")
+        else:
+            self.position_var.set("Nenhuma imagem")
+
+    def _bind_row(self, row: _Row, index: int) -> None:
+        row.index = index
+        processed = self.paths[index]
+        row.name_label.configure(text=processed.name)
+        if index not in self._originals:
+            self._originals[index] = self.find_original(processed)
+        for side, path in (("original", self._originals[index]), ("processed", processed)):
+            tag = (index, side)
+            if tag in self._photos:
+                self._photos.move_to_end(tag)
+                self._show(row, side)
+            elif tag in self._errors:
+                self._show(row, side)
+            elif path is None or not path.exists():
+                row.images[side].configure(image="", text="Original não encontrada")
+                row.infos[side].configure(text="")
+            else:
+                row.images[side].configure(image="", text="Carregando...")
+                row.infos[side].configure(text="")
+                self.loader.request(path, tag)
+
+    # ------------------------------------------------------------------
+    # Miniaturas
+
+    def _pump(self) -> None:
+        if not self.window.winfo_exists():
+            return
+        # Poucas por rodada para a janela continuar respondendo.
+        for tag, thumbnail in self.loader.drain(limit=16):
+            self._store(tag, thumbnail)
+            row = self._assigned.get(tag[0])
+            if row is not None:
+                self._show(row, tag[1])
+        self.window.after(50, self._pump)
+
+    def _store(self, tag: tuple[int, str], thumbnail: Thumbnail) -> None:
+        if thumbnail.image is None:
+            self._errors[tag] = thumbnail.error or "erro desconhecido"
+            return
+        self._photos[tag] = (ImageTk.PhotoImage(thumbnail.image), thumbnail.source_size)
+        while len(self._photos) > PHOTO_CACHE_ROWS * len(SIDES):
+            self._photos.popitem(last=False)
+
+    def _show(self, row: _Row, side: str) -> None:
+        tag = (row.index, side)
+        if tag in self._errors:
+            row.images[side].configure(image="", text=f"Erro ao carregar:\n{self._errors[tag]}")
+            row.infos[side].configure(text="")
+            return
+        photo, (width, height) = self._photos[tag]
+        row.images[side].configure(image=photo, text="")
+        row.images[side].image = photo  # Manter referência
+        row.infos[side].configure(text=f"{width}×{height}")
+
+    def _on_destroy(self, event) -> None:
+        if event.widget is self.window:
+            self.loader.close()
+            self._photos.clear()
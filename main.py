@@ -16,17 +16,54 @@ python main.py
 import os
 import queue
 import threading
+import time
 from pathlib import Path
 from tkinter import filedialog, messagebox, ttk
 import tkinter as tk
 
 from PIL import Image, ImageTk
 
-from engine import BatchResult, UpscaleEngine
+from engine import (
+    BACKEND_CHOICES,
+    DEFAULT_OUTPUT_PROFILE,
+    DEFAULT_TILE_OVERLAP,
+    OUTPUT_PROFILES,
+    PRECISION_CHOICES,
+    STAGES,
+    BatchResult,
+    CancellationToken,
+    DeviceSummary,
+    UpscaleEngine,
+)
+from folder_scan import FolderScan
+from gallery import ComparisonGallery
+from manifest import MANIFEST_NAME, ManifestEntry, load_manifest
+from thumbnails import ThumbnailCache
 
 APP_TITLE = "UpVision"
 APP_SUBTITLE = "Real-ESRGAN Upscale"
 PADDING = 16
+TILE_CHOICES = ("0", "256", "512", "1024")
+# Carrega o primeiro checkpoint e roda uma inferência mínima logo após abrir.
+WARM_UP_ON_START = True
+# Entrega de eventos ao Tk: cada rodada do ``_poll_queue`` trata até
+# POLL_MAX_EVENTS eventos, grava as linhas de log de uma vez e redesenha o
+# progresso no máximo a cada PROGRESS_INTERVAL_MS.
+POLL_INTERVAL_MS = 100
+POLL_MAX_EVENTS = 5000
+PROGRESS_INTERVAL_MS = 250
+# O painel de log guarda só as últimas linhas; o log completo pode ir para arquivo.
+LOG_MAX_LINES = 5000
+
+# Nomes exibidos para as etapas medidas pelo motor (``engine.STAGES``).
+STAGE_LABELS = {
+    "decode": "leitura",
+    "preprocess": "pré-processamento",
+    "inference": "inferência",
+    "postprocess": "pós-processamento",
+    "encode": "codificação",
+    "write": "gravação",
+}
 
 
 class UpscaleApp:
@@ -37,15 +74,25 @@ class UpscaleApp:
         self.root.minsize(820, 600)
 
         self.engine = UpscaleEngine()
-        self.device_summary = self.engine.get_device_summary()
+        # Preenchido em segundo plano por ``_start_engine_warmup`` (import do torch é lento).
+        self.device_summary: DeviceSummary | None = None
+        self.warmup_status = ""
         self.models = self.engine.list_models()
+        self.thumbnail_cache = ThumbnailCache(self.engine.app_dir / ".cache" / "thumbnails")
+        self._manifests: dict[Path, tuple[int, dict[str, ManifestEntry]]] = {}
         self.default_assets_dir = (self.engine.app_dir / "assets") if hasattr(self.engine, "app_dir") else None
 
         self.event_queue: "queue.Queue[tuple[str, object]]" = queue.Queue()
         self.selected_files: list[Path] = []
+        self._selected_set: set[Path] = set()  # mesmo conteúdo de selected_files, para deduplicar em O(1)
+        self.folder_scan: FolderScan | None = None
+        self.log_file = None  # arquivo aberto durante o lote quando "Salvar log completo" está marcado
+        self._pending_progress: tuple[int, int, str] | None = None
+        self._last_progress_update = 0.0
         self.output_dir: Path | None = None
         self.processing = False
         self.current_total = 0
+        self.cancel_token: CancellationToken | None = None
         self._first_run_sentinel = self.engine.app_dir / ".first_run_complete"
         self._first_run_active = False
         self._first_run_test_image: Path | None = None
@@ -62,7 +109,9 @@ class UpscaleApp:
         self._populate_devices()
         self._update_status_line()
         self._start_queue_poller()
+        self._start_engine_warmup()
         self._maybe_schedule_first_run()
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
 
     # ------------------------------------------------------------------
     # UI construction
@@ -111,8 +160,8 @@ class UpscaleApp:
         btn_select = ttk.Button(file_frame, text="Adicionar imagens…", command=self._on_select_files)
         btn_select.grid(row=0, column=0, sticky="w", padx=8, pady=8)
 
-        btn_select_folder = ttk.Button(file_frame, text="Adicionar pasta…", command=self._on_select_folder)
-        btn_select_folder.grid(row=0, column=1, sticky="w", padx=8, pady=8)
+        self.btn_select_folder = ttk.Button(file_frame, text="Adicionar pasta…", command=self._on_select_folder)
+        self.btn_select_folder.grid(row=0, column=1, sticky="w", padx=8, pady=8)
 
         btn_clear = ttk.Button(file_frame, text="Limpar lista", command=self._on_clear_files)
         btn_clear.grid(row=0, column=2, sticky="w", padx=8, pady=8)
@@ -146,13 +195,59 @@ class UpscaleApp:
         self.model_var = tk.StringVar()
         self.model_combo = ttk.Combobox(options_frame, textvariable=self.model_var, state="readonly")
         self.model_combo.grid(row=0, column=1, sticky="ew", padx=(0, 8), pady=8)
-        self.model_combo.bind("<<ComboboxSelected>>", lambda e: self._update_status_line())
+        self.model_combo.bind("<<ComboboxSelected>>", lambda e: self._on_model_selected())
 
         ttk.Label(options_frame, text="Dispositivo:").grid(row=0, column=2, sticky="w", padx=8, pady=8)
         self.device_var = tk.StringVar()
         self.device_combo = ttk.Combobox(options_frame, textvariable=self.device_var, state="readonly")
         self.device_combo.grid(row=0, column=3, sticky="ew", padx=(0, 8), pady=8)
 
+        ttk.Label(options_frame, text="Tile (0 = desativado):").grid(row=1, column=0, sticky="w", padx=8, pady=(0, 8))
+        self.tile_var = tk.StringVar(value=TILE_CHOICES[0])
+        self.tile_combo = ttk.Combobox(options_frame, textvariable=self.tile_var, values=TILE_CHOICES)
+        self.tile_combo.grid(row=1, column=1, sticky="ew", padx=(0, 8), pady=(0, 8))
+
+        ttk.Label(options_frame, text="Sobreposição:").grid(row=1, column=2, sticky="w", padx=8, pady=(0, 8))
+        self.tile_overlap_var = tk.StringVar(value=str(DEFAULT_TILE_OVERLAP))
+        self.tile_overlap_spin = ttk.Spinbox(
+            options_frame, from_=0, to=256, increment=8, textvariable=self.tile_overlap_var
+        )
+        self.tile_overlap_spin.grid(row=1, column=3, sticky="ew", padx=(0, 8), pady=(0, 8))
+
+        ttk.Label(options_frame, text="Processos (CPU):").grid(row=2, column=0, sticky="w", padx=8, pady=(0, 8))
+        self.workers_var = tk.StringVar(value="1")
+        self.workers_spin = ttk.Spinbox(
+            options_frame, from_=1, to=max(1, os.cpu_count() or 1), textvariable=self.workers_var
+        )
+        self.workers_spin.grid(row=2, column=1, sticky="ew", padx=(0, 8), pady=(0, 8))
+
+        ttk.Label(options_frame, text="Backend:").grid(row=2, column=2, sticky="w", padx=8, pady=(0, 8))
+        self.backend_var = tk.StringVar(value=BACKEND_CHOICES[0])
+        self.backend_combo = ttk.Combobox(
+            options_frame, textvariable=self.backend_var, values=BACKEND_CHOICES, state="readonly"
+        )
+        self.backend_combo.grid(row=2, column=3, sticky="ew", padx=(0, 8), pady=(0, 8))
+
+        ttk.Label(options_frame, text="Precisão:").grid(row=3, column=0, sticky="w", padx=8, pady=(0, 8))
+        self.precision_var = tk.StringVar(value=PRECISION_CHOICES[0])
+        self.precision_combo = ttk.Combobox(
+            options_frame, textvariable=self.precision_var, values=PRECISION_CHOICES, state="readonly"
+        )
+        self.precision_combo.grid(row=3, column=1, sticky="ew", padx=(0, 8), pady=(0, 8))
+
+        ttk.Label(options_frame, text="Formato de saída:").grid(row=3, column=2, sticky="w", padx=8, pady=(0, 8))
+        self.output_profile_var = tk.StringVar(value=DEFAULT_OUTPUT_PROFILE)
+        self.output_profile_combo = ttk.Combobox(
+            options_frame, textvariable=self.output_profile_var, values=tuple(OUTPUT_PROFILES), state="readonly"
+        )
+        self.output_profile_combo.grid(row=3, column=3, sticky="ew", padx=(0, 8), pady=(0, 8))
+
+        self.log_to_file_var = tk.BooleanVar(value=False)
+        self.log_to_file_check = ttk.Checkbutton(
+            options_frame, text="Salvar log completo na pasta de saída", variable=self.log_to_file_var
+        )
+        self.log_to_file_check.grid(row=4, column=0, columnspan=4, sticky="w", padx=8, pady=(0, 8))
+
         # Ações ----------------------------------------------------------
         actions_frame = ttk.Frame(main_frame)
         actions_frame.grid(row=4, column=0, columnspan=3, sticky="ew", pady=(0, 12))
@@ -161,11 +256,14 @@ class UpscaleApp:
         self.btn_start = ttk.Button(actions_frame, text="Iniciar upscale", command=self._on_start)
         self.btn_start.grid(row=0, column=0, sticky="ew", padx=(0, 8))
 
+        self.btn_pause = ttk.Button(actions_frame, text="Pausar", command=self._on_pause, state="disabled")
+        self.btn_pause.grid(row=0, column=1, sticky="e", padx=(0, 8))
+
         self.btn_stop = ttk.Button(actions_frame, text="Cancelar", command=self._on_cancel, state="disabled")
-        self.btn_stop.grid(row=0, column=1, sticky="e")
+        self.btn_stop.grid(row=0, column=2, sticky="e")
 
         self.btn_view_results = ttk.Button(actions_frame, text="Visualizar resultados", command=self._on_view_results)
-        self.btn_view_results.grid(row=0, column=2, sticky="e", padx=(8, 0))
+        self.btn_view_results.grid(row=0, column=3, sticky="e", padx=(8, 0))
 
         # Progresso ------------------------------------------------------
         progress_frame = ttk.LabelFrame(main_frame, text="Progresso")
@@ -216,7 +314,12 @@ class UpscaleApp:
     def _populate_devices(self) -> None:
         items = []
         default = "cpu"
-        if self.device_summary.torch_available:
+        if self.device_summary is None:
+            items.append("carregando…")
+            default = items[0]
+            self.device_combo.configure(state="disabled")
+        elif self.device_summary.torch_available:
+            self.device_combo.configure(state="readonly")
             items.append("cpu")
             if self.device_summary.cuda_available:
                 items.append("cuda")
@@ -230,6 +333,9 @@ class UpscaleApp:
 
     def _update_status_line(self) -> None:
         summary = self.device_summary
+        if summary is None:
+            self.status_var.set("Carregando PyTorch e detectando dispositivos…")
+            return
         if not summary.torch_available:
             self.status_var.set("Torch não instalado. Instale torch/torchvision/torchaudio para continuar.")
             return
@@ -253,15 +359,45 @@ class UpscaleApp:
 
         self.status_var.set(
             f"Torch {summary.torch_version} | CUDA compilado: {summary.torch_cuda_compiled or '—'} | CUDA disponível: {cuda_text} | GPU: {gpu_name} | Modelo: {model_text}"
+            + (f" | {self.warmup_status}" if self.warmup_status else "")
         )
 
     def _append_log(self, message: str) -> None:
-        print(message, flush=True)
+        self._append_log_lines([message])
+
+    def _append_log_lines(self, lines: list[str]) -> None:
+        """Grava várias linhas de uma vez, mantendo só as ``LOG_MAX_LINES`` últimas no painel."""
+        if not lines:
+            return
+        text = "\n".join(lines) + "\n"
+        print(text, end="", flush=True)
+        if self.log_file is not None:
+            self.log_file.write(text)
+            self.log_file.flush()
         self.log_text.configure(state="normal")
-        self.log_text.insert("end", message + "\n")
+        self.log_text.insert("end", text)
+        # "end-1c" fica no início da linha vazia após o último "\n".
+        excess = int(self.log_text.index("end-1c").split(".")[0]) - 1 - LOG_MAX_LINES
+        if excess > 0:
+            self.log_text.delete("1.0", f"{excess + 1}.0")
         self.log_text.see("end")
         self.log_text.configure(state="disabled")
 
+    def _open_log_file(self, output_dir: Path) -> None:
+        path = output_dir / time.strftime("upvision-%Y%m%d-%H%M%S.log")
+        try:
+            output_dir.mkdir(parents=True, exist_ok=True)
+            self.log_file = open(path, "a", encoding="utf-8")
+        except OSError as exc:
+            self._append_log(f"[AVISO] Não foi possível criar o arquivo de log: {exc}")
+            return
+        self._append_log(f"Log completo em: {path}")
+
+    def _close_log_file(self) -> None:
+        if self.log_file is not None:
+            self.log_file.close()
+            self.log_file = None
+
     def _load_brand_assets(self) -> None:
         if not self.logo_path.exists():
             self._append_log(
@@ -347,16 +483,27 @@ class UpscaleApp:
 
     def _set_processing_state(self, processing: bool) -> None:
         self.processing = processing
-        for widget in (self.model_combo, self.device_combo, self.files_list):
+        for widget in (
+            self.model_combo,
+            self.device_combo,
+            self.tile_combo,
+            self.tile_overlap_spin,
+            self.workers_spin,
+            self.files_list,
+            self.log_to_file_check,
+        ):
             widget.configure(state="disabled" if processing else "normal")
+        for combo in (self.backend_combo, self.precision_combo, self.output_profile_combo):
+            combo.configure(state="disabled" if processing else "readonly")
         self._update_start_button()
         self.btn_stop.configure(state="normal" if processing else "disabled")
+        self.btn_pause.configure(state="normal" if processing else "disabled", text="Pausar")
 
     def _update_start_button(self) -> None:
         if self.processing:
             self.btn_start.configure(state="disabled")
             return
-        if not self.models or not self.device_summary.torch_available:
+        if not self.models or self.device_summary is None or not self.device_summary.torch_available:
             self.btn_start.configure(state="disabled")
         else:
             self.btn_start.configure(state="normal")
@@ -375,15 +522,42 @@ class UpscaleApp:
         filenames = filedialog.askopenfilenames(**dialog_kwargs)
         if not filenames:
             return
-        for name in filenames:
-            path = Path(name)
-            if path not in self.selected_files:
-                self.selected_files.append(path)
-                self.files_list.insert("end", path.name)
-        self.files_summary.set(f"{len(self.selected_files)} arquivo(s) selecionado(s).")
+        self._add_files(Path(name) for name in filenames)
+        if self.folder_scan is None:
+            self.files_summary.set(f"{len(self.selected_files)} arquivo(s) selecionado(s).")
+
+    def _add_files(self, paths) -> None:
+        """Acrescenta à lista os caminhos ainda não selecionados (uma inserção só no Listbox)."""
+        new_files = [path for path in paths if path not in self._selected_set]
+        if not new_files:
+            return
+        self._selected_set.update(new_files)
+        self.selected_files.extend(new_files)
+        self.files_list.insert("end", *(path.name for path in new_files))
+
+    def _on_model_selected(self) -> None:
+        self._update_status_line()
+        if self.processing or self.device_summary is None or not self.device_summary.torch_available:
+            return
+        model_name = self.model_var.get()
+        device = self.device_var.get().lower()
+        precision = self.precision_var.get()
+
+        def preload() -> None:
+            # Warms the engine's model cache so the next run starts right away.
+            try:
+                self.engine.preload(model_name, device, precision)
+            except Exception as exc:  # pragma: no cover - depende do ambiente
+                self.event_queue.put(("log", f"[AVISO] Não foi possível pré-carregar {model_name}: {exc}"))
+            else:
+                self.event_queue.put(("log", f"Modelo {model_name} carregado ({device})."))
+
+        threading.Thread(target=preload, daemon=True).start()
 
     def _on_clear_files(self) -> None:
+        self._cancel_folder_scan()
         self.selected_files.clear()
+        self._selected_set.clear()
         self.files_list.delete(0, "end")
         self.files_summary.set("Nenhuma imagem selecionada.")
 
@@ -394,16 +568,33 @@ class UpscaleApp:
         folder = filedialog.askdirectory(**dialog_kwargs)
         if not folder:
             return
-        folder_path = Path(folder)
+        # A varredura roda em segundo plano e chega em blocos pelo event_queue
+        # ("scan" / "scan_done"); o botão vira "Cancelar busca" enquanto isso.
+        self._cancel_folder_scan()
         exts = {".png", ".jpg", ".jpeg", ".bmp", ".tiff", ".webp"}
-        new_files = []
-        for path in folder_path.rglob("*"):
-            if path.is_file() and path.suffix.lower() in exts and path not in self.selected_files:
-                new_files.append(path)
-        self.selected_files.extend(new_files)
-        for path in new_files:
-            self.files_list.insert("end", path.name)
-        self.files_summary.set(f"{len(self.selected_files)} arquivo(s) selecionado(s).")
+        self.folder_scan = FolderScan(Path(folder), exts, self.event_queue).start()
+        self.btn_select_folder.configure(text="Cancelar busca", command=self._cancel_folder_scan)
+        self.files_summary.set(f"Procurando imagens em {folder}…")
+
+    def _cancel_folder_scan(self) -> None:
+        if self.folder_scan is None:
+            return
+        self.folder_scan.cancel()
+        self._finish_folder_scan(cancelled=True)
+
+    def _on_scan_chunk(self, scan: FolderScan, paths: list[Path]) -> None:
+        if scan is not self.folder_scan:
+            return  # bloco atrasado de uma busca cancelada
+        self._add_files(paths)
+        self.files_summary.set(
+            f"Procurando imagens… {scan.found} encontrada(s), {len(self.selected_files)} arquivo(s) selecionado(s)."
+        )
+
+    def _finish_folder_scan(self, cancelled: bool) -> None:
+        self.folder_scan = None
+        self.btn_select_folder.configure(text="Adicionar pasta…", command=self._on_select_folder)
+        summary = f"{len(self.selected_files)} arquivo(s) selecionado(s)."
+        self.files_summary.set(f"Busca cancelada. {summary}" if cancelled else summary)
 
     def _on_select_output_dir(self) -> None:
         dialog_kwargs = {"title": "Escolha a pasta de destino"}
@@ -415,12 +606,18 @@ class UpscaleApp:
             self.dest_var.set(directory)
 
     def _on_start(self) -> None:
+        if self.folder_scan is not None:
+            messagebox.showwarning(APP_TITLE, "Aguarde a busca de imagens terminar ou cancele-a.")
+            return
         if not self.selected_files:
             messagebox.showwarning(APP_TITLE, "Selecione pelo menos uma imagem.")
             return
         if self.output_dir is None:
             messagebox.showwarning(APP_TITLE, "Escolha a pasta de destino.")
             return
+        if self.device_summary is None:
+            messagebox.showinfo(APP_TITLE, "Aguarde o carregamento do PyTorch.")
+            return
         if self.model_var.get() not in {model.name for model in self.models}:
             messagebox.showwarning(APP_TITLE, "Escolha um checkpoint válido.")
             return
@@ -428,11 +625,25 @@ class UpscaleApp:
         if device_choice.startswith("cuda") and not self.device_summary.cuda_available:
             messagebox.showerror(APP_TITLE, "CUDA não está disponível neste ambiente.")
             return
+        try:
+            tile_size = int(self.tile_var.get() or 0)
+            tile_overlap = int(self.tile_overlap_var.get() or 0)
+            workers = max(1, int(self.workers_var.get() or 1))
+        except ValueError:
+            messagebox.showwarning(APP_TITLE, "Tile, sobreposição e processos devem ser números inteiros.")
+            return
+        if tile_size < 0 or (tile_size > 0 and not 0 <= tile_overlap < tile_size):
+            messagebox.showwarning(APP_TITLE, "A sobreposição deve ser menor que o tamanho do tile.")
+            return
 
+        if self.log_to_file_var.get():
+            self._open_log_file(self.output_dir)
         self._append_log("Iniciando processamento…")
+        self._pending_progress = None
         self.progress_var.set(0.0)
         self.progress_label.set("0 / {0}".format(len(self.selected_files)))
         self.current_total = len(self.selected_files)
+        self.cancel_token = CancellationToken()
         self._set_processing_state(True)
 
         thread = threading.Thread(
@@ -442,26 +653,50 @@ class UpscaleApp:
                 self.output_dir,
                 self.model_var.get(),
                 device_choice,
+                tile_size,
+                tile_overlap,
+                workers,
+                self.cancel_token,
+                self.backend_var.get(),
+                self.precision_var.get(),
+                self.output_profile_var.get(),
             ),
             daemon=True,
         )
         thread.start()
 
     def _on_cancel(self) -> None:
-        messagebox.showinfo(
-            "Cancelar", "O cancelamento imediato não está disponível. Aguarde a conclusão da imagem atual."
-        )
+        if self.cancel_token is None or self.cancel_token.cancelled:
+            return
+        self.cancel_token.cancel()
+        self.btn_stop.configure(state="disabled")
+        self.btn_pause.configure(state="disabled")
+        self._append_log("Cancelando… as imagens já concluídas serão mantidas.")
+
+    def _on_pause(self) -> None:
+        if self.cancel_token is None or self.cancel_token.cancelled:
+            return
+        if self.cancel_token.paused:
+            self.cancel_token.resume()
+            self.btn_pause.configure(text="Pausar")
+            self._append_log("Processamento retomado.")
+        else:
+            self.cancel_token.pause()
+            self.btn_pause.configure(text="Retomar")
+            self._append_log("Processamento pausado (o modelo continua carregado).")
 
     def _on_view_results(self) -> None:
         if not self.output_dir or not self.output_dir.exists():
             messagebox.showwarning(APP_TITLE, "Nenhuma pasta de destino definida ou não existe.")
             return
         
-        # Coletar imagens processadas
-        processed_images = []
-        for file_path in self.output_dir.iterdir():
-            if file_path.is_file() and file_path.suffix.lower() in ['.png', '.jpg', '.jpeg', '.tiff', '.webp']:
-                processed_images.append(file_path)
+        # Coletar imagens processadas (scandir evita um stat por arquivo em pastas grandes)
+        with os.scandir(self.output_dir) as entries:
+            processed_images = [
+                Path(entry.path)
+                for entry in entries
+                if Path(entry.name).suffix.lower() in ['.png', '.jpg', '.jpeg', '.tiff', '.webp'] and entry.is_file()
+            ]
         
         if not processed_images:
             messagebox.showinfo(APP_TITLE, "Nenhuma imagem processada encontrada na pasta de destino.")
@@ -471,118 +706,28 @@ class UpscaleApp:
         self._show_comparison_window(processed_images)
 
     def _show_comparison_window(self, processed_images: list[Path]) -> None:
-        """Mostra janela com imagens originais e processadas lado a lado."""
-        window = tk.Toplevel(self.root)
-        window.title("Comparação de Imagens - UpVision")
-        window.geometry("1200x800")
-        window.minsize(800, 600)
-        
-        # Frame principal com scrollbar
-        main_frame = ttk.Frame(window)
-        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        # Canvas e scrollbar para rolagem
-        canvas = tk.Canvas(main_frame)
-        scrollbar = ttk.Scrollbar(main_frame, orient="vertical", command=canvas.yview)
-        scrollable_frame = ttk.Frame(canvas)
-        
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-        
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        # Bind mousewheel para rolagem
-        def _on_mousewheel(event):
-            canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-        canvas.bind_all("<MouseWheel>", _on_mousewheel)
-        
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-        
-        # Título
-        title_label = ttk.Label(scrollable_frame, text="Comparação: Original × Processada", 
-                               font=("Segoe UI", 14, "bold"))
-        title_label.pack(pady=(0, 20))
-        
-        # Para cada imagem processada, tentar encontrar a original
-        for processed_path in sorted(processed_images):
-            self._add_image_comparison(scrollable_frame, processed_path)
-        
-        # Botão fechar
-        close_button = ttk.Button(scrollable_frame, text="Fechar", command=window.destroy)
-        close_button.pack(pady=20)
-
-    def _add_image_comparison(self, parent: ttk.Frame, processed_path: Path) -> None:
-        """Adiciona uma comparação de imagem ao frame."""
-        # Tentar encontrar imagem original
-        original_path = self._find_original_image(processed_path)
-        
-        # Frame para esta comparação
-        comparison_frame = ttk.Frame(parent)
-        comparison_frame.pack(fill=tk.X, pady=10)
-        
-        # Nome do arquivo
-        filename = processed_path.name
-        name_label = ttk.Label(comparison_frame, text=filename, font=("Segoe UI", 10, "bold"))
-        name_label.pack(pady=(0, 10))
-        
-        # Frame para imagens lado a lado
-        images_frame = ttk.Frame(comparison_frame)
-        images_frame.pack(fill=tk.X)
-        
-        # Imagem original
-        original_frame = ttk.LabelFrame(images_frame, text="Original", padding=10)
-        original_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
-        
-        if original_path and original_path.exists():
-            try:
-                original_img = Image.open(original_path)
-                # Redimensionar mantendo proporção
-                original_img.thumbnail((400, 400), Image.Resampling.LANCZOS)
-                original_photo = ImageTk.PhotoImage(original_img)
-                
-                original_label = ttk.Label(original_frame, image=original_photo)
-                original_label.image = original_photo  # Manter referência
-                original_label.pack()
-                
-                # Info da imagem
-                orig_info = f"{original_img.size[0]}×{original_img.size[1]}"
-                ttk.Label(original_frame, text=orig_info, font=("Segoe UI", 8)).pack(pady=(5, 0))
-                
-            except Exception as e:
-                ttk.Label(original_frame, text=f"Erro ao carregar:\n{str(e)}", 
-                         font=("Segoe UI", 8)).pack()
-        else:
-            ttk.Label(original_frame, text="Original não encontrada", 
-                     font=("Segoe UI", 8)).pack()
-        
-        # Imagem processada
-        processed_frame = ttk.LabelFrame(images_frame, text="Processada", padding=10)
-        processed_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(5, 0))
-        
+        """Abre a galeria virtualizada com imagens originais e processadas lado a lado."""
+        ComparisonGallery(self.root, processed_images, self._find_original_image, self.thumbnail_cache)
+
+    def _manifest_for(self, output_dir: Path) -> dict[str, ManifestEntry]:
+        """Manifesto da pasta de saída, relido apenas quando o arquivo muda."""
         try:
-            processed_img = Image.open(processed_path)
-            # Redimensionar mantendo proporção
-            processed_img.thumbnail((400, 400), Image.Resampling.LANCZOS)
-            processed_photo = ImageTk.PhotoImage(processed_img)
-            
-            processed_label = ttk.Label(processed_frame, image=processed_photo)
-            processed_label.image = processed_photo  # Manter referência
-            processed_label.pack()
-            
-            # Info da imagem
-            proc_info = f"{processed_img.size[0]}×{processed_img.size[1]}"
-            ttk.Label(processed_frame, text=proc_info, font=("Segoe UI", 8)).pack(pady=(5, 0))
-            
-        except Exception as e:
-            ttk.Label(processed_frame, text=f"Erro ao carregar:\n{str(e)}", 
-                     font=("Segoe UI", 8)).pack()
+            stamp = (output_dir / MANIFEST_NAME).stat().st_mtime_ns
+        except OSError:
+            return {}
+        cached = self._manifests.get(output_dir)
+        if cached is None or cached[0] != stamp:
+            cached = self._manifests[output_dir] = (stamp, load_manifest(output_dir))
+        return cached[1]
 
     def _find_original_image(self, processed_path: Path) -> Path | None:
         """Tenta encontrar a imagem original correspondente à processada."""
+        # Saídas do UpVision estão no manifesto da pasta: uma consulta só.
+        entry = self._manifest_for(processed_path.parent).get(processed_path.name)
+        if entry is not None and entry.source.exists():
+            return entry.source
+
+        # Pastas sem manifesto (versões antigas ou outras ferramentas): heurísticas de nome.
         # O padrão do Real-ESRGAN adiciona sufixo como _x2, _x4, etc.
         stem = processed_path.stem
         
@@ -597,7 +742,8 @@ class UpscaleApp:
                 # Também tentar na pasta de entrada se conhecida
                 if hasattr(self, 'selected_files') and self.selected_files:
                     for input_file in self.selected_files:
-                        if input_file.stem == original_stem and input_file.suffix == processed_path.suffix:
+                        # O perfil de saída pode ter trocado o formato.
+                        if input_file.stem == original_stem:
                             return input_file
         
         # Se não encontrou, tentar procurar por nome similar na pasta de entrada
@@ -630,28 +776,98 @@ class UpscaleApp:
     # ------------------------------------------------------------------
     # Background worker & queue polling
 
-    def _worker(self, images: list[Path], output_dir: Path, model_name: str, device: str) -> None:
+    def _worker(
+        self,
+        images: list[Path],
+        output_dir: Path,
+        model_name: str,
+        device: str,
+        tile_size: int = 0,
+        tile_overlap: int = DEFAULT_TILE_OVERLAP,
+        workers: int = 1,
+        token: CancellationToken | None = None,
+        backend: str = "eager",
+        precision: str = "auto",
+        output_profile: str = DEFAULT_OUTPUT_PROFILE,
+    ) -> None:
         try:
-            self.engine.process_batch(images, output_dir, model_name, device, self.event_queue)
+            self.engine.process_batch(
+                images,
+                output_dir,
+                model_name,
+                device,
+                self.event_queue,
+                tile_size=tile_size,
+                tile_overlap=tile_overlap,
+                workers=workers,
+                token=token,
+                backend=backend,
+                precision=precision,
+                output_profile=output_profile,
+            )
         except Exception as exc:
             self.event_queue.put(("error", str(exc)))
             self.event_queue.put(("done", None))
 
+    def _start_engine_warmup(self) -> None:
+        models = list(self.models)
+        backend = self.backend_var.get()
+
+        def warm_up() -> None:
+            summary = self.engine.get_device_summary()
+            self.event_queue.put(("engine_ready", summary))
+            if not (WARM_UP_ON_START and summary.torch_available and models):
+                return
+            model_name = models[0].name
+            device = summary.preferred_device()
+            self.event_queue.put(("warmup", f"Aquecendo {model_name}…"))
+            try:
+                self.engine.warm_up(model_name, device, backend=backend)
+            except Exception as exc:  # pragma: no cover - depende do ambiente
+                self.event_queue.put(("warmup", ""))
+                self.event_queue.put(("log", f"[AVISO] Pré-carregamento de {model_name} falhou: {exc}"))
+            else:
+                self.event_queue.put(("warmup", f"{model_name} pronto ({device})"))
+
+        threading.Thread(target=warm_up, daemon=True).start()
+
     def _start_queue_poller(self) -> None:
-        self.root.after(100, self._poll_queue)
+        self.root.after(POLL_INTERVAL_MS, self._poll_queue)
 
     def _poll_queue(self) -> None:
+        # Logs e progresso são acumulados e aplicados uma vez por rodada; os
+        # demais eventos esvaziam o acumulado antes, para manter a ordem.
+        lines: list[str] = []
         try:
-            while True:
+            for _ in range(POLL_MAX_EVENTS):
                 event, payload = self.event_queue.get_nowait()
                 if event == "log":
-                    self._append_log(str(payload))
-                elif event == "progress":
-                    current, total, filename = payload  # type: ignore[misc]
-                    self.progress_var.set((current / total) * 100.0 if total else 0.0)
-                    self.progress_label.set(f"Processando: {filename} ({current} / {total})")
-                elif event == "done":
+                    lines.append(str(payload))
+                    continue
+                if event == "progress":
+                    self._pending_progress = payload  # type: ignore[assignment]
+                    continue
+                if event == "metrics":
+                    continue  # só o total do evento "done" é exibido
+                self._append_log_lines(lines)
+                lines = []
+                self._flush_progress(force=True)
+                if event == "done":
                     self._finalise_run(payload)
+                elif event == "scan":
+                    scan, paths = payload  # type: ignore[misc]
+                    self._on_scan_chunk(scan, paths)
+                elif event == "scan_done":
+                    scan, _found, cancelled = payload  # type: ignore[misc]
+                    if scan is self.folder_scan:
+                        self._finish_folder_scan(cancelled)
+                elif event == "engine_ready":
+                    self.device_summary = payload  # type: ignore[assignment]
+                    self._populate_devices()
+                    self._update_status_line()
+                elif event == "warmup":
+                    self.warmup_status = str(payload)
+                    self._update_status_line()
                 elif event == "error":
                     error_text = str(payload)
                     self._append_log(f"[ERRO] {error_text}")
@@ -660,12 +876,29 @@ class UpscaleApp:
         except queue.Empty:
             pass
         finally:
-            self.root.after(100, self._poll_queue)
+            self._append_log_lines(lines)
+            self._flush_progress()
+            self.root.after(POLL_INTERVAL_MS, self._poll_queue)
+
+    def _flush_progress(self, force: bool = False) -> None:
+        """Aplica o último progresso recebido, no máximo a cada ``PROGRESS_INTERVAL_MS``."""
+        if self._pending_progress is None:
+            return
+        now = time.monotonic()
+        if not force and (now - self._last_progress_update) * 1000 < PROGRESS_INTERVAL_MS:
+            return
+        current, total, filename = self._pending_progress
+        self._pending_progress = None
+        self._last_progress_update = now
+        self.progress_var.set((current / total) * 100.0 if total else 0.0)
+        self.progress_label.set(f"Processando: {filename} ({current} / {total})")
 
     def _finalise_run(self, payload: object) -> None:
         self._set_processing_state(False)
+        self.cancel_token = None
+        cancelled = isinstance(payload, BatchResult) and payload.cancelled
         if not self._first_run_active:
-            self.progress_label.set("Concluído")
+            self.progress_label.set("Cancelado" if cancelled else "Concluído")
         first_run_active = self._first_run_active
         if first_run_active:
             self._close_test_alert()
@@ -675,6 +908,13 @@ class UpscaleApp:
             summary = (
                 f"Processadas: {payload.succeeded}/{payload.total} | Falhas: {payload.failed} | Tempo: {payload.duration:.2f}s"
             )
+            if payload.similar_skipped:
+                summary += f" | Repetidas reaproveitadas: {payload.similar_skipped}"
+            stage_summary = format_stage_summary(payload)
+            if stage_summary:
+                summary += f"\n{stage_summary}"
+            if cancelled:
+                summary = f"Cancelado pelo usuário. {summary}"
             self._append_log(summary)
             if show_dialogs:
                 messagebox.showinfo(APP_TITLE, summary)
@@ -682,6 +922,7 @@ class UpscaleApp:
         else:
             self._append_log("Execução encerrada.")
             first_run_success = False
+        self._close_log_file()
         if first_run_active:
             try:
                 if first_run_success:
@@ -696,7 +937,7 @@ class UpscaleApp:
                             self._append_log(f"[ERRO] Não foi possível remover {output_path.name}: {err}")
                     if removed_files:
                         self._append_log(
-                            "Imagens de teste removidas: " + ", ".join(removed_files)
+                            "Arquivos de teste removidos: " + ", ".join(removed_files)
                         )
                     self._append_log("Teste automático concluído com sucesso. Aplicativo pronto para uso.")
                     self._on_clear_files()
@@ -728,6 +969,9 @@ class UpscaleApp:
         def trigger() -> None:
             if self._first_run_sentinel.exists():
                 return
+            if self.device_summary is None:
+                self.root.after(500, trigger)
+                return
             if not test_image.exists():
                 self._append_log(
                     "Teste automático não executado: arquivo teste_realesrgan.jpg ausente."
@@ -735,6 +979,7 @@ class UpscaleApp:
                 return
             self._first_run_test_image = test_image
             self.selected_files = [test_image]
+            self._selected_set = {test_image}
             self.files_list.delete(0, "end")
             self.files_list.insert("end", test_image.name)
             self.files_summary.set("1 arquivo(s) selecionado(s).")
@@ -757,6 +1002,9 @@ class UpscaleApp:
                 expected_outputs.append(
                     destination / f"{test_image.stem}_x{model_info.scale}{test_image.suffix}"
                 )
+            # O lote também cria o manifesto da pasta; só é removido se não existia antes.
+            if not (destination / MANIFEST_NAME).exists():
+                expected_outputs.append(destination / MANIFEST_NAME)
             self._first_run_expected_outputs = expected_outputs
 
             self._append_log(
@@ -772,7 +1020,36 @@ class UpscaleApp:
     # Public entry point
 
     def run(self) -> None:
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            # Com vários processos, os workers e seus modelos ficam vivos entre lotes.
+            self.engine.close()
+
+    def _on_close(self) -> None:
+        """Fecha a janela cancelando o lote e a busca em andamento (``run`` encerra o motor)."""
+        if self.cancel_token is not None:
+            self.cancel_token.cancel()
+        if self.folder_scan is not None:
+            self.folder_scan.cancel()
+        self.root.destroy()
+
+
+def format_stage_summary(result: BatchResult) -> str:
+    """Resume ``result.stage_seconds``: tempo e fatia de cada etapa, a dominante e os megapixels."""
+    measured = sum(result.stage_seconds.values())
+    if measured <= 0:
+        return ""
+    parts = [
+        f"{STAGE_LABELS[stage]} {result.stage_seconds[stage]:.2f}s ({result.stage_seconds[stage] / measured:.0%})"
+        for stage in STAGES
+        if stage in result.stage_seconds
+    ]
+    slowest = max(result.stage_seconds, key=result.stage_seconds.__getitem__)
+    text = f"Etapas: {' · '.join(parts)} | Dominante: {STAGE_LABELS[slowest]}"
+    if result.input_pixels:
+        text += f" | {result.input_pixels / 1e6:.1f} MP → {result.output_pixels / 1e6:.1f} MP"
+    return text
 
 
 def main() -> None:
@@ -0,0 +1,154 @@
+"""Output → source manifest written next to the outputs of a batch.
+
+``process_batch`` appends one JSON line per written file to
+``<output_dir>/.upvision-manifest.jsonl`` with the source path, model, scale,
+image sizes and per-stage timings. Viewers and tools that need the original
+of an output load the manifest once (``load_manifest``) and look outputs up by
+file name instead of guessing from names and scanning the folder.
+
+Batches only append: re-running a batch into the same folder adds new lines,
+and the last line for an output wins when the manifest is loaded. Once the
+superseded lines outnumber the live ones (e.g. a folder re-run every night),
+``load_manifest`` rewrites the file with the live entries only.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Tuple
+
+from fileutil import write_atomically
+
+MANIFEST_NAME = ".upvision-manifest.jsonl"
+
+
+@dataclasses.dataclass(slots=True)
+class ManifestEntry:
+    """One output file and where it came from.
+
+    Sizes are ``(width, height)``; they are ``None`` for outputs reused from
+    the result cache, which are never decoded.
+    """
+
+    output: str  # file name, relative to the output folder
+    source: Path
+    model: str
+    scale: int
+    input_size: Optional[Tuple[int, int]] = None
+    output_size: Optional[Tuple[int, int]] = None
+    seconds: Dict[str, float] = dataclasses.field(default_factory=dict)
+    reuse: str = ""  # "", "cache" or "similar"
+    created: float = 0.0
+
+    def to_json(self) -> str:
+        data = dataclasses.asdict(self)
+        data["source"] = str(self.source)
+        data["seconds"] = {stage: round(value, 6) for stage, value in self.seconds.items()}
+        return json.dumps(data, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, line: str) -> "ManifestEntry":
+        data = json.loads(line)
+        return cls(
+            output=data["output"],
+            source=Path(data["source"]),
+            model=data["model"],
+            scale=int(data["scale"]),
+            input_size=_size(data.get("input_size")),
+            output_size=_size(data.get("output_size")),
+            seconds=dict(data.get("seconds") or {}),
+            reuse=data.get("reuse", ""),
+            created=float(data.get("created", 0.0)),
+        )
+
+
+class OutputManifest:
+    """Thread-safe appender for the manifest of one output folder."""
+
+    def __init__(self, output_dir: Path) -> None:
+        self.path = output_dir / MANIFEST_NAME
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        source: Path,
+        output: Path,
+        model: str,
+        scale: int,
+        input_size: Optional[Tuple[int, int]] = None,
+        output_size: Optional[Tuple[int, int]] = None,
+        seconds: Optional[Mapping[str, float]] = None,
+        reuse: str = "",
+    ) -> ManifestEntry:
+        entry = ManifestEntry(
+            output=output.name,
+            source=Path(source).resolve(),
+            model=model,
+            scale=scale,
+            input_size=input_size,
+            output_size=output_size,
+            seconds=dict(seconds or {}),
+            reuse=reuse,
+            created=time.time(),
+        )
+        line = entry.to_json() + "\n"
+        with self._lock:
+            # One short append per output: a crash mid-batch still leaves
+            # every finished output indexed.
+            with open(self.path, "a", encoding="utf-8") as handle:
+                handle.write(line)
+        return entry
+
+
+def load_manifest(output_dir: Path) -> Dict[str, ManifestEntry]:
+    """Return the manifest of ``output_dir`` keyed by output file name (empty if missing).
+
+    Malformed lines (e.g. a write cut short by a crash) are skipped. When
+    superseded and malformed lines outnumber the live entries, the file is
+    compacted to one line per output.
+    """
+    path = output_dir / MANIFEST_NAME
+    entries: Dict[str, ManifestEntry] = {}
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return entries
+    lines = data.decode("utf-8", errors="replace").splitlines()
+    for line in lines:
+        try:
+            entry = ManifestEntry.from_json(line)
+        except (ValueError, KeyError, TypeError):
+            continue
+        entries[entry.output] = entry
+    if len(lines) - len(entries) > len(entries):
+        _compact(path, entries, len(data))
+    return entries
+
+
+class _ManifestChanged(Exception):
+    pass
+
+
+def _compact(path: Path, entries: Mapping[str, ManifestEntry], size: int) -> None:
+    def write(tmp: Path) -> None:
+        with open(tmp, "w", encoding="utf-8") as handle:
+            handle.writelines(entry.to_json() + "\n" for entry in entries.values())
+        # A batch appended to the manifest meanwhile: keep its lines instead.
+        if path.stat().st_size != size:
+            raise _ManifestChanged()
+
+    try:
+        write_atomically(path, write)
+    except (_ManifestChanged, OSError):
+        pass
+
+
+def _size(value) -> Optional[Tuple[int, int]]:
+    if not value:
+        return None
+    width, height = value
+    return int(width), int(height)
@@ -0,0 +1,138 @@
+"""Persistent, content-addressed cache of upscaled images.
+
+Entries are keyed by the SHA-256 of the input file plus everything that can
+change the output (model name, scale and inference settings). A hit is served
+by hard-linking the cached file into the output folder (falling back to a copy
+across file systems), so re-running a batch over an unchanged folder skips
+inference entirely. The cache is trimmed to ``max_bytes`` by evicting the
+least recently used entries.
+
+Because an entry and an output may share an inode, outputs must never be
+rewritten in place: every writer goes through ``fileutil.write_atomically``,
+which swaps in a new file and leaves the cached one untouched. For the same
+reason a hit does not touch the entry itself (that would change the mtime of
+the user's output too); it touches an empty sidecar under ``.used/``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Mapping, Optional
+
+from fileutil import evict_lru, write_atomically
+
+DEFAULT_CACHE_MAX_BYTES = 2 * 1024**3
+
+_CHUNK_SIZE = 1024 * 1024
+# A trim goes below the limit so the next full scan is not due right away.
+_EVICT_TARGET = 0.9
+_USED_DIR = ".used"
+
+
+class ResultCache:
+    """Directory-backed cache mapping input content + settings to an output file."""
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_CACHE_MAX_BYTES) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Bytes in the cache as of the last scan plus what was stored since;
+        # ``None`` until the first ``evict`` scans the directory.
+        self._bytes: Optional[int] = None
+
+    # ------------------------------------------------------------------
+    # Keys
+
+    @staticmethod
+    def hash_file(path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as handle:
+            for chunk in iter(lambda: handle.read(_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def key_for(self, source: Path, model_name: str, scale: int, settings: Mapping[str, object]) -> str:
+        """Return the cache key for ``source`` processed with the given model and settings."""
+        params = json.dumps(
+            {"model": model_name, "scale": scale, "settings": dict(settings)}, sort_keys=True, default=str
+        )
+        digest = hashlib.sha256(self.hash_file(source).encode("ascii"))
+        digest.update(params.encode("utf-8"))
+        return digest.hexdigest()
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+
+    def lookup(self, key: str, suffix: str) -> Optional[Path]:
+        entry = self._entry_path(key, suffix)
+        if not entry.exists():
+            return None
+        used = self._used_path(entry)
+        try:
+            used.touch()  # mark as recently used for eviction
+        except FileNotFoundError:
+            used.parent.mkdir(parents=True, exist_ok=True)
+            used.touch()
+        return entry
+
+    def store(self, key: str, output_path: Path) -> None:
+        entry = self._entry_path(key, output_path.suffix)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        write_atomically(entry, lambda tmp: _link_or_copy(output_path, tmp))
+        with self._lock:
+            if self._bytes is not None:
+                self._bytes += entry.stat().st_size
+
+    def materialise(self, cached: Path, dest: Path) -> Path:
+        """Place the cached file at ``dest`` (replacing whatever is there)."""
+        if dest.exists() and dest.samefile(cached):
+            return dest
+        return write_atomically(dest, lambda tmp: _link_or_copy(cached, tmp))
+
+    # ------------------------------------------------------------------
+    # Maintenance
+
+    def evict(self) -> int:
+        """Delete least recently used entries once the cache exceeds ``max_bytes``.
+
+        The size is tracked as entries are stored, so the directory is only
+        scanned on the first call and when the limit is passed; a trim then
+        goes down to ``_EVICT_TARGET`` of the limit. Returns the number of
+        bytes freed.
+        """
+        with self._lock:
+            if self._bytes is not None and self._bytes <= self.max_bytes:
+                return 0
+            freed, self._bytes = evict_lru(
+                self.root,
+                "??/*",
+                self.max_bytes,
+                target_bytes=int(self.max_bytes * _EVICT_TARGET),
+                last_used=self._last_used,
+                on_evict=lambda entry: self._used_path(entry).unlink(missing_ok=True),
+            )
+            return freed
+
+    def _last_used(self, entry: Path, stat: os.stat_result) -> float:
+        try:
+            return max(stat.st_mtime, self._used_path(entry).stat().st_mtime)
+        except FileNotFoundError:
+            return stat.st_mtime
+
+    def _entry_path(self, key: str, suffix: str) -> Path:
+        return self.root / key[:2] / f"{key}{suffix.lower()}"
+
+    def _used_path(self, entry: Path) -> Path:
+        return self.root / _USED_DIR / entry.name
+
+
+def _link_or_copy(source: Path, dest: Path) -> None:
+    try:
+        os.link(source, dest)
+    except OSError:
+        shutil.copy2(source, dest)
@@ -0,0 +1,564 @@
+"""UpVision como serviço HTTP local: upscale sob demanda com o modelo sempre aquecido.
+
+Outros serviços da mesma máquina enviam imagens (ou caminhos) e recebem o
+resultado sem recarregar os pesos a cada job: um único ``UpscaleEngine``
+atende a fila, mantendo os modelos no LRU de modelos carregados. Só usa a
+biblioteca padrão (``asyncio``), sem framework web.
+
+Uso:
+    python server.py --model RealESRGAN_x4plus --port 8765 --queue-size 32
+
+Rotas:
+    POST /jobs                corpo com os bytes da imagem (``Content-Type: image/...``)
+                              ou JSON ``{"path": "/caminho/foto.jpg"}``. Responde
+                              202 com ``{"id": ...}``; com ``?wait=1`` espera e
+                              devolve a imagem ampliada. Opções (query ou JSON):
+                              ``model``, ``tile``, ``output_profile``.
+    GET  /jobs/<id>           estado do job em JSON.
+    GET  /jobs/<id>/result    imagem ampliada (409 enquanto não terminou).
+    GET  /health              modelo, profundidade da fila e contadores.
+
+Com a fila cheia (``--queue-size`` jobs aguardando), ``POST /jobs`` responde
+429 com ``Retry-After``: o chamador tenta de novo em vez de acumular trabalho.
+
+``--batching balanced``/``throughput`` (ou ``--max-batch-size``/``--max-batch-wait-ms``)
+atende vários jobs ao mesmo tempo e junta as imagens pequenas numa única
+inferência em lote; ``latency`` (padrão) processa um job por vez.
+O serviço escuta em 127.0.0.1 por padrão e aceita caminhos locais; não o
+exponha à rede.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import collections
+import dataclasses
+import json
+import queue
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from engine import (
+    BACKEND_CHOICES,
+    BATCHING_PRESETS,
+    DEFAULT_BATCHING,
+    DEFAULT_OUTPUT_PROFILE,
+    DEFAULT_TILE_OVERLAP,
+    OUTPUT_PROFILES,
+    PRECISION_CHOICES,
+    BatchingPolicy,
+    CancellationToken,
+    ImageMetrics,
+    UpscaleEngine,
+    check_tile_settings,
+)
+from manifest import load_manifest
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_QUEUE_SIZE = 32
+DEFAULT_MAX_UPLOAD_BYTES = 64 * 1024**2
+# Jobs concluídos mantidos (com seus arquivos) para consulta posterior.
+DEFAULT_KEEP_JOBS = 256
+
+CONTENT_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".webp": "image/webp",
+    ".bmp": "image/bmp",
+    ".tiff": "image/tiff",
+    ".tif": "image/tiff",
+}
+UPLOAD_SUFFIXES = {"image/png": ".png", "image/jpeg": ".jpg", "image/webp": ".webp", "image/bmp": ".bmp", "image/tiff": ".tiff"}
+
+STATUS_TEXT = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+}
+
+
+class HttpError(Exception):
+    """Erro convertido numa resposta JSON ``{"error": ...}`` com ``status``."""
+
+    def __init__(self, status: int, message: str, headers: Optional[dict[str, str]] = None) -> None:
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+@dataclasses.dataclass
+class Response:
+    status: int
+    body: bytes = b""
+    content_type: str = "application/json"
+    headers: dict[str, str] = dataclasses.field(default_factory=dict)
+
+
+@dataclasses.dataclass
+class Job:
+    """Uma imagem na fila do serviço."""
+
+    id: str
+    source: Path
+    model: str
+    options: dict[str, object]
+    upload: bool = False
+    status: str = "queued"  # queued, running, done, failed
+    output: Optional[Path] = None
+    error: Optional[str] = None
+    metrics: Optional[ImageMetrics] = None
+    created: float = dataclasses.field(default_factory=time.time)
+    finished: Optional[float] = None
+    done: asyncio.Event = dataclasses.field(default_factory=asyncio.Event)
+
+    @property
+    def finished_ok(self) -> bool:
+        return self.status == "done"
+
+    def to_json(self) -> dict[str, object]:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "model": self.model,
+            "source": None if self.upload else str(self.source),
+            "output": str(self.output) if self.output else None,
+            "error": self.error,
+            "metrics": dataclasses.asdict(self.metrics) if self.metrics else None,
+            "created": round(self.created, 3),
+            "finished": round(self.finished, 3) if self.finished else None,
+        }
+
+
+class UpscaleService:
+    """Fila assíncrona de jobs atendida por um único ``UpscaleEngine``.
+
+    Sem agrupamento, os jobs rodam um de cada vez numa thread dedicada. Com
+    uma ``BatchingPolicy`` em ``batch_options["batching"]``, até
+    ``max_batch_size`` jobs rodam em paralelo e o agendador do motor junta
+    suas imagens pequenas numa mesma inferência. A fila tem tamanho limitado
+    e o excesso é recusado com 429.
+    """
+
+    def __init__(
+        self,
+        engine: UpscaleEngine,
+        model_name: str,
+        device: str = "auto",
+        work_dir: Optional[Path] = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        max_upload_bytes: int = DEFAULT_MAX_UPLOAD_BYTES,
+        keep_jobs: int = DEFAULT_KEEP_JOBS,
+        batch_options: Optional[dict[str, object]] = None,
+    ) -> None:
+        self.engine = engine
+        self.model_name = model_name
+        self.device = device
+        self.work_dir = work_dir or Path(tempfile.mkdtemp(prefix="upvision-server-"))
+        self.queue_size = max(1, queue_size)
+        self.max_upload_bytes = max_upload_bytes
+        self.keep_jobs = keep_jobs
+        self.batch_options = dict(batch_options or {})
+        batching = self.batch_options.get("batching", DEFAULT_BATCHING)
+        policy = batching if isinstance(batching, BatchingPolicy) else BATCHING_PRESETS[batching]
+        self.concurrency = policy.max_batch_size
+        self.jobs: "collections.OrderedDict[str, Job]" = collections.OrderedDict()
+        self.token = CancellationToken()
+        self.processed = 0
+        self.rejected = 0
+        self._queue: Optional["asyncio.Queue[Job]"] = None
+        self._worker_task: Optional[asyncio.Task] = None
+        self._running: set[asyncio.Task] = set()
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="upvision-server")
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> asyncio.AbstractServer:
+        (self.work_dir / "uploads").mkdir(parents=True, exist_ok=True)
+        (self.work_dir / "outputs").mkdir(parents=True, exist_ok=True)
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._worker_task = asyncio.create_task(self._worker())
+        return await asyncio.start_server(self._handle, host, port)
+
+    async def close(self) -> None:
+        self.token.cancel()
+        tasks = [task for task in (self._worker_task, *self._running) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._executor.shutdown(wait=True)
+        self.engine.close()
+
+    # ------------------------------------------------------------------
+    # Fila
+
+    def submit(self, source: Path, model: str, options: dict[str, object], upload: bool = False) -> Job:
+        assert self._queue is not None, "serviço não iniciado"
+        job = Job(id=uuid.uuid4().hex, source=source, model=model, options=options, upload=upload)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            if upload:
+                source.unlink(missing_ok=True)
+            self._reject()
+        self.jobs[job.id] = job
+        self._forget_old_jobs()
+        return job
+
+    def check_capacity(self) -> None:
+        """Recusa com 429 enquanto a fila estiver cheia."""
+        if self._queue is not None and self._queue.full():
+            self._reject()
+
+    def _reject(self) -> None:
+        self.rejected += 1
+        raise HttpError(429, f"Fila cheia ({self.queue_size} jobs aguardando); tente novamente.", {"Retry-After": "1"})
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        slots = asyncio.Semaphore(self.concurrency)
+        while True:
+            await slots.acquire()
+            job = await self._queue.get()
+            task = asyncio.create_task(self._execute(job, slots))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _execute(self, job: Job, slots: asyncio.Semaphore) -> None:
+        assert self._queue is not None
+        job.status = "running"
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._run_job, job)
+        finally:
+            job.finished = time.time()
+            job.done.set()
+            self._queue.task_done()
+            slots.release()
+
+    def _run_job(self, job: Job) -> None:
+        """Roda ``process_batch`` para um job (na thread do serviço)."""
+        events: "queue.Queue[tuple[str, object]]" = queue.Queue()
+        output_dir = self.work_dir / "outputs" / job.id
+        options = {**self.batch_options, **job.options}
+        try:
+            result = self.engine.process_batch(
+                [job.source], output_dir, job.model, self.device, events, token=self.token, **options
+            )
+        except Exception as exc:
+            job.status, job.error = "failed", str(exc)
+            return
+        errors: List[str] = []
+        while not events.empty():
+            kind, payload = events.get_nowait()
+            if kind == "metrics":
+                job.metrics = payload  # type: ignore[assignment]
+            elif kind == "log" and str(payload).startswith("[ERRO]"):
+                errors.append(str(payload).split(": ", 1)[-1])
+        # A saída vem do manifesto da pasta (a pasta também guarda o próprio manifesto).
+        outputs = list(load_manifest(output_dir)) if result.succeeded else []
+        if outputs:
+            job.status, job.output = "done", output_dir / outputs[0]
+            self.processed += 1
+        else:
+            job.status = "failed"
+            job.error = errors[-1] if errors else "Processamento cancelado." if result.cancelled else "Falha no upscale."
+
+    def _forget_old_jobs(self) -> None:
+        """Descarta os jobs concluídos mais antigos (e seus arquivos) acima de ``keep_jobs``."""
+        excess = len(self.jobs) - self.keep_jobs
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.done.is_set()][: max(0, excess)]:
+            job = self.jobs.pop(job_id)
+            shutil.rmtree(self.work_dir / "outputs" / job.id, ignore_errors=True)
+            if job.upload:
+                job.source.unlink(missing_ok=True)
+
+    # ------------------------------------------------------------------
+    # HTTP
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                method, target, headers = await _read_head(reader)
+                length = int(headers.get("content-length", "0") or 0)
+                if length > self.max_upload_bytes:
+                    raise HttpError(413, f"Corpo maior que {self.max_upload_bytes} bytes.")
+                body = await reader.readexactly(length) if length else b""
+                response = await self._route(method, target, headers, body)
+            except HttpError as exc:
+                response = _json(exc.status, {"error": str(exc)}, exc.headers)
+            except ValueError as exc:
+                response = _json(400, {"error": str(exc)})
+            except (ConnectionError, asyncio.IncompleteReadError):
+                raise
+            except Exception as exc:
+                # Qualquer outro erro vira 500 em vez de fechar a conexão sem resposta.
+                print(f"[ERRO] Requisição falhou: {exc!r}", file=sys.stderr, flush=True)
+                response = _json(500, {"error": f"Erro interno: {exc}"})
+            await _write_response(writer, response)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, target: str, headers: dict[str, str], body: bytes) -> Response:
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+        if parts == ["health"]:
+            _require(method, "GET")
+            return _json(200, self._health())
+        if parts == ["jobs"]:
+            _require(method, "POST")
+            return await self._create_job(headers, body, query)
+        if len(parts) in (2, 3) and parts[0] == "jobs":
+            _require(method, "GET")
+            job = self.jobs.get(parts[1])
+            if job is None:
+                raise HttpError(404, f"Job desconhecido: {parts[1]}")
+            if len(parts) == 2:
+                return _json(200, {**job.to_json(), "position": self._position(job)})
+            if parts[2] == "result":
+                return await self._result(job)
+        raise HttpError(404, f"Rota desconhecida: {url.path}")
+
+    async def _create_job(self, headers: dict[str, str], body: bytes, query: dict[str, str]) -> Response:
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        upload = content_type != "application/json"
+        if upload:
+            if not body:
+                raise HttpError(400, "Envie os bytes da imagem ou um JSON com 'path'.")
+            fields = dict(query)
+        else:
+            payload = json.loads(body or b"{}")
+            if not isinstance(payload, dict):
+                raise HttpError(400, "O JSON deve ser um objeto.")
+            fields = {**query, **payload}
+            if not fields.get("path"):
+                raise HttpError(400, "JSON sem 'path'.")
+        model, options = self._job_options(fields)
+
+        if upload:
+            suffix = UPLOAD_SUFFIXES.get(content_type) or Path(str(fields.get("name", ""))).suffix.lower() or ".png"
+            source = self.work_dir / "uploads" / f"{uuid.uuid4().hex}{suffix}"
+        else:
+            source = Path(str(fields["path"])).expanduser()
+            if not source.is_file():
+                raise HttpError(400, f"Arquivo não encontrado: {source}")
+        self.check_capacity()  # antes de gravar um upload que seria recusado
+        if upload:
+            await asyncio.to_thread(source.write_bytes, body)
+        job = self.submit(source, model, options, upload)
+
+        if str(fields.get("wait", "")).lower() in ("1", "true", "yes"):
+            await job.done.wait()
+            if not job.finished_ok:
+                return _json(500, job.to_json())
+            return await self._result(job)
+        return _json(202, {**job.to_json(), "position": self._position(job)}, {"Location": f"/jobs/{job.id}"})
+
+    def _job_options(self, fields: dict) -> tuple[str, dict[str, object]]:
+        model = str(fields.get("model") or self.model_name)
+        if model not in {info.name for info in self.engine.list_models()}:
+            raise HttpError(400, f"Modelo desconhecido: {model}")
+        options: dict[str, object] = {}
+        if "tile" in fields:
+            try:
+                options["tile_size"] = int(fields["tile"])
+            except (TypeError, ValueError):
+                raise HttpError(400, f"tile inválido: {fields['tile']!r}") from None
+            overlap = self.batch_options.get("tile_overlap", DEFAULT_TILE_OVERLAP)
+            try:
+                check_tile_settings(options["tile_size"], overlap)  # type: ignore[arg-type]
+            except ValueError as exc:
+                raise HttpError(400, str(exc)) from None
+        if "output_profile" in fields:
+            if not isinstance(fields["output_profile"], str) or fields["output_profile"] not in OUTPUT_PROFILES:
+                raise HttpError(400, f"Perfil de saída desconhecido: {fields['output_profile']}")
+            options["output_profile"] = fields["output_profile"]
+        return model, options
+
+    async def _result(self, job: Job) -> Response:
+        if not job.done.is_set():
+            raise HttpError(409, f"Job {job.id} ainda está {job.status}.")
+        if not job.finished_ok or job.output is None:
+            raise HttpError(409, f"Job {job.id} falhou: {job.error}")
+        data = await asyncio.to_thread(job.output.read_bytes)
+        content_type = CONTENT_TYPES.get(job.output.suffix.lower(), "application/octet-stream")
+        return Response(200, data, content_type, {"X-Job-Id": job.id})
+
+    def _position(self, job: Job) -> Optional[int]:
+        if job.status != "queued":
+            return None
+        return sum(1 for other in self.jobs.values() if other.status == "queued" and other.created < job.created) + 1
+
+    def _health(self) -> dict[str, object]:
+        return {
+            "model": self.model_name,
+            "device": self.device,
+            "queue_depth": self.queue_depth,
+            "queue_size": self.queue_size,
+            "running": sum(1 for job in self.jobs.values() if job.status == "running"),
+            "concurrency": self.concurrency,
+            "processed": self.processed,
+            "rejected": self.rejected,
+        }
+
+
+async def _read_head(reader: asyncio.StreamReader) -> tuple[str, str, dict[str, str]]:
+    request_line = (await reader.readline()).decode("latin-1").strip()
+    try:
+        method, target, _version = request_line.split(" ", 2)
+    except ValueError:
+        raise HttpError(400, "Requisição HTTP inválida.") from None
+    headers: dict[str, str] = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1")
+        if line in ("\r\n", "\n", ""):
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+        if len(headers) > 100:
+            raise HttpError(400, "Cabeçalhos demais.")
+    return method.upper(), target, headers
+
+
+async def _write_response(writer: asyncio.StreamWriter, response: Response) -> None:
+    head = [
+        f"HTTP/1.1 {response.status} {STATUS_TEXT.get(response.status, '')}",
+        f"Content-Type: {response.content_type}",
+        f"Content-Length: {len(response.body)}",
+        "Connection: close",
+        *(f"{name}: {value}" for name, value in response.headers.items()),
+    ]
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + response.body)
+    await writer.drain()
+
+
+def _json(status: int, payload: object, headers: Optional[dict[str, str]] = None) -> Response:
+    return Response(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), headers=headers or {})
+
+
+def _require(method: str, expected: str) -> None:
+    if method != expected:
+        raise HttpError(405, f"Método {method} não suportado; use {expected}.")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serviço HTTP local de upscale com fila e modelo aquecido.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Endereço de escuta (default: {DEFAULT_HOST}).")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Porta (default: {DEFAULT_PORT}).")
+    parser.add_argument("-m", "--model", help="Checkpoint padrão dos jobs (default: primeiro encontrado).")
+    parser.add_argument("--models-dir", type=Path, help="Pasta com os checkpoints .pth (default: models_realesrgan/).")
+    parser.add_argument("--device", default="auto", help="cpu, cuda, cuda:N ou auto (default: auto).")
+    parser.add_argument("--tile", type=int, default=0, help="Tamanho do tile padrão; 0 desativa (default: 0).")
+    parser.add_argument(
+        "--tile-overlap",
+        type=int,
+        default=DEFAULT_TILE_OVERLAP,
+        help=f"Sobreposição entre tiles em pixels (default: {DEFAULT_TILE_OVERLAP}).",
+    )
+    parser.add_argument("--backend", choices=BACKEND_CHOICES, default="eager", help="Runtime de inferência (default: eager).")
+    parser.add_argument("--precision", choices=PRECISION_CHOICES, default="auto", help="Precisão numérica (default: auto).")
+    parser.add_argument(
+        "--output-profile",
+        choices=tuple(OUTPUT_PROFILES),
+        default=DEFAULT_OUTPUT_PROFILE,
+        help="Formato e compressão padrão das saídas (default: original).",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help=f"Jobs aguardando antes de responder 429 (default: {DEFAULT_QUEUE_SIZE}).",
+    )
+    parser.add_argument(
+        "--max-upload-mb",
+        type=int,
+        default=DEFAULT_MAX_UPLOAD_BYTES // 1024**2,
+        help=f"Tamanho máximo do corpo em MB (default: {DEFAULT_MAX_UPLOAD_BYTES // 1024**2}).",
+    )
+    parser.add_argument(
+        "--batching",
+        choices=tuple(BATCHING_PRESETS),
+        default=DEFAULT_BATCHING,
+        help="Latência x vazão: latency (um job por vez), balanced ou throughput (default: latency).",
+    )
+    parser.add_argument("--max-batch-size", type=int, help="Imagens por inferência em lote (sobrepõe --batching).")
+    parser.add_argument(
+        "--max-batch-wait-ms", type=float, help="Espera máxima por companhia para o lote, em ms (sobrepõe --batching)."
+    )
+    parser.add_argument("--work-dir", type=Path, help="Pasta para uploads e resultados (default: temporária).")
+    parser.add_argument("--no-cache", action="store_true", help="Ignora o cache de resultados.")
+    return parser.parse_args(argv)
+
+
+async def serve(args: argparse.Namespace) -> None:
+    engine = UpscaleEngine(args.models_dir)
+    models = engine.list_models()
+    if not models:
+        raise SystemExit(f"Nenhum modelo encontrado em {engine.models_dir}")
+    model_name = args.model or models[0].name
+    policy = BATCHING_PRESETS[args.batching]
+    if args.max_batch_size is not None:
+        policy = dataclasses.replace(policy, max_batch_size=max(1, args.max_batch_size))
+    if args.max_batch_wait_ms is not None:
+        policy = dataclasses.replace(policy, max_wait=max(0.0, args.max_batch_wait_ms) / 1000)
+    service = UpscaleService(
+        engine,
+        model_name,
+        args.device,
+        work_dir=args.work_dir,
+        queue_size=args.queue_size,
+        max_upload_bytes=args.max_upload_mb * 1024**2,
+        batch_options=dict(
+            tile_size=args.tile,
+            tile_overlap=args.tile_overlap,
+            backend=args.backend,
+            precision=args.precision,
+            output_profile=args.output_profile,
+            use_cache=not args.no_cache,
+            batching=policy,
+        ),
+    )
+    print(f"Aquecendo {model_name} ({args.device})...", flush=True)
+    await asyncio.to_thread(engine.warm_up, model_name, args.device, args.backend, args.precision)
+    server = await service.start(args.host, args.port)
+    print(f"Servindo em http://{args.host}:{args.port} (fila: {service.queue_size}, pasta: {service.work_dir})", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        print("Serviço encerrado.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""Testes da detecção de arquitetura dos checkpoints."""
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("realesrgan")
+
+import engine
+from engine import _detect_network
+
+
+@pytest.fixture(autouse=True)
+def _archs():
+    engine.RRDBNet, engine.SRVGGNetCompact = engine._import_realesrgan()
+
+
+def test_detects_rrdb_block_count_and_scale():
+    network = engine.RRDBNet(num_in_ch=3, num_out_ch=3, num_feat=32, num_block=3, num_grow_ch=16, scale=2)
+    spec = _detect_network(network.state_dict())
+    assert (spec.arch, spec.scale, spec.num_feat, spec.depth, spec.num_grow_ch) == ("rrdb", 2, 32, 3, 16)
+    spec.build().load_state_dict(network.state_dict(), strict=True)
+
+
+def test_detects_compact_srvgg():
+    network = engine.SRVGGNetCompact(num_in_ch=3, num_out_ch=3, num_feat=16, num_conv=5, upscale=4, act_type="prelu")
+    spec = _detect_network(network.state_dict())
+    assert (spec.arch, spec.scale, spec.num_feat, spec.depth) == ("srvgg", 4, 16, 5)
+    spec.build().load_state_dict(network.state_dict(), strict=True)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Testes dos backends de inferência e das precisões reduzidas em CPU."""
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("realesrgan")
+
+import backends
+import engine
+from engine import _enhance_tiled
+
+
+def _upscale(forward, rgb):
+    height, width = rgb.shape[:2]
+    return _enhance_tiled(forward, rgb, scale=2, tile_size=max(height, width), tile_overlap=0, device="cpu", half=False)
+
+
+@pytest.mark.parametrize("name", ["torchscript", "onnx"])
+def test_backend_matches_eager_on_other_sizes(srvgg, name):
+    if name not in backends.available_backends("cpu"):
+        pytest.skip(f"backend {name} indisponível")
+    network, checkpoint = srvgg
+    forward = backends.build_backend(name, network, checkpoint, "cpu")
+    rgb = np.random.default_rng(0).integers(0, 256, size=(37, 53, 3), dtype=np.uint8)
+
+    expected = _upscale(network, rgb)
+    result = _upscale(forward, rgb)
+
+    assert result.shape == expected.shape
+    assert np.abs(result.astype(int) - expected.astype(int)).max() <= 1
+    assert list(checkpoint.parent.glob("tiny_x2.*")) != [checkpoint]  # artefato salvo ao lado do .pth
+
+
+def test_torchscript_half_runs_fp16_input(srvgg):
+    network, checkpoint = srvgg
+    forward = backends._build_torchscript(network, checkpoint, "cpu", half=True)
+    tensor = torch.rand(1, 3, 12, 10)
+    try:
+        output = forward(tensor.half())
+    except RuntimeError as exc:  # pragma: no cover - depende do build do torch
+        if "not implemented for 'Half'" in str(exc):
+            pytest.skip("convolução fp16 indisponível em CPU")
+        raise
+
+    assert output.dtype == torch.float16 and output.shape == (1, 3, 24, 20)
+    expected = network(tensor)
+    assert (output.float() - expected).abs().max() < 1e-2
+    # fp16 e fp32 ficam em artefatos separados.
+    assert (checkpoint.parent / "tiny_x2.torchscript-cpu-fp16.pt").exists()
+    assert backends._build_torchscript(network, checkpoint, "cpu", half=False)(tensor).dtype == torch.float32
+
+
+def test_auto_resolves_to_available_backend():
+    assert backends.resolve_backend("auto", "cpu") in backends.available_backends("cpu")
+    assert backends.resolve_backend("auto", "cuda") == "eager"
+    with pytest.raises(ValueError):
+        backends.resolve_backend("tensorrt", "cpu")
+
+
+@pytest.mark.parametrize("precision", ["bf16", "int8"])
+def test_reduced_precision_is_checked_against_fp32(srvgg, precision):
+    if precision == "bf16" and not engine._cpu_supports_bf16():
+        pytest.skip("CPU sem bf16")
+    _, checkpoint = srvgg
+    lazy_model = engine._LazyModel(engine.ModelInfo("tiny_x2", checkpoint, 2), "cpu", precision)
+
+    assert lazy_model.quality_psnr > 20
+    assert lazy_model.upscale(np.zeros((10, 14, 3), dtype=np.uint8), backend="auto").shape == (20, 28, 3)
+    with pytest.raises(ValueError):
+        backends.resolve_backend("onnx", "cpu", precision)
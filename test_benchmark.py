@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Testes da comparação com baseline de ``tools/benchmark_engine.py``."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "tools"))
+
+import benchmark_engine  # noqa: E402
+
+
+def _entry(**overrides) -> dict:
+    entry = {
+        "model": "m",
+        "device": "cpu",
+        "resolution": "64x48",
+        "tile": 0,
+        "tile_overlap": 0,
+        "threads": 1,
+        "workers": 1,
+        "precision": "fp32",
+        "backend": "eager",
+        "images_per_s": 10.0,
+        "megapixels_per_s": 1.0,
+        "latency_p50_s": 0.1,
+        "latency_p95_s": 0.2,
+        "peak_rss_mb": 500.0,
+    }
+    entry.update(overrides)
+    return entry
+
+
+def test_compare_flags_slowdowns_beyond_tolerance():
+    baseline = [_entry(), _entry(workers=2)]
+    current = [_entry(images_per_s=9.5, peak_rss_mb=None), _entry(workers=2, latency_p95_s=0.3)]
+
+    regressions = benchmark_engine.compare(current, baseline, tolerance=0.10)
+
+    assert len(regressions) == 1
+    assert "workers=2" in regressions[0] and "latency_p95_s" in regressions[0]
+    assert benchmark_engine.compare(current, baseline, tolerance=0.60) == []
+
+
+def test_compare_flags_configurations_that_started_failing():
+    baseline = [_entry(), _entry(tile=64, tile_overlap=8, error="boom")]
+    current = [_entry(error="RuntimeError: out of memory"), _entry(tile=64, tile_overlap=8, error="boom")]
+
+    regressions = benchmark_engine.compare(current, baseline, tolerance=0.10)
+
+    assert regressions == ["64x48 tile=0/0 threads=1 workers=1 fp32 eager: passou a falhar (RuntimeError: out of memory)"]
+
+
+def test_compare_matches_baselines_without_tile_overlap():
+    old = _entry(tile=256, images_per_s=20.0)
+    del old["tile_overlap"]
+
+    regressions = benchmark_engine.compare([_entry(tile=256, tile_overlap=32)], [old], tolerance=0.10)
+
+    assert len(regressions) == 1 and "images_per_s" in regressions[0]
+
+
+def test_run_one_times_worker_batches_without_the_model_load(tmp_path, srvgg):
+    _, checkpoint = srvgg
+    image_dir = benchmark_engine.make_images(tmp_path / "imgs", "64x48", 4)
+    config = _entry(model="tiny_x2", threads=1, workers=2)
+    config = {key: config[key] for key in benchmark_engine.CONFIG_KEYS}
+
+    result = benchmark_engine.run_one(config, image_dir, checkpoint.parent)
+
+    assert (result["images"], result["failed"]) == (4, 0)
+    # Subir os workers leva segundos; o lote medido de 4 imagens minúsculas, não.
+    assert result["elapsed_s"] < result["load_s"]
+    assert result["elapsed_s"] < 2.0
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Testes do modo headless (cli.py)."""
+
+import io
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from cli import JsonLinesEmitter, _frame_threshold, collect_images, parse_args
+from engine import DEFAULT_SIMILARITY_THRESHOLD, BatchResult
+
+
+def test_collect_images_expands_dirs_and_globs(tmp_path):
+    (tmp_path / "sub").mkdir()
+    for name in ("a.jpg", "b.PNG", "notes.txt", "sub/c.webp"):
+        (tmp_path / name).write_bytes(b"")
+
+    found = collect_images([str(tmp_path), str(tmp_path / "*.jpg")])
+
+    assert sorted(p.name for p in found) == ["a.jpg", "b.PNG", "c.webp"]
+
+
+def test_events_are_json_lines():
+    stream = io.StringIO()
+    emitter = JsonLinesEmitter(stream)
+    emitter.put(("progress", (1, 2, "a.jpg")))
+    emitter.put(("done", BatchResult(2, 1, 1, 0.5, completed=[Path("a.jpg")])))
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert lines[0]["payload"] == [1, 2, "a.jpg"]
+    assert lines[1]["event"] == "done"
+    assert lines[1]["payload"]["completed"] == ["a.jpg"]
+
+
+def test_cli_does_not_import_tkinter():
+    code = "import sys, cli; sys.exit('tkinter' in sys.modules)"
+    completed = subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).resolve().parent)
+    assert completed.returncode == 0
+
+
+def test_frame_threshold_honours_zero():
+    def threshold(*flags):
+        return _frame_threshold(parse_args(["in.mp4", "-o", "out", *flags]))
+
+    assert threshold() == DEFAULT_SIMILARITY_THRESHOLD
+    assert threshold("--skip-similar", "0") == 0
+    assert threshold("--skip-similar", "3.5") == 3.5
+    assert threshold("--skip-similar", "0", "--keep-all-frames") is None
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Testes da varredura incremental de pastas (``folder_scan.py``)."""
+
+import queue
+import threading
+
+from folder_scan import FolderScan, iter_files
+
+
+def _make_tree(root):
+    for relative in ["b.png", "a.JPG", "notas.txt", "sub/c.webp", "sub/deep/d.png", "z/e.jpeg"]:
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x")
+
+
+def test_iter_files_streams_matches_in_stable_chunks(tmp_path):
+    _make_tree(tmp_path)
+    chunks = list(iter_files(tmp_path, {".png", ".jpg", ".jpeg", ".webp"}, chunk_size=2))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    names = [path.relative_to(tmp_path).as_posix() for chunk in chunks for path in chunk]
+    assert names == ["a.JPG", "b.png", "sub/c.webp", "sub/deep/d.png", "z/e.jpeg"]
+
+    stop = threading.Event()
+    stop.set()
+    assert list(iter_files(tmp_path, {".png"}, stop)) == []
+
+
+def test_folder_scan_posts_chunks_then_done(tmp_path):
+    _make_tree(tmp_path)
+    events: "queue.Queue[tuple[str, object]]" = queue.Queue()
+    scan = FolderScan(tmp_path, {".png"}, events, chunk_size=1).start()
+    scan.join(5)
+
+    items = [events.get_nowait() for _ in range(events.qsize())]
+    assert [kind for kind, _ in items] == ["scan", "scan", "scan_done"]
+    assert all(payload[0] is scan for _, payload in items)
+    assert items[-1][1] == (scan, 2, False)
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Testes do manifesto de saídas (``manifest.py``)."""
+
+from pathlib import Path
+
+from manifest import MANIFEST_NAME, OutputManifest, load_manifest
+
+
+def _record(manifest: OutputManifest, name: str, model: str) -> None:
+    manifest.record(Path(f"/fotos/{name}.jpg"), Path(f"/saida/{name}_x4.png"), model, 4)
+
+
+def test_load_compacts_a_manifest_of_mostly_superseded_lines(tmp_path):
+    manifest = OutputManifest(tmp_path)
+    for night in range(3):
+        for name in ("a", "b"):
+            _record(manifest, name, f"modelo{night}")
+    path = tmp_path / MANIFEST_NAME
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 6
+
+    entries = load_manifest(tmp_path)
+
+    assert {name: entry.model for name, entry in entries.items()} == {"a_x4.png": "modelo2", "b_x4.png": "modelo2"}
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 2
+    assert load_manifest(tmp_path) == entries
+    _record(manifest, "a", "modelo3")
+    assert load_manifest(tmp_path)["a_x4.png"].model == "modelo3"
+
+
+def test_load_leaves_a_mostly_live_manifest_alone(tmp_path):
+    manifest = OutputManifest(tmp_path)
+    for name in ("a", "b", "a"):
+        _record(manifest, name, "modelo")
+    path = tmp_path / MANIFEST_NAME
+    before = path.read_bytes()
+
+    assert sorted(load_manifest(tmp_path)) == ["a_x4.png", "b_x4.png"]
+    assert path.read_bytes() == before
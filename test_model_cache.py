@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Testes do LRU de modelos carregados."""
+
+from pathlib import Path
+
+import engine
+from engine import ModelInfo, _LoadedModels
+
+
+class _FakeLazyModel:
+    loads = 0
+
+    def __init__(self, model_info: ModelInfo, device: str, precision=None) -> None:
+        type(self).loads += 1
+        self.model_info = model_info
+
+    def memory_bytes(self) -> int:
+        return 100
+
+
+def test_lru_keeps_recent_models_within_budget(monkeypatch):
+    monkeypatch.setattr(engine, "_LazyModel", _FakeLazyModel)
+    x2 = ModelInfo("RealESRGAN_x2plus", Path("x2.pth"), 2)
+    x4 = ModelInfo("RealESRGAN_x4plus", Path("x4.pth"), 4)
+    general = ModelInfo("general_x4", Path("general.pth"), 4)
+    models = _LoadedModels(budget_bytes=250)
+
+    first = models.get(x2, "cpu")
+    models.get(x4, "cpu")
+    assert models.get(x2, "cpu") is first
+    assert _FakeLazyModel.loads == 2
+
+    models.get(general, "cpu")  # estoura o orçamento: x4 é o menos recente
+    assert ("RealESRGAN_x4plus", "cpu", "fp32") not in models
+    assert ("RealESRGAN_x2plus", "cpu", "fp32") in models
+    assert models.total_bytes() <= 250
+
+
+def test_precision_is_part_of_the_key(monkeypatch):
+    monkeypatch.setattr(engine, "_LazyModel", _FakeLazyModel)
+    x2 = ModelInfo("RealESRGAN_x2plus", Path("x2.pth"), 2)
+    models = _LoadedModels(budget_bytes=1000)
+
+    assert models.get(x2, "cpu") is not models.get(x2, "cpu", "int8")
+    assert ("RealESRGAN_x2plus", "cpu", "fp32") in models
+    assert ("RealESRGAN_x2plus", "cpu", "int8") in models
+
+
+def test_memory_estimate_counts_backend_weight_copies(srvgg):
+    import backends
+
+    _, checkpoint = srvgg
+    lazy_model = engine._LazyModel(ModelInfo("tiny_x2", checkpoint, 2), "cpu")
+    weights = lazy_model.memory_bytes()
+
+    lazy_model._backend("eager")
+    assert lazy_model.memory_bytes() == weights
+    lazy_model._backend("torchscript")
+    assert lazy_model.memory_bytes() == 2 * weights
+    if "onnx" in backends.available_backends("cpu"):
+        lazy_model._backend("onnx")
+        assert lazy_model.memory_bytes() == 3 * weights
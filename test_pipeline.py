@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""Testes do pipeline decode → inferência → encode de ``process_batch``."""
+
+import queue
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+from PIL import Image
+
+import engine as engine_module
+from conftest import NearestModel
+from engine import BatchingPolicy, BatchResult, CancellationToken, UpscaleEngine, _decode_image, _encode_image
+from manifest import MANIFEST_NAME, load_manifest
+
+
+def _drain(events: "queue.Queue[tuple[str, object]]") -> list:
+    items = []
+    while not events.empty():
+        items.append(events.get_nowait())
+    return items
+
+
+def _make_inputs(tmp_path: Path, count: int) -> list[Path]:
+    inputs = tmp_path / "in"
+    inputs.mkdir()
+    paths = []
+    for index in range(count):
+        path = inputs / f"img{index}.png"
+        Image.new("RGB", (8 + index, 6), (index * 40, 0, 0)).save(path)
+        paths.append(path)
+    return paths
+
+
+def test_pipeline_keeps_event_order(tmp_path, fake_engine):
+    paths = _make_inputs(tmp_path, 5)
+    inputs = tmp_path / "in"
+    broken = inputs / "broken.jpg"
+    broken.write_text("não é imagem")
+    paths.insert(2, broken)
+
+    engine = fake_engine()
+    events: "queue.Queue[tuple[str, object]]" = queue.Queue()
+    result = engine.process_batch(paths, tmp_path / "out", "fake_x2", "cpu", events, prefetch=3)
+
+    assert (result.total, result.succeeded, result.failed) == (6, 5, 1)
+    items = _drain(events)
+    progress = [payload for kind, payload in items if kind == "progress"]
+    assert [entry[0] for entry in progress] == list(range(1, 7))
+    assert [entry[2] for entry in progress] == [p.name for p in paths]
+    assert isinstance(items[-1][1], BatchResult)
+    with Image.open(tmp_path / "out" / "img4_x2.png") as out:
+        assert out.size == (24, 12)
+
+
+def test_cancel_returns_partial_result(tmp_path, fake_engine):
+    paths = _make_inputs(tmp_path, 6)
+    engine = fake_engine()
+    token = CancellationToken()
+
+    class _Events(queue.Queue):
+        def put(self, item, *args, **kwargs):
+            super().put(item, *args, **kwargs)
+            if item == ("log", f"[OK] {paths[1].name} → img1_x2.png"):
+                token.cancel()
+
+    events = _Events()
+    result = engine.process_batch(paths, tmp_path / "out", "fake_x2", "cpu", events, token=token)
+
+    assert result.cancelled
+    assert result.completed[:2] == paths[:2]
+    assert result.succeeded == len(result.completed) < len(paths)
+    written = sorted(p.name for p in (tmp_path / "out").iterdir() if p.name != MANIFEST_NAME)
+    assert written == sorted(f"{p.stem}_x2.png" for p in result.completed)
+
+
+def test_cache_skips_unchanged_and_duplicate_inputs(tmp_path, fake_engine):
+    paths = _make_inputs(tmp_path, 3)
+    twin = tmp_path / "in" / "twin.png"
+    twin.write_bytes(paths[0].read_bytes())
+    paths.append(twin)
+
+    calls: list = []
+    engine = fake_engine(calls=calls)
+
+    first = engine.process_batch(paths, tmp_path / "out", "fake_x2", "cpu", queue.Queue())
+    assert (first.succeeded, first.cache_hits, len(calls)) == (4, 1, 3)
+    assert (tmp_path / "out" / "twin_x2.png").read_bytes() == (tmp_path / "out" / "img0_x2.png").read_bytes()
+
+    second = engine.process_batch(paths, tmp_path / "out2", "fake_x2", "cpu", queue.Queue())
+    assert (second.succeeded, second.cache_hits, len(calls)) == (4, 4, 3)
+    assert sorted(p.name for p in (tmp_path / "out2").iterdir()) == sorted(
+        p.name for p in (tmp_path / "out").iterdir()
+    )
+
+
+def test_rewriting_an_output_keeps_its_cache_entry(tmp_path, fake_engine):
+    source = tmp_path / "ruido.png"
+    Image.fromarray(np.random.default_rng(0).integers(0, 255, (24, 24, 3), dtype=np.uint8)).save(source)
+    engine = fake_engine()
+
+    engine.process_batch([source], tmp_path / "o", "fake_x2", "cpu", queue.Queue(), output_profile="png-small")
+    expected = (tmp_path / "o" / "ruido_x2.png").read_bytes()
+    # Outras configurações na mesma pasta substituem a saída, que está ligada ao cache.
+    engine.process_batch([source], tmp_path / "o", "fake_x2", "cpu", queue.Queue(), output_profile="png-fast")
+    assert (tmp_path / "o" / "ruido_x2.png").read_bytes() != expected
+
+    again = engine.process_batch([source], tmp_path / "o2", "fake_x2", "cpu", queue.Queue(), output_profile="png-small")
+    assert again.cache_hits == 1
+    assert (tmp_path / "o2" / "ruido_x2.png").read_bytes() == expected
+
+
+def test_decode_encode_round_trip_in_bgr(tmp_path):
+    rgb = np.zeros((4, 5, 3), dtype=np.uint8)
+    rgb[..., 0] = 200  # vermelho
+    Image.fromarray(rgb).save(tmp_path / "red.png")
+    Image.fromarray(rgb).save(tmp_path / "red.gif")  # OpenCV não lê GIF: cai no PIL
+
+    for name in ("red.png", "red.gif"):
+        bgr = _decode_image(tmp_path / name)
+        assert bgr.shape == (4, 5, 3)
+        assert tuple(bgr[0, 0]) == (0, 0, 200)
+
+    _encode_image(_decode_image(tmp_path / "red.png"), tmp_path / "out.png")
+    with Image.open(tmp_path / "out.png") as out:
+        assert np.array_equal(np.array(out), rgb)
+
+
+def test_output_profile_changes_format_and_cache_key(tmp_path, fake_engine):
+    paths = _make_inputs(tmp_path, 2)
+    engine = fake_engine()
+
+    result = engine.process_batch(paths, tmp_path / "out", "fake_x2", "cpu", queue.Queue(), output_profile="jpeg-q90-fast")
+    assert result.succeeded == 2 and result.cache_hits == 0
+    assert sorted(p.name for p in (tmp_path / "out").iterdir() if p.name != MANIFEST_NAME) == ["img0_x2.jpg", "img1_x2.jpg"]
+
+    again = engine.process_batch(paths, tmp_path / "out2", "fake_x2", "cpu", queue.Queue(), output_profile="png-fast")
+    assert again.cache_hits == 0  # outro perfil, outra saída
+    assert sorted(p.name for p in (tmp_path / "out2").iterdir() if p.name != MANIFEST_NAME) == ["img0_x2.png", "img1_x2.png"]
+
+
+def _make_video(path: Path, frames: int) -> None:
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), 12.0, (32, 24))
+    for index in range(frames):
+        writer.write(np.full((24, 32, 3), index * 20, dtype=np.uint8))
+    writer.release()
+
+
+def test_video_frames_are_upscaled_in_order(tmp_path, fake_engine):
+    video = tmp_path / "clip.mp4"
+    _make_video(video, 8)
+    engine = fake_engine()
+    events: "queue.Queue[tuple[str, object]]" = queue.Queue()
+
+    result = engine.process_video(video, tmp_path / "out", "fake_x2", "cpu", events, prefetch=2)
+
+    assert (result.total, result.succeeded, result.failed, result.completed) == (8, 8, 0, [video])
+    progress = [payload for kind, payload in _drain(events) if kind == "progress"]
+    assert [entry[0] for entry in progress] == list(range(1, 9))
+    capture = cv2.VideoCapture(str(tmp_path / "out" / "clip_x2.mp4"))
+    assert capture.get(cv2.CAP_PROP_FPS) == 12.0
+    assert (capture.get(cv2.CAP_PROP_FRAME_WIDTH), capture.get(cv2.CAP_PROP_FRAME_HEIGHT)) == (64, 48)
+    assert int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) == 8
+    capture.release()
+
+
+def test_similar_images_and_frames_reuse_previous_output(tmp_path, fake_engine):
+    inputs = tmp_path / "in"
+    inputs.mkdir()
+    base = np.full((12, 16, 3), 90, dtype=np.uint8)
+    burst = [base, base + 1, np.full_like(base, 200)]
+    paths = []
+    for index, pixels in enumerate(burst):
+        paths.append(inputs / f"burst{index}.png")
+        Image.fromarray(pixels).save(paths[-1])
+    engine = fake_engine()
+
+    result = engine.process_batch(
+        paths, tmp_path / "out", "fake_x2", "cpu", queue.Queue(), use_cache=False, similarity_threshold=2.0
+    )
+    assert (result.succeeded, result.similar_skipped) == (3, 1)
+    assert (tmp_path / "out" / "burst1_x2.png").read_bytes() == (tmp_path / "out" / "burst0_x2.png").read_bytes()
+
+    video = tmp_path / "static.mp4"
+    writer = cv2.VideoWriter(str(video), cv2.VideoWriter_fourcc(*"mp4v"), 12.0, (32, 24))
+    for value in (0, 0, 0, 120, 120, 240):
+        writer.write(np.full((24, 32, 3), value, dtype=np.uint8))
+    writer.release()
+    frames = engine.process_video(video, tmp_path / "out", "fake_x2", "cpu", queue.Queue())
+    assert (frames.succeeded, frames.similar_skipped) == (6, 3)
+
+
+def test_metrics_events_follow_each_image(tmp_path, fake_engine):
+    paths = _make_inputs(tmp_path, 3)
+    engine = fake_engine()
+    events: "queue.Queue[tuple[str, object]]" = queue.Queue()
+    result = engine.process_batch(paths, tmp_path / "out", "fake_x2", "cpu", events, use_cache=False)
+
+    items = _drain(events)
+    metrics = [payload for kind, payload in items if kind == "metrics"]
+    assert [entry.name for entry in metrics] == [p.name for p in paths]
+    for kind, payload in items:
+        if kind == "progress":
+            assert items[items.index((kind, payload)) + 1] == ("metrics", metrics[payload[0] - 1])
+    assert metrics[0].input_pixels == 8 * 6
+    assert metrics[0].output_pixels == 16 * 12
+    assert {"decode", "encode", "write"} <= set(metrics[0].seconds)
+    assert result.input_pixels == sum(entry.input_pixels for entry in metrics)
+    assert result.stage_seconds["decode"] == pytest.approx(sum(entry.seconds["decode"] for entry in metrics))
+
+
+def test_manifest_maps_outputs_to_sources(tmp_path, fake_engine):
+    paths = _make_inputs(tmp_path, 2)
+    engine = fake_engine()
+    engine.process_batch(paths, tmp_path / "out", "fake_x2", "cpu", queue.Queue())
+    engine.process_batch(paths[:1], tmp_path / "out", "fake_x2", "cpu", queue.Queue())
+
+    manifest = load_manifest(tmp_path / "out")
+    assert sorted(manifest) == ["img0_x2.png", "img1_x2.png"]
+    entry = manifest["img1_x2.png"]
+    assert (entry.source, entry.model, entry.scale) == (paths[1].resolve(), "fake_x2", 2)
+    assert (entry.input_size, entry.output_size) == ((9, 6), (18, 12))
+    assert "encode" in entry.seconds
+    # A segunda execução veio do cache e a última linha prevalece.
+    assert manifest["img0_x2.png"].reuse == "cache"
+    assert load_manifest(tmp_path / "vazia") == {}
+
+
+def test_batching_coalesces_same_sized_images(tmp_path, fake_engine):
+    inputs = tmp_path / "in"
+    inputs.mkdir()
+    paths = []
+    for index in range(4):
+        paths.append(inputs / f"thumb{index}.png")
+        Image.new("RGB", (6, 5), (index * 50, 0, 0)).save(paths[-1])
+    batches: list = []
+    engine = fake_engine(batches=batches)
+    events: "queue.Queue[tuple[str, object]]" = queue.Queue()
+    policy = BatchingPolicy(max_batch_size=4, max_wait=1.0)
+
+    result = engine.process_batch(paths, tmp_path / "out", "fake_x2", "cpu", events, use_cache=False, batching=policy)
+
+    assert result.succeeded == 4
+    assert batches == [4]
+    progress = [payload[2] for kind, payload in _drain(events) if kind == "progress"]
+    assert progress == [p.name for p in paths]
+    with Image.open(tmp_path / "out" / "thumb3_x2.png") as out:
+        assert out.size == (12, 10)
+        assert out.getpixel((0, 0)) == (150, 0, 0)
+
+
+def test_padded_batching_does_not_share_cache_entries(tmp_path, fake_engine):
+    paths = _make_inputs(tmp_path, 3)
+    engine = fake_engine()
+    padded = BatchingPolicy(max_batch_size=4, max_wait=0.01, bucket=16)
+
+    first = engine.process_batch(paths, tmp_path / "out", "fake_x2", "cpu", queue.Queue(), batching=padded)
+    unpadded = engine.process_batch(paths, tmp_path / "out", "fake_x2", "cpu", queue.Queue(), batching="balanced")
+    again = engine.process_batch(paths, tmp_path / "out", "fake_x2", "cpu", queue.Queue(), batching=padded)
+
+    assert (first.cache_hits, unpadded.cache_hits, again.cache_hits) == (0, 0, 3)
+
+
+def test_evicted_model_keeps_its_scheduler_while_a_batch_uses_it(tmp_path, monkeypatch):
+    models_dir = tmp_path / "models"
+    models_dir.mkdir()
+    for name in ("fake_x2.pth", "fake_x4.pth"):
+        (models_dir / name).write_bytes(b"")
+    gate = threading.Event()
+    batches: list = []
+
+    def load(model_info, device, precision=None):
+        gated = model_info.name == "fake_x2"
+        model = NearestModel(model_info, device, gate=gate if gated else None, batches=batches if gated else None)
+        model.precision = "fp32"
+        model.memory_bytes = lambda: 100
+        return model
+
+    monkeypatch.setattr(engine_module, "_LazyModel", load)
+    # Cabe um modelo só: carregar o x4 tira o x2 do LRU no meio do lote dele.
+    engine = UpscaleEngine(models_dir, cache_dir=tmp_path / "cache", model_memory_budget=150)
+    paths = _make_inputs(tmp_path, 8)
+    results: dict = {}
+
+    def run_x2() -> None:
+        results["x2"] = engine.process_batch(paths, tmp_path / "x2", "fake_x2", "cpu", queue.Queue(), batching="balanced")
+
+    worker = threading.Thread(target=run_x2)
+    worker.start()
+    deadline = time.time() + 5
+    while not batches and time.time() < deadline:
+        time.sleep(0.01)
+    results["x4"] = engine.process_batch(paths[:2], tmp_path / "x4", "fake_x4", "cpu", queue.Queue(), batching="balanced")
+    gate.set()
+    worker.join(10)
+
+    assert (results["x4"].succeeded, results["x2"].succeeded, results["x2"].failed) == (2, 8, 0)
+    # Terminado o lote, o agendador do modelo descartado é fechado.
+    live = {id(model) for model in engine._loaded_models.loaded()}
+    assert {key[0] for key in engine._schedulers} <= live
+
+
+def test_worker_mode_warns_about_single_process_options(tmp_path, fake_engine, monkeypatch):
+    paths = _make_inputs(tmp_path, 2)
+    engine = fake_engine()
+    jobs: list = []
+    monkeypatch.setattr(engine, "_ensure_worker_pool", lambda *args: None)
+    monkeypatch.setattr(engine, "_run_worker_pool", lambda job, pool: jobs.append(job))
+    events: "queue.Queue[tuple[str, object]]" = queue.Queue()
+
+    engine.process_batch(
+        paths, tmp_path / "out", "fake_x2", "cpu", events, workers=2, similarity_threshold=2.0, batching="throughput"
+    )
+
+    warnings = [payload for kind, payload in _drain(events) if kind == "log" and payload.startswith("[AVISO]")]
+    assert any("quase idênticas" in warning for warning in warnings)
+    assert any("lotes" in warning for warning in warnings)
+    assert jobs[0].similarity_threshold is None
+    assert not jobs[0].batching.enabled and "batch_bucket" not in jobs[0].settings()
+
+
+def test_worker_pool_reports_progress_and_survives_cancellation(tmp_path, srvgg):
+    _, checkpoint = srvgg
+    paths = _make_inputs(tmp_path, 6)
+    engine = UpscaleEngine(checkpoint.parent, cache_dir=tmp_path / "cache")
+    options = dict(workers=2, worker_threads=1, use_cache=False)
+    try:
+        events: "queue.Queue[tuple[str, object]]" = queue.Queue()
+        result = engine.process_batch(paths[:3], tmp_path / "out", "tiny_x2", "cpu", events, **options)
+
+        assert (result.succeeded, result.failed, result.cancelled) == (3, 0, False)
+        items = _drain(events)
+        assert [payload[:2] for kind, payload in items if kind == "progress"] == [(1, 3), (2, 3), (3, 3)]
+        assert items[-1] == ("done", result)
+        pool = engine._worker_pool
+
+        token = CancellationToken()
+
+        class _Events(queue.Queue):
+            def put(self, item, *args, **kwargs):
+                super().put(item, *args, **kwargs)
+                if item[0] == "progress":
+                    token.cancel()
+
+        result = engine.process_batch(paths, tmp_path / "out", "tiny_x2", "cpu", _Events(), token=token, **options)
+        assert result.cancelled
+        assert 1 <= len(result.completed) < len(paths)
+
+        # O mesmo pool atende o lote seguinte, já sem o cancelamento anterior.
+        result = engine.process_batch(paths[3:], tmp_path / "out", "tiny_x2", "cpu", queue.Queue(), **options)
+        assert (result.succeeded, result.cancelled) == (3, False)
+        assert engine._worker_pool is pool
+        with Image.open(tmp_path / "out" / "img5_x2.png") as out:
+            assert out.size == (26, 12)
+    finally:
+        engine.close()
+    assert engine._worker_pool is None
+
+
+def test_scale_comes_from_the_weights_not_the_file_name(tmp_path, srvgg):
+    _, checkpoint = srvgg
+    misnamed = checkpoint.rename(checkpoint.with_name("tiny_x4.pth"))  # a rede é x2
+    paths = _make_inputs(tmp_path, 2)
+    engine = UpscaleEngine(misnamed.parent, cache_dir=tmp_path / "cache")
+
+    first = engine.process_batch(paths, tmp_path / "out", "tiny_x4", "cpu", queue.Queue())
+    again = engine.process_batch(paths, tmp_path / "out", "tiny_x4", "cpu", queue.Queue())
+
+    assert (first.succeeded, again.cache_hits) == (2, 2)
+    assert sorted(load_manifest(tmp_path / "out")) == ["img0_x2.png", "img1_x2.png"]
+    assert load_manifest(tmp_path / "out")["img1_x2.png"].scale == 2
+    with Image.open(tmp_path / "out" / "img1_x2.png") as out:
+        assert out.size == (18, 12)
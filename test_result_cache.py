@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Testes do cache de resultados (``result_cache.py``)."""
+
+import os
+
+import result_cache
+from result_cache import ResultCache
+
+
+def _store(cache: ResultCache, tmp_path, name: str, size: int, age: float) -> str:
+    output = tmp_path / "out" / f"{name}.png"
+    output.parent.mkdir(exist_ok=True)
+    output.write_bytes(b"x" * size)
+    key = name * 32
+    cache.store(key, output)
+    entry = cache.lookup(key, ".png")
+    os.utime(entry, (age, age))
+    cache._used_path(entry).unlink()
+    return key
+
+
+def _cached(cache: ResultCache, keys: list) -> list:
+    """Quais chaves ainda têm entrada (sem ``lookup``, que marcaria uso)."""
+    return [cache._entry_path(key, ".png").exists() for key in keys]
+
+
+def test_hits_do_not_touch_the_linked_output(tmp_path):
+    cache = ResultCache(tmp_path / "cache")
+    key = _store(cache, tmp_path, "a", 10, age=1_000_000)
+    dest = cache.materialise(cache.lookup(key, ".png"), tmp_path / "copia.png")
+    os.utime(dest, (2_000_000, 2_000_000))
+
+    assert cache.lookup(key, ".png") is not None
+    assert dest.stat().st_mtime == 2_000_000
+
+
+def test_evict_keeps_recent_hits_and_only_rescans_over_the_limit(tmp_path, monkeypatch):
+    cache = ResultCache(tmp_path / "cache", max_bytes=350)
+    keys = [_store(cache, tmp_path, name, 100, age=1_000_000 + index) for index, name in enumerate("abcd")]
+    cache.lookup(keys[0], ".png")  # o mais antigo passa a ser o mais recente
+
+    assert cache.evict() == 100
+    assert _cached(cache, keys) == [True, False, True, True]
+    assert [path.name for path in (tmp_path / "cache" / ".used").iterdir()] == [f"{keys[0]}.png"]
+
+    scans = []
+    real_evict_lru = result_cache.evict_lru
+
+    def counting_evict_lru(*args, **kwargs):
+        scans.append(args[0])
+        return real_evict_lru(*args, **kwargs)
+
+    monkeypatch.setattr(result_cache, "evict_lru", counting_evict_lru)
+    _store(cache, tmp_path, "e", 30, age=1_000_010)
+    assert cache.evict() == 0 and scans == []  # 330 bytes: cabe, nem varre a pasta
+    _store(cache, tmp_path, "f", 100, age=1_000_020)
+    assert cache.evict() == 200 and len(scans) == 1  # 430 bytes: desce a 90% (315)
+    assert _cached(cache, keys) == [True, False, False, False]
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Testes do serviço HTTP local (``server.py``)."""
+
+import asyncio
+import io
+import json
+import threading
+from pathlib import Path
+
+from PIL import Image
+
+from server import UpscaleService
+
+
+def _make_service(fake_engine, tmp_path: Path, queue_size: int, gate: threading.Event) -> UpscaleService:
+    engine = fake_engine(gate=gate)
+    return UpscaleService(engine, "fake_x2", "cpu", work_dir=tmp_path / "work", queue_size=queue_size)
+
+
+async def _request(port: int, method: str, target: str, body: bytes = b"", content_type: str = "image/png"):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    head = f"{method} {target} HTTP/1.1\r\nHost: localhost\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\n\r\n"
+    writer.write(head.encode() + body)
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, payload = raw.partition(b"\r\n\r\n")
+    lines = head.decode().split("\r\n")
+    headers = dict(line.split(": ", 1) for line in lines[1:])
+    return int(lines[0].split()[1]), headers, payload
+
+
+def _png(width: int, height: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 10, 10)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_upload_with_wait_returns_upscaled_image(tmp_path, fake_engine):
+    gate = threading.Event()
+    gate.set()
+
+    async def scenario():
+        service = _make_service(fake_engine, tmp_path, queue_size=4, gate=gate)
+        server = await service.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            status, headers, body = await _request(port, "POST", "/jobs?wait=1", _png(5, 4))
+            assert status == 200
+            assert headers["Content-Type"] == "image/png"
+            with Image.open(io.BytesIO(body)) as image:
+                assert image.size == (10, 8)
+            status, _, body = await _request(port, "GET", f"/jobs/{headers['X-Job-Id']}")
+            job = json.loads(body)
+            assert (status, job["status"]) == (200, "done")
+            assert job["metrics"]["output_pixels"] == 80
+            status, _, _ = await _request(port, "GET", "/jobs/desconhecido")
+            assert status == 404
+        finally:
+            server.close()
+            await service.close()
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_answers_429(tmp_path, fake_engine):
+    gate = threading.Event()
+
+    async def scenario():
+        service = _make_service(fake_engine, tmp_path, queue_size=1, gate=gate)
+        server = await service.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            status, _, body = await _request(port, "POST", "/jobs", _png(4, 4))
+            running = json.loads(body)["id"]
+            assert status == 202
+            while service.jobs[running].status != "running":
+                await asyncio.sleep(0.01)
+            status, _, _ = await _request(port, "POST", "/jobs", _png(4, 4))
+            assert status == 202  # aguardando na fila
+            status, headers, _ = await _request(port, "POST", "/jobs", _png(4, 4))
+            assert status == 429
+            assert headers["Retry-After"] == "1"
+            gate.set()
+            await service.jobs[running].done.wait()
+            assert service.jobs[running].status == "done"
+            assert json.loads((await _request(port, "GET", "/health"))[2])["rejected"] == 1
+        finally:
+            gate.set()
+            server.close()
+            await service.close()
+
+    asyncio.run(scenario())
+
+
+def test_invalid_requests_answer_400(tmp_path, fake_engine):
+    gate = threading.Event()
+    gate.set()
+
+    async def scenario():
+        service = _make_service(fake_engine, tmp_path, queue_size=4, gate=gate)
+        server = await service.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        source = tmp_path / "in.png"
+        source.write_bytes(_png(4, 4))
+        try:
+            for body in (b"[1, 2]", json.dumps({"path": str(source), "output_profile": ["png"]}).encode()):
+                status, _, payload = await _request(port, "POST", "/jobs", body, "application/json")
+                assert status == 400, payload
+            # tile menor que a sobreposição padrão (32) é recusado antes de entrar na fila.
+            status, _, payload = await _request(port, "POST", "/jobs?tile=8", _png(4, 4))
+            assert status == 400 and "Sobreposição" in json.loads(payload)["error"]
+            assert service.jobs == {}
+        finally:
+            server.close()
+            await service.close()
+
+    asyncio.run(scenario())
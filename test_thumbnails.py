@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Testes do cache de miniaturas da janela de comparação."""
+
+import os
+import time
+
+from PIL import Image
+
+from thumbnails import ThumbnailCache, ThumbnailLoader
+
+
+def test_thumbnail_is_cached_until_the_file_changes(tmp_path):
+    source = tmp_path / "foto.jpg"
+    Image.new("RGB", (1600, 1200), (10, 200, 30)).save(source)
+    cache = ThumbnailCache(tmp_path / "thumbs", size=(400, 400))
+
+    first = cache.get(source)
+    assert first.image.size == (400, 300)
+    assert first.source_size == (1600, 1200)
+    entries = list((tmp_path / "thumbs").glob("*/*.jpg"))
+    assert len(entries) == 1
+
+    second = cache.get(source)
+    assert second.source_size == (1600, 1200)
+    assert list((tmp_path / "thumbs").glob("*/*.jpg")) == entries
+
+    Image.new("RGB", (800, 800)).save(source)
+    os.utime(source, (time.time() + 5, time.time() + 5))
+    assert cache.get(source).source_size == (800, 800)
+    assert len(list((tmp_path / "thumbs").glob("*/*.jpg"))) == 2
+
+
+def test_loader_reports_errors_with_their_tag(tmp_path):
+    broken = tmp_path / "quebrada.png"
+    broken.write_text("não é imagem")
+    loader = ThumbnailLoader(ThumbnailCache(tmp_path / "thumbs"))
+    loader.request(broken, ("linha", 3))
+
+    deadline = time.time() + 5
+    ready = []
+    while not ready and time.time() < deadline:
+        ready = loader.drain()
+        time.sleep(0.01)
+    loader.close()
+
+    (tag, thumbnail), = ready
+    assert tag == ("linha", 3)
+    assert thumbnail.image is None and thumbnail.error
+
+
+def test_loader_close_trims_the_cache_in_the_background(tmp_path):
+    sources = []
+    for index in range(3):
+        sources.append(tmp_path / f"foto{index}.jpg")
+        Image.new("RGB", (800, 600), (index * 80, 0, 0)).save(sources[-1])
+    cache = ThumbnailCache(tmp_path / "thumbs", size=(200, 200))
+    for index, source in enumerate(sources):
+        cache.get(source)
+        entry = cache._entry_path(cache.key_for(source))
+        os.utime(entry, (time.time() + index, time.time() + index))
+    newest = cache._entry_path(cache.key_for(sources[-1]))
+    cache.max_bytes = newest.stat().st_size
+
+    loader = ThumbnailLoader(cache)
+    loader.close()
+    loader._pool.shutdown(wait=True)
+
+    assert list((tmp_path / "thumbs").glob("*/*.jpg")) == [newest]
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Testes da inferência em tiles do engine."""
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from engine import _BufferArena, _enhance_batch, _enhance_tiled, _tile_starts, check_tile_settings
+
+
+def test_tile_starts_cover_image():
+    assert _tile_starts(100, 128, 16) == [0]
+    starts = _tile_starts(1000, 256, 32)
+    assert starts[0] == 0
+    assert starts[-1] + 256 == 1000
+    for previous, current in zip(starts, starts[1:]):
+        assert previous + 256 - current >= 32
+
+
+def test_tiled_matches_full_frame_for_local_model():
+    model = torch.nn.Upsample(scale_factor=4, mode="nearest")
+    rng = np.random.default_rng(0)
+    rgb = rng.integers(0, 256, size=(97, 131, 3), dtype=np.uint8)
+
+    tiled = _enhance_tiled(model, rgb, scale=4, tile_size=48, tile_overlap=8, device="cpu", half=False)
+
+    expected = np.repeat(np.repeat(rgb, 4, axis=0), 4, axis=1)
+    assert tiled.shape == expected.shape
+    assert np.abs(tiled.astype(int) - expected.astype(int)).max() <= 1
+
+
+def test_invalid_overlap_rejected():
+    with pytest.raises(ValueError):
+        check_tile_settings(64, 64)
+
+
+def test_arena_reuses_buffers_for_same_sized_images():
+    model = torch.nn.Upsample(scale_factor=2, mode="nearest")
+    arena = _BufferArena(max_bytes=10**6)
+    rgb = np.full((20, 30, 3), 7, dtype=np.uint8)
+
+    first = _enhance_tiled(model, rgb, scale=2, tile_size=30, tile_overlap=0, device="cpu", half=False, arena=arena)
+    arena.release(first)
+    second = _enhance_tiled(model, rgb, scale=2, tile_size=30, tile_overlap=0, device="cpu", half=False, arena=arena)
+    assert second is first
+    assert (second == 7).all()
+
+    arena.release(second)
+    assert arena.idle_bytes > 0
+    arena.clear()
+    assert arena.idle_bytes == 0
+
+
+def test_arena_drops_idle_buffers_over_budget():
+    arena = _BufferArena(max_bytes=100)
+    big = arena.acquire((10, 10, 1, "uint8"), lambda: np.empty((10, 10, 3), dtype=np.uint8))
+    arena.release(big)
+    assert arena.idle_bytes == 0
+    arena.release(np.empty(4))  # não veio da arena: ignorado
+    assert arena.idle_bytes == 0
+
+
+def test_batch_matches_one_by_one():
+    model = torch.nn.Sequential(torch.nn.Conv2d(3, 3, 3, padding=1), torch.nn.Upsample(scale_factor=2))
+    rng = np.random.default_rng(1)
+    arrays = [rng.integers(0, 256, size=(12, 18, 3), dtype=np.uint8) for _ in range(3)]
+
+    batched = _enhance_batch(model, arrays, scale=2, device="cpu", half=False)
+
+    for array, output in zip(arrays, batched):
+        single = _enhance_tiled(model, array, scale=2, tile_size=18, tile_overlap=0, device="cpu", half=False)
+        assert np.abs(output.astype(int) - single.astype(int)).max() <= 1
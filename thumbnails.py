@@ -0,0 +1,172 @@
+"""Background, disk-cached thumbnails for the comparison window.
+
+Decoding every full-size output on the Tk thread just to show a 400px
+preview froze the GUI on large folders. Thumbnails are therefore:
+
+- decoded with PIL's draft mode (JPEG DCT scaling) plus ``reducing_gap``, so
+  large JPEGs are never decoded at full resolution;
+- stored as small JPEGs under ``.cache/thumbnails``, keyed by path, mtime,
+  file size and box, so reopening the window costs one small read per image;
+- produced by a thread pool (``ThumbnailLoader``) whose results the Tk thread
+  collects with ``drain`` and turns into ``PhotoImage`` objects itself.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import os
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Hashable, List, Optional, Tuple
+
+from PIL import Image
+
+from fileutil import evict_lru, write_atomically
+
+DEFAULT_THUMBNAIL_SIZE = (400, 400)
+DEFAULT_THUMBNAIL_CACHE_BYTES = 256 * 1024**2
+DEFAULT_THUMBNAIL_WORKERS = min(4, os.cpu_count() or 1)
+
+_JPEG_QUALITY = 85
+
+
+@dataclasses.dataclass(slots=True)
+class Thumbnail:
+    """A decoded preview of ``path`` (``image`` is ``None`` when it failed)."""
+
+    path: Path
+    image: Optional[Image.Image]
+    source_size: Tuple[int, int] = (0, 0)  # width, height of the full image
+    error: Optional[str] = None
+
+
+class ThumbnailCache:
+    """Directory-backed cache of downscaled previews, trimmed LRU to ``max_bytes``."""
+
+    def __init__(
+        self,
+        root: Path,
+        size: Tuple[int, int] = DEFAULT_THUMBNAIL_SIZE,
+        max_bytes: int = DEFAULT_THUMBNAIL_CACHE_BYTES,
+    ) -> None:
+        self.root = root
+        self.size = size
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def key_for(self, path: Path) -> str:
+        stat = path.stat()
+        raw = f"{path.resolve()}|{stat.st_mtime_ns}|{stat.st_size}|{self.size[0]}x{self.size[1]}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, path: Path) -> Thumbnail:
+        """Return the thumbnail of ``path``, generating and storing it on a miss."""
+        try:
+            entry = self._entry_path(self.key_for(path))
+            cached = self._load(path, entry)
+            if cached is not None:
+                return cached
+            thumbnail = _make_thumbnail(path, self.size)
+            self._store(entry, thumbnail)
+            return thumbnail
+        except Exception as exc:
+            return Thumbnail(path, None, error=str(exc))
+
+    def evict(self) -> int:
+        """Delete least recently used thumbnails until the cache fits ``max_bytes``."""
+        with self._lock:
+            freed, _ = evict_lru(self.root, "*/*.jpg", self.max_bytes)
+            return freed
+
+    def _load(self, path: Path, entry: Path) -> Optional[Thumbnail]:
+        try:
+            with Image.open(entry) as cached:
+                cached.load()
+                width, height = (int(v) for v in cached.info["comment"].decode("ascii").split("x"))
+                image = cached.copy()
+        except (FileNotFoundError, KeyError, ValueError, OSError):
+            return None
+        try:
+            os.utime(entry)  # mark as recently used for eviction
+        except OSError:
+            pass
+        return Thumbnail(path, image, (width, height))
+
+    def _store(self, entry: Path, thumbnail: Thumbnail) -> None:
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        width, height = thumbnail.source_size
+        # The source size travels in the JPEG comment so a hit never opens the original.
+        write_atomically(
+            entry, lambda tmp: thumbnail.image.save(tmp, "JPEG", quality=_JPEG_QUALITY, comment=f"{width}x{height}")
+        )
+
+    def _entry_path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.jpg"
+
+
+class ThumbnailLoader:
+    """Generates thumbnails on a thread pool for a GUI thread that polls ``drain``.
+
+    Every ``request`` carries a ``tag`` (e.g. a row and a side) that comes
+    back with its ``Thumbnail``; ``cancel`` drops requests that have not
+    started yet, e.g. rows scrolled out of view.
+    """
+
+    def __init__(self, cache: ThumbnailCache, workers: int = DEFAULT_THUMBNAIL_WORKERS) -> None:
+        self.cache = cache
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="upvision-thumbs")
+        self._results: "queue.Queue[tuple[Hashable, Thumbnail]]" = queue.Queue()
+        self._pending: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def request(self, path: Path, tag: Hashable) -> None:
+        with self._lock:
+            if tag in self._pending:
+                return
+            self._pending[tag] = self._pool.submit(self._load, path, tag)
+
+    def cancel(self, tag: Hashable) -> None:
+        with self._lock:
+            future = self._pending.pop(tag, None)
+        if future is not None:
+            future.cancel()
+
+    def drain(self, limit: Optional[int] = None) -> List[tuple[Hashable, Thumbnail]]:
+        """Return up to ``limit`` finished thumbnails without blocking."""
+        ready = []
+        while limit is None or len(ready) < limit:
+            try:
+                ready.append(self._results.get_nowait())
+            except queue.Empty:
+                break
+        return ready
+
+    def close(self) -> None:
+        """Drop queued requests and trim the cache on the pool, without blocking."""
+        with self._lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for future in pending:
+            future.cancel()
+        # ``evict`` stats every cached thumbnail; the GUI thread must not wait for it.
+        self._pool.submit(self.cache.evict)
+        self._pool.shutdown(wait=False)
+
+    def _load(self, path: Path, tag: Hashable) -> None:
+        thumbnail = self.cache.get(path)
+        with self._lock:
+            self._pending.pop(tag, None)
+        self._results.put((tag, thumbnail))
+
+
+def _make_thumbnail(path: Path, size: Tuple[int, int]) -> Thumbnail:
+    with Image.open(path) as image:
+        source_size = image.size
+        # ``reducing_gap`` lets ``thumbnail`` use ``draft`` (JPEG DCT scaling)
+        # and ``reduce`` before the final LANCZOS pass.
+        image.thumbnail(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+        preview = image.convert("RGB")
+    return Thumbnail(path, preview, source_size)
@@ -0,0 +1,399 @@
+"""Benchmark do ``UpscaleEngine.process_batch`` com comparação contra baseline.
+
+Gera imagens sintéticas em várias resoluções e varre combinações de tile,
+threads, processos, precisão e backend. Cada combinação roda num processo
+Python separado (o pico de RSS é por processo) e registra:
+
+- imagens/s e megapixels/s (de entrada);
+- latência por imagem p50/p95 (de ``Processando: X`` até o progresso de X);
+- pico de RSS em MB somando processo principal e workers (amostrado em
+  ``/proc``; fora do Linux, uma estimativa a partir de ``ru_maxrss`` e
+  ``None`` no Windows);
+- tempo de carregamento/aquecimento do modelo, fora da medição (com
+  ``workers`` > 1, um lote de aquecimento não medido sobe os workers).
+
+``threads`` vale para o processo principal ou, com ``workers`` > 1, para cada
+worker. Os resultados vão para um JSON. Com ``--baseline`` a execução é
+comparada a um JSON anterior e o script termina com código 1 se alguma
+combinação piorar além de ``--tolerance`` ou passar a falhar.
+
+Uso:
+    python tools/benchmark_engine.py --model realesr-general-x4v3 \\
+        --resolutions 320x240,640x480 --tiles 0,256 --workers 1,2 -o bench.json
+    python tools/benchmark_engine.py ... --baseline bench_base.json
+    python tools/benchmark_engine.py --compare bench.json bench_base.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import multiprocessing
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from PIL import Image
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+from engine import DEFAULT_TILE_OVERLAP, check_tile_settings  # noqa: E402
+
+# Campos que identificam uma combinação (usados para casar com a baseline).
+CONFIG_KEYS = ("model", "device", "resolution", "tile", "tile_overlap", "threads", "workers", "precision", "backend")
+
+# Métrica -> True quando "maior é melhor".
+METRICS = {
+    "images_per_s": True,
+    "megapixels_per_s": True,
+    "latency_p50_s": False,
+    "latency_p95_s": False,
+    "peak_rss_mb": False,
+}
+
+
+class _TimedEvents(queue.Queue):
+    """``event_queue`` que anota o instante de início e fim de cada imagem."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.started: Dict[str, float] = {}
+        self.latencies: List[float] = []
+
+    def put(self, item, block=True, timeout=None):  # type: ignore[override]
+        kind, payload = item
+        now = time.perf_counter()
+        if kind == "log" and isinstance(payload, str) and payload.startswith("Processando: "):
+            self.started[payload[len("Processando: ") :]] = now
+        elif kind == "progress":
+            name = payload[2]
+            if name in self.started:
+                self.latencies.append(now - self.started.pop(name))
+
+
+class _RssSampler(threading.Thread):
+    """Guarda o maior RSS somado do processo e de seus filhos (workers), lido de ``/proc``."""
+
+    def __init__(self, interval: float = 0.05) -> None:
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = 0
+        self._finished = threading.Event()
+
+    def run(self) -> None:
+        while True:
+            self.peak = max(self.peak, _total_rss())
+            if self._finished.wait(self.interval):
+                return
+
+    def stop(self) -> int:
+        self._finished.set()
+        self.join()
+        return self.peak
+
+
+def _total_rss() -> int:
+    """RSS em bytes do processo atual mais seus filhos; 0 sem ``/proc``."""
+    page = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+    total = 0
+    for pid in [os.getpid(), *(child.pid for child in multiprocessing.active_children())]:
+        try:
+            with open(f"/proc/{pid}/statm", encoding="ascii") as handle:
+                total += int(handle.read().split()[1]) * page
+        except (OSError, ValueError, IndexError):
+            continue
+    return total
+
+
+def _peak_rss_mb(sampled: int, workers: int) -> Optional[float]:
+    if sampled:
+        return round(sampled / 1024**2, 1)
+    if resource is None:
+        return None
+    # Sem /proc: ru_maxrss dá o pico do processo e o do maior filho; supõe
+    # todos os workers nesse pico. É KiB no Linux e bytes no macOS.
+    unit = 1 if sys.platform == "darwin" else 1024
+    parent = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    child = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round((parent + child * (workers if workers > 1 else 0)) * unit / 1024**2, 1)
+
+
+# ----------------------------------------------------------------------
+# Execução de uma combinação (processo filho)
+
+
+def run_one(config: dict, image_dir: Path, models_dir: Optional[Path]) -> dict:
+    from engine import UpscaleEngine, load_torch
+
+    torch = load_torch()
+    if config["threads"] > 0 and config["workers"] <= 1:
+        torch.set_num_threads(config["threads"])
+    engine = UpscaleEngine(models_dir)
+    images = sorted(image_dir.glob("*.png"))
+    options = dict(
+        tile_size=config["tile"],
+        tile_overlap=config["tile_overlap"],
+        workers=config["workers"],
+        worker_threads=config["threads"],
+        backend=config["backend"],
+        precision=config["precision"],
+        use_cache=False,
+    )
+
+    load_start = time.perf_counter()
+    if config["workers"] > 1:
+        # Os workers carregam o modelo ao subir; o processo principal não usa
+        # o seu, então o aquecimento é um lote não medido com os mesmos ajustes.
+        with tempfile.TemporaryDirectory(prefix="upvision-bench-warm-") as warm_dir:
+            engine.process_batch(
+                images[: config["workers"]], Path(warm_dir), config["model"], config["device"], queue.Queue(), **options
+            )
+    else:
+        engine.warm_up(config["model"], config["device"], backend=config["backend"], precision=config["precision"])
+    load_time = time.perf_counter() - load_start
+
+    events = _TimedEvents()
+    sampler = _RssSampler()
+    sampler.start()
+    with tempfile.TemporaryDirectory(prefix="upvision-bench-out-") as out_dir:
+        start = time.perf_counter()
+        result = engine.process_batch(images, Path(out_dir), config["model"], config["device"], events, **options)
+        elapsed = time.perf_counter() - start
+    sampled = sampler.stop()
+    engine.close()
+
+    width, height = (int(value) for value in config["resolution"].split("x"))
+    megapixels = width * height * len(images) / 1e6
+    latencies = events.latencies or [elapsed]
+    return {
+        **config,
+        "images": len(images),
+        "failed": result.failed,
+        "elapsed_s": round(elapsed, 4),
+        "load_s": round(load_time, 4),
+        "images_per_s": round(result.succeeded / elapsed, 4),
+        "megapixels_per_s": round(megapixels / elapsed, 4),
+        "latency_p50_s": round(float(np.percentile(latencies, 50)), 4),
+        "latency_p95_s": round(float(np.percentile(latencies, 95)), 4),
+        "peak_rss_mb": _peak_rss_mb(sampled, config["workers"]),
+        "stage_seconds": {stage: round(seconds, 4) for stage, seconds in result.stage_seconds.items()},
+    }
+
+
+# ----------------------------------------------------------------------
+# Varredura
+
+
+def make_images(directory: Path, resolution: str, count: int) -> Path:
+    """Gera ``count`` PNGs determinísticos (gradiente + textura) em ``directory/resolution``."""
+    width, height = (int(value) for value in resolution.split("x"))
+    target = directory / resolution
+    target.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(0)
+    ys, xs = np.mgrid[0:height, 0:width].astype(np.float32)
+    for index in range(count):
+        base = (xs / max(width - 1, 1) * 180 + ys / max(height - 1, 1) * 60 + index * 7) % 256
+        noise = rng.normal(0, 18, (height, width, 3)).astype(np.float32)
+        pixels = np.clip(base[:, :, None] + noise, 0, 255).astype(np.uint8)
+        Image.fromarray(pixels).save(target / f"bench_{index:03d}.png")
+    return target
+
+
+def sweep(args: argparse.Namespace) -> List[dict]:
+    results: List[dict] = []
+    combos = list(
+        itertools.product(
+            args.resolutions, args.tiles, args.threads, args.workers, args.precisions, args.backends
+        )
+    )
+    with tempfile.TemporaryDirectory(prefix="upvision-bench-in-") as tmp:
+        dirs = {resolution: make_images(Path(tmp), resolution, args.images) for resolution in args.resolutions}
+        for number, (resolution, tile, threads, workers, precision, backend) in enumerate(combos, start=1):
+            config = {
+                "model": args.model,
+                "device": args.device,
+                "resolution": resolution,
+                "tile": tile,
+                "tile_overlap": args.tile_overlap if tile else 0,
+                "threads": threads,
+                "workers": workers,
+                "precision": precision,
+                "backend": backend,
+            }
+            print(f"[{number}/{len(combos)}] {_describe(config)}", file=sys.stderr, flush=True)
+            command = [
+                sys.executable,
+                str(Path(__file__).resolve()),
+                "--run-one",
+                json.dumps(config),
+                "--image-dir",
+                str(dirs[resolution]),
+            ]
+            if args.models_dir:
+                command += ["--models-dir", str(args.models_dir)]
+            completed = subprocess.run(command, capture_output=True, text=True)
+            if completed.returncode != 0:
+                error = (completed.stderr.strip().splitlines() or ["erro desconhecido"])[-1]
+                print(f"  [ERRO] {error}", file=sys.stderr)
+                results.append({**config, "error": error})
+                continue
+            entry = json.loads(completed.stdout.strip().splitlines()[-1])
+            rss = "?" if entry["peak_rss_mb"] is None else f"{entry['peak_rss_mb']:.0f}"
+            print(
+                f"  {entry['images_per_s']:.3f} img/s | {entry['megapixels_per_s']:.3f} MP/s | "
+                f"p50 {entry['latency_p50_s']:.3f}s | p95 {entry['latency_p95_s']:.3f}s | "
+                f"RSS {rss} MB",
+                file=sys.stderr,
+            )
+            results.append(entry)
+    return results
+
+
+# ----------------------------------------------------------------------
+# Comparação com baseline
+
+
+def compare(current: Iterable[dict], baseline: Iterable[dict], tolerance: float) -> List[str]:
+    """Retorna uma linha por métrica que piorou mais que ``tolerance`` (fração).
+
+    Uma combinação que funcionava na baseline e agora falha também conta.
+    """
+    reference = {_config_key(entry): entry for entry in baseline if "error" not in entry}
+    regressions: List[str] = []
+    for entry in current:
+        old = reference.get(_config_key(entry))
+        if old is None:
+            continue
+        if "error" in entry:
+            regressions.append(f"{_describe(entry)}: passou a falhar ({entry['error']})")
+            continue
+        for metric, higher_is_better in METRICS.items():
+            before, after = old.get(metric), entry.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            worse = -change if higher_is_better else change
+            if worse > tolerance:
+                regressions.append(
+                    f"{_describe(entry)}: {metric} {before} → {after} ({change:+.1%})"
+                )
+    return regressions
+
+
+def _config_key(entry: dict) -> tuple:
+    # JSONs sem ``tile_overlap`` usaram a sobreposição padrão.
+    defaults = {"tile_overlap": DEFAULT_TILE_OVERLAP if entry.get("tile") else 0}
+    return tuple(entry.get(key, defaults.get(key)) for key in CONFIG_KEYS)
+
+
+def _describe(config: dict) -> str:
+    return (
+        f"{config['resolution']} tile={config['tile']}/{config.get('tile_overlap', 0)} threads={config['threads']} "
+        f"workers={config['workers']} {config['precision']} {config['backend']}"
+    )
+
+
+def _load_results(path: Path) -> List[dict]:
+    return json.loads(path.read_text(encoding="utf-8"))["results"]
+
+
+def _report(regressions: List[str], tolerance: float) -> int:
+    if regressions:
+        print(f"[REGRESSÃO] {len(regressions)} métrica(s) pioraram mais de {tolerance:.0%}:")
+        for line in regressions:
+            print("  -", line)
+        return 1
+    print(f"[OK] Nenhuma regressão acima de {tolerance:.0%}.")
+    return 0
+
+
+# ----------------------------------------------------------------------
+# CLI
+
+
+def _csv(cast):
+    return lambda raw: [cast(value.strip()) for value in raw.split(",") if value.strip()]
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark do UpscaleEngine com comparação contra baseline.")
+    parser.add_argument("--model", default="RealESRGAN_x2plus", help="Checkpoint a medir.")
+    parser.add_argument("--models-dir", type=Path, help="Pasta dos checkpoints (default: models_realesrgan/).")
+    parser.add_argument("--device", default="cpu", help="cpu, cuda ou auto (default: cpu).")
+    parser.add_argument("--resolutions", type=_csv(str), default=["320x240", "640x480"], help="Ex.: 320x240,1280x720")
+    parser.add_argument("--images", type=int, default=4, help="Imagens por resolução (default: 4).")
+    parser.add_argument("--tiles", type=_csv(int), default=[0], help="Tamanhos de tile (default: 0).")
+    parser.add_argument(
+        "--tile-overlap",
+        type=int,
+        default=DEFAULT_TILE_OVERLAP,
+        help=f"Sobreposição dos tiles (default: {DEFAULT_TILE_OVERLAP}); deve ser menor que todo tile > 0.",
+    )
+    parser.add_argument(
+        "--threads", type=_csv(int), default=[0], help="Threads do torch (por worker com --workers > 1); 0 = padrão."
+    )
+    parser.add_argument("--workers", type=_csv(int), default=[1], help="Processos de inferência (default: 1).")
+    parser.add_argument("--precisions", type=_csv(str), default=["auto"], help="Ex.: fp32,bf16,int8")
+    parser.add_argument("--backends", type=_csv(str), default=["eager"], help="Ex.: eager,torchscript,onnx")
+    parser.add_argument("-o", "--output", type=Path, help="Arquivo JSON com os resultados.")
+    parser.add_argument("--baseline", type=Path, help="JSON de uma execução anterior para comparar.")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Piora tolerada, fração (default: 0.10).")
+    parser.add_argument("--compare", nargs=2, type=Path, metavar=("ATUAL", "BASELINE"), help="Só compara dois JSONs.")
+    parser.add_argument("--run-one", help=argparse.SUPPRESS)
+    parser.add_argument("--image-dir", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    for tile in args.tiles:
+        try:
+            check_tile_settings(tile, args.tile_overlap)
+        except ValueError as exc:
+            parser.error(f"{exc}; ajuste --tile-overlap.")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.run_one:
+        print(json.dumps(run_one(json.loads(args.run_one), args.image_dir, args.models_dir)))
+        return 0
+    if args.compare:
+        current, baseline = (_load_results(path) for path in args.compare)
+        return _report(compare(current, baseline, args.tolerance), args.tolerance)
+
+    results = sweep(args)
+    payload = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "host": platform.node(),
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"Resultados salvos em {args.output}")
+    else:
+        print(json.dumps(payload, indent=2, ensure_ascii=False))
+    if args.baseline:
+        return _report(compare(results, _load_results(args.baseline), args.tolerance), args.tolerance)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())